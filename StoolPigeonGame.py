@@ -1,21 +1,27 @@
 import random
-import pygame
+import time
 from cards import CardType, Card  
 from button import Button 
+from assets import ASSETS, TEXT
 from game_state import GameState, GamePhase
 from actions import Action, ActionType
+from events import EVENTS, CardPeeked, CardSelected
 
 
 class StoolPigeonGame:
     """Main game class that handles game logic, rendering, and user input."""
     
-    def __init__(self, GUI=False, render_delay_sec=0.3):
-        """Initialize the game."""
+    def __init__(self, GUI=False, render_delay_sec=0.3, event_driven=True, seed=None, rng=None):
+        """Initialize the game. seed/rng set the game's own random.Random for the deal."""
         # Game configuration
         self.GUI = GUI
+        self.rng = rng if rng is not None else random.Random(seed)
         self.cardWidth = 65
         self.cardHeight = 90
         self.fps = 60
+        # Event-driven mode sleeps in pygame.event.wait() and only redraws on change
+        self.event_driven = event_driven
+        self.idle_timeout_ms = 1000
         self.background = None
 
         # RGB color definitions
@@ -39,13 +45,9 @@ class StoolPigeonGame:
 
         # Buttons 
         self.knock_button = Button((50, 575), 100, 50, 'images/knock-button.png')
-        self.knock_button_rect = self.knock_button.rect
         self.done_button = Button((750, 575), 100, 50, 'images/done-button.png')
-        self.done_button_rect = self.done_button.rect
         self.eliminate_button = Button((700, 500), 150, 50, 'images/eliminate-button.png')
-        self.eliminate_button_rect = self.eliminate_button.rect
         self.add_button = Button((700, 575), 150, 50, 'images/add-button.png')
-        self.add_button_rect = self.add_button.rect
 
         # Game state
         self.state = GameState()
@@ -57,18 +59,25 @@ class StoolPigeonGame:
         
         # Error messages
         self.error_message = None
-        self.error_message_timer = 0
+        self.error_message_until = 0.0
+
+        # Layered rendering: static layer and the previous frame's elements
+        self._static_layer = None
+        self._last_frame = None
         
         self._setup_game()
 
         if self.GUI:
+            import pygame
             pygame.init()
             self._initScreen()
             self._load_background()
+            self._build_static_layer()
             self._refresh()
 
     def _initScreen(self):
         """Initialize the pygame window and fonts."""
+        import pygame
         self.cellSize = 40
         self.screenWidth = 900
         self.screenHeight = 700
@@ -78,12 +87,13 @@ class StoolPigeonGame:
         pygame.display.set_caption("Stool Pigeon")
     
     def _load_background(self):
-        """Load and scale the background image."""
-        try:
-            bg_image = pygame.image.load('images/game-background-light.png')
-            self.background = pygame.transform.scale(bg_image, (self.screenWidth, self.screenHeight))
-        except pygame.error:
-            self.background = None
+        """Load the background and preload every card and button image."""
+        self.background = ASSETS.image('images/game-background-light.png',
+                                       (self.screenWidth, self.screenHeight))
+        card_size = (Card.CARD_WIDTH, Card.CARD_HEIGHT)
+        buttons = [self.knock_button, self.done_button, self.eliminate_button, self.add_button]
+        ASSETS.preload([(path, card_size) for path in Card.image_files()] +
+                       [(b.image, (b.width, b.height)) for b in buttons])
 
     # ========== HELPER METHODS ==========
 
@@ -98,29 +108,118 @@ class StoolPigeonGame:
     def show_error_message(self, message, duration=3):
         """Display an error message for a specified duration (in seconds)."""
         self.error_message = message
-        self.error_message_timer = duration * self.fps
+        self.error_message_until = time.monotonic() + duration
+
+    def _expire_error_message(self):
+        """Clear the error message once its time is up. Returns True if it was cleared."""
+        if self.error_message and time.monotonic() >= self.error_message_until:
+            self.error_message = None
+            return True
+        return False
 
     # ========== RENDERING METHODS ==========
-    
+    #
+    # Rendering is layered: a pre-composited static layer (background and
+    # fixed labels) sits under a list of elements, each with a stable slot,
+    # a signature of how it looks, a rect and a draw callback. _refresh()
+    # compares the signatures with the previous frame and only restores and
+    # redraws the rects that changed, then pushes just those rects to the
+    # display with pygame.display.update().
+
+    def _build_static_layer(self):
+        """Pre-composite the background and the labels that never change."""
+        import pygame
+        layer = pygame.Surface((self.screenWidth, self.screenHeight)).convert()
+        if self.background:
+            layer.blit(self.background, (0, 0))
+        else:
+            layer.fill((26, 26, 46))
+        hand_label = TEXT.render(self.tinyFont, "Your Hand:", self.white)
+        layer.blit(hand_label, (350, 420))
+        self._static_layer = layer
+        self._invalidate_screen()
+
+    def _invalidate_screen(self):
+        """Force the next _refresh() to redraw and flip the whole screen."""
+        self._last_frame = None
+
     def _refresh(self):
-        """Redraw the entire game screen."""
+        """Redraw the regions of the screen that changed since the last frame."""
+        import pygame
         mouse_pos = pygame.mouse.get_pos()
         is_user_turn = self.state.is_user_turn()
         active_mouse = mouse_pos if is_user_turn else None
 
-        self._render_drawn_card(active_mouse, is_user_turn)
-        self._render_game_state()
-        self._render_draw_pile(active_mouse, is_user_turn)
-        self._render_discard_pile(active_mouse, is_user_turn)
-        self._render_player_hand(active_mouse, is_user_turn)
-        self._render_agent_hand(active_mouse, is_user_turn)
-        self._render_buttons(active_mouse)
-        self._render_error_message()
-
-        pygame.display.flip()
-
-    def _render_drawn_card(self, active_mouse, is_user_turn):
-        """Render the currently drawn card."""
+        # Elements are (slot, signature, rect, draw); later ones draw on top.
+        elements = []
+        self._layout_game_state(elements)
+        self._layout_drawn_card(elements, active_mouse, is_user_turn)
+        self._layout_draw_pile(elements, active_mouse, is_user_turn)
+        self._layout_discard_pile(elements, active_mouse, is_user_turn)
+        self._layout_hand(elements, self.user_hand, 0, active_mouse, is_user_turn)
+        self._layout_hand(elements, self.agent_hands, 1, active_mouse, is_user_turn)
+        self._layout_buttons(elements, active_mouse)
+        self._layout_error_message(elements)
+
+        frame = {slot: (signature, rect) for slot, signature, rect, _ in elements}
+        last_frame = self._last_frame
+        self._last_frame = frame
+
+        if last_frame is None:
+            dirty = [self.screen.get_rect()]
+        else:
+            changed = {}
+            for slot in frame.keys() | last_frame.keys():
+                old, new = last_frame.get(slot), frame.get(slot)
+                if old != new:
+                    for entry in (old, new):
+                        if entry is not None:
+                            changed[tuple(entry[1])] = entry[1]
+            if not changed:
+                return
+            dirty = list(changed.values())
+
+        for area in dirty:
+            self.screen.set_clip(area)
+            self.screen.blit(self._static_layer, area, area)
+            for _, _, rect, draw in elements:
+                if rect.colliderect(area):
+                    draw()
+        self.screen.set_clip(None)
+
+        if last_frame is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+
+    def _add_text(self, elements, slot, text, color, position):
+        """Add a line of tiny-font text as a screen element."""
+        surface = TEXT.render(self.tinyFont, text, color)
+        rect = surface.get_rect(topleft=position)
+        elements.append((slot, (text, color), rect, lambda: self.screen.blit(surface, rect)))
+
+    def _add_card(self, elements, slot, card, position, active_mouse, is_user_turn,
+                  face_up, highlight=False):
+        """Add a card as a screen element; returns its rect."""
+        import pygame
+        rect = pygame.Rect(position[0], position[1], Card.CARD_WIDTH, Card.CARD_HEIGHT)
+        card.rect = rect  # Click detection needs it even if the card isn't redrawn
+        hover = bool(is_user_turn and card.clickable and active_mouse and
+                     rect.collidepoint(active_mouse))
+        # Face-down cards all look alike, so only a face-up card's identity matters
+        signature = (id(card) if face_up else None, face_up, hover, highlight)
+
+        def draw():
+            card.draw(self.screen, position, self.font, self.tinyFont, active_mouse,
+                      face_up=face_up, is_user_turn=is_user_turn)
+            if highlight:
+                pygame.draw.rect(self.screen, (255, 255, 0), card.rect, 4)
+
+        elements.append((slot, signature, rect, draw))
+        return rect
+
+    def _layout_drawn_card(self, elements, active_mouse, is_user_turn):
+        """Lay out the currently drawn card."""
         if not (self.state.drawn_card and self.state.is_user_turn()):
             return
         
@@ -132,92 +231,69 @@ class StoolPigeonGame:
         ]
         
         if self.state.phase in show_phases:
-            drawn_label = self.tinyFont.render("You drew:", True, self.white)
-            self.screen.blit(drawn_label, (600, 270))
-            self.state.drawn_card.draw(self.screen, (600, 300), self.font, self.tinyFont,
-                                      active_mouse, face_up=True, is_user_turn=is_user_turn)
+            self._add_text(elements, ("drawn_label",), "You drew:", self.white, (600, 270))
             self.state.drawn_card.disable()
+            self._add_card(elements, ("drawn",), self.state.drawn_card, (600, 300),
+                           active_mouse, is_user_turn, face_up=True)
 
-    def _render_game_state(self):
-        """Render game state information."""
-        phase_text = self.tinyFont.render(
-            f"Phase: {self.state.phase.name} | Turn: {self.state.get_current_player_name()}", 
-            True, self.white
-        )
-        self.screen.blit(phase_text, (10, 10))
-        
-        instructions = self.tinyFont.render(self.state.get_phase_instructions(), True, self.white)
-        self.screen.blit(instructions, (10, 35))
+    def _layout_game_state(self, elements):
+        """Lay out game state information."""
+        self._add_text(elements, ("phase",),
+                       f"Phase: {self.state.phase.name} | Turn: {self.state.get_current_player_name()}",
+                       self.white, (10, 10))
+        self._add_text(elements, ("instructions",), self.state.get_phase_instructions(),
+                       self.white, (10, 35))
 
         if self.state.has_knocked():
             knocked_name = "User" if self.state.knocked_by == 0 else "Agent"
-            knock_text = self.tinyFont.render(f"Knocked by: {knocked_name}", True, self.red_orange)
-            self.screen.blit(knock_text, (10, 60))
+            self._add_text(elements, ("knocked",), f"Knocked by: {knocked_name}",
+                           self.red_orange, (10, 60))
 
-    def _render_draw_pile(self, active_mouse, is_user_turn):
-        """Render the draw pile."""
-        pile_label = self.tinyFont.render(f"Draw: {len(self.draw_pile)}", True, self.white)
-        self.screen.blit(pile_label, (350, 270))
+    def _layout_draw_pile(self, elements, active_mouse, is_user_turn):
+        """Lay out the draw pile."""
+        self._add_text(elements, ("draw_label",), f"Draw: {len(self.draw_pile)}",
+                       self.white, (350, 270))
         
         if self.draw_pile:
-            top_card = self.draw_pile[-1]
-            top_card.draw(self.screen, (350, 300), self.font, self.tinyFont, 
-                         active_mouse, face_up=False, is_user_turn=is_user_turn)
-            self.draw_pile_rect = top_card.rect
+            self.draw_pile_rect = self._add_card(elements, ("draw",), self.draw_pile[-1], (350, 300),
+                                                 active_mouse, is_user_turn, face_up=False)
         else:
             self.draw_pile_rect = None
 
-    def _render_discard_pile(self, active_mouse, is_user_turn):
-        """Render the discard pile."""
-        pile_label = self.tinyFont.render(f"Discard: {len(self.discard_pile)}", True, self.white)
-        self.screen.blit(pile_label, (475, 270))
+    def _layout_discard_pile(self, elements, active_mouse, is_user_turn):
+        """Lay out the discard pile."""
+        import pygame
+        self._add_text(elements, ("discard_label",), f"Discard: {len(self.discard_pile)}",
+                       self.white, (475, 270))
 
         if self.discard_pile:
             top_card = self.discard_pile[-1]
-            top_card.draw(self.screen, (475, 300), self.font, self.tinyFont,
-                         active_mouse, face_up=True, is_user_turn=is_user_turn)
-            self.discard_pile_rect = top_card.rect
-            
+            # Set clickability before drawing so the hover outline matches this frame
             if self.state.is_phase(GamePhase.DECIDE):
                 top_card.enable()
             else:
                 top_card.disable()
-        else:
-            self.discard_pile_rect = pygame.Rect(475, 300, Card.CARD_WIDTH, Card.CARD_HEIGHT)
-            pygame.draw.rect(self.screen, (200, 200, 200), self.discard_pile_rect, 2)
-
-    def _render_player_hand(self, active_mouse, is_user_turn):
-        """Render the player's hand."""
-        hand_label = self.tinyFont.render("Your Hand:", True, self.white)
-        self.screen.blit(hand_label, (350, 420))
-        
-        for i, card in enumerate(self.user_hand):
-            if card is None:
-                continue
-            
-            pos = self._get_card_position(i, is_bottom_row=True)
-            face_up = self._should_show_card_face_up(i, player_idx=0)
-            
-            card.draw(self.screen, pos, self.font, self.tinyFont, active_mouse,
-                     face_up=face_up, is_user_turn=is_user_turn)
             
-            self._highlight_selected_card(card, i, player_idx=0)
-            self._set_card_enabled_state(card, i, player_idx=0)
-
-    def _render_agent_hand(self, active_mouse, is_user_turn):
-        """Render the agent's hand."""
-        for i, card in enumerate(self.agent_hands):
+            self.discard_pile_rect = self._add_card(elements, ("discard",), top_card, (475, 300),
+                                                    active_mouse, is_user_turn, face_up=True)
+        else:
+            rect = pygame.Rect(475, 300, Card.CARD_WIDTH, Card.CARD_HEIGHT)
+            self.discard_pile_rect = rect
+            elements.append((("discard",), "empty", rect,
+                             lambda: pygame.draw.rect(self.screen, (200, 200, 200), rect, 2)))
+
+    def _layout_hand(self, elements, hand, player_idx, active_mouse, is_user_turn):
+        """Lay out the user's hand (player 0, bottom) or the agent's (player 1, top)."""
+        for i, card in enumerate(hand):
             if card is None:
                 continue
             
-            pos = self._get_card_position(i, is_bottom_row=False)
-            face_up = self._should_show_card_face_up(i, player_idx=1)
+            pos = self._get_card_position(i, is_bottom_row=(player_idx == 0))
+            face_up = self._should_show_card_face_up(i, player_idx=player_idx)
+            self._set_card_enabled_state(card, i, player_idx=player_idx)
             
-            card.draw(self.screen, pos, self.font, self.tinyFont, active_mouse,
-                     face_up=face_up, is_user_turn=is_user_turn)
-            
-            self._highlight_selected_card(card, i, player_idx=1)
-            self._set_card_enabled_state(card, i, player_idx=1)
+            self._add_card(elements, ("hand", player_idx, i), card, pos, active_mouse,
+                           is_user_turn, face_up, self._is_selected_for_swap(i, player_idx))
 
     def _get_card_position(self, card_idx, is_bottom_row):
         """Calculate card position based on index and whether it's bottom row."""
@@ -244,15 +320,13 @@ class StoolPigeonGame:
         else:
             return is_peeked
 
-    def _highlight_selected_card(self, card, card_idx, player_idx):
-        """Highlight a card if it's selected for Bamboozle or Vendetta."""
+    def _is_selected_for_swap(self, card_idx, player_idx):
+        """True if the card is the first pick of a Bamboozle or Vendetta swap."""
         is_first_bamboozle = (self.bamboozle_first_card == (player_idx, card_idx) and
                              self.state.is_phase(GamePhase.BAMBOOZLE_SELECT))
         is_first_vendetta = (self.vendetta_first_card == (player_idx, card_idx) and
                             self.state.is_phase(GamePhase.VENDETTA_SWAP))
-        
-        if is_first_bamboozle or is_first_vendetta:
-            pygame.draw.rect(self.screen, (255, 255, 0), card.rect, 4)
+        return is_first_bamboozle or is_first_vendetta
 
     def _set_card_enabled_state(self, card, card_idx, player_idx):
         """Enable or disable a card based on current phase and card state."""
@@ -283,8 +357,10 @@ class StoolPigeonGame:
             else:
                 card.disable()
 
-    def _render_buttons(self, active_mouse):
-        """Render all interactive buttons."""
+    def _layout_buttons(self, elements, active_mouse):
+        """Lay out all interactive buttons."""
+        visible = []
+
         # Knock button (not shown during special card phases)
         special_phases = [
             GamePhase.STOOL_PIGEON_PEEK, GamePhase.STOOL_PIGEON_SWAP,
@@ -293,35 +369,39 @@ class StoolPigeonGame:
         ]
         
         if self.state.phase not in special_phases:
-            self.knock_button.draw(self.screen, active_mouse)
+            visible.append(("knock", self.knock_button))
         
         # Done button (shown during peek phases when card is selected)
         if ((self.state.is_phase(GamePhase.STOOL_PIGEON_PEEK) or 
              self.state.is_phase(GamePhase.VENDETTA_PEEK)) and 
             self.peeked_card is not None):
-            self.done_button.draw(self.screen, active_mouse)
+            visible.append(("done", self.done_button))
         
         # Kingpin choice buttons
         if self.state.is_phase(GamePhase.KINGPIN_CHOOSE):
-            self.eliminate_button.draw(self.screen, active_mouse)
-            self.add_button.draw(self.screen, active_mouse)
-
-    def _render_error_message(self):
-        """Render error message if active."""
-        if self.error_message and self.error_message_timer > 0:
-            error_surface = self.font.render(self.error_message, True, self.red_orange)
+            visible.append(("eliminate", self.eliminate_button))
+            visible.append(("add", self.add_button))
+
+        for name, button in visible:
+            hover = bool(button.clickable and active_mouse and button.rect.collidepoint(active_mouse))
+            elements.append((("button", name), hover, button.rect,
+                             lambda button=button: button.draw(self.screen, active_mouse)))
+
+    def _layout_error_message(self, elements):
+        """Lay out the error message overlay if active."""
+        self._expire_error_message()
+        if self.error_message:
+            error_surface = TEXT.render(self.font, self.error_message, self.red_orange)
             error_rect = error_surface.get_rect(center=(self.screenWidth // 2, self.screenHeight // 2))
             
             bg_rect = error_rect.inflate(40, 20)
-            bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
-            bg_surface.set_alpha(200)
-            bg_surface.fill((0, 0, 0))
-            self.screen.blit(bg_surface, bg_rect)
-            self.screen.blit(error_surface, error_rect)
-            
-            self.error_message_timer -= 1
-            if self.error_message_timer <= 0:
-                self.error_message = None
+            bg_surface = TEXT.overlay(bg_rect.size, (0, 0, 0), 200)
+
+            def draw():
+                self.screen.blit(bg_surface, bg_rect)
+                self.screen.blit(error_surface, error_rect)
+
+            elements.append((("error",), self.error_message, bg_rect, draw))
 
     # ========== INPUT HANDLING ==========
     
@@ -375,19 +455,20 @@ class StoolPigeonGame:
         for i, card in enumerate(self.user_hand):
             if card is not None and card.contains(pos):
                 self.peeked_card = (0, i)
-                print(f"Peeking at your card {i}")
+                if EVENTS.cards:
+                    EVENTS.emit(CardPeeked(0, i))
                 return
         
         # Check agent cards
         for i, card in enumerate(self.agent_hands):
             if card is not None and card.contains(pos):
                 self.peeked_card = (1, i)
-                print(f"Peeking at agent's card {i}")
+                if EVENTS.cards:
+                    EVENTS.emit(CardPeeked(1, i))
                 return
         
         # Check done button
         if self.peeked_card and self.done_button.contains(pos):
-            print("Done peeking. Now swap the Stool Pigeon with one of your cards.")
             self.peeked_card = None
             self.state.set_phase(GamePhase.STOOL_PIGEON_SWAP)
 
@@ -406,7 +487,8 @@ class StoolPigeonGame:
             player_idx, card_idx = selected
             if self.bamboozle_first_card is None:
                 self.bamboozle_first_card = (player_idx, card_idx)
-                print(f"Selected first card: {'Your' if player_idx == 0 else 'Agent'} card {card_idx}")
+                if EVENTS.cards:
+                    EVENTS.emit(CardSelected(player_idx, card_idx))
             else:
                 p1, c1 = self.bamboozle_first_card
                 Action.swap(p1, c1, player_idx, card_idx).execute_action(self, GamePhase)
@@ -417,12 +499,11 @@ class StoolPigeonGame:
         selected = self._check_card_click(pos)
         if selected:
             self.peeked_card = selected
-            player_idx, card_idx = selected
-            print(f"Vendetta: Peeking at {'your' if player_idx == 0 else 'agent'} card {card_idx}")
+            if EVENTS.cards:
+                EVENTS.emit(CardPeeked(*selected))
             return
         
         if self.peeked_card and self.done_button.contains(pos):
-            print("Done peeking. Now swap any two cards.")
             self.peeked_card = None
             self.state.set_phase(GamePhase.VENDETTA_SWAP)
             self.state.clear_selection()
@@ -434,7 +515,8 @@ class StoolPigeonGame:
             player_idx, card_idx = selected
             if self.vendetta_first_card is None:
                 self.vendetta_first_card = (player_idx, card_idx)
-                print(f"Vendetta: Selected first card - {'Your' if player_idx == 0 else 'Agent'} card {card_idx}")
+                if EVENTS.cards:
+                    EVENTS.emit(CardSelected(player_idx, card_idx))
             else:
                 p1, c1 = self.vendetta_first_card
                 Action.swap(p1, c1, player_idx, card_idx).execute_action(self, GamePhase)
@@ -444,7 +526,6 @@ class StoolPigeonGame:
         """Handle clicks during KINGPIN_CHOOSE phase."""
         if self.eliminate_button.contains(pos):
             self.state.set_phase(GamePhase.KINGPIN_ELIMINATE)
-            print("Kingpin: Eliminate mode - click a card to remove it from the game")
         elif self.add_button.contains(pos):
             Action.kingpin_add(1 if self.state.is_user_turn() else 0, 0).execute_action(self, GamePhase)
 
@@ -507,7 +588,7 @@ class StoolPigeonGame:
     def _setup_game(self):
         """Initialize game state: create deck, shuffle, and deal."""
         self.draw_pile = self._create_deck()
-        random.shuffle(self.draw_pile)
+        self.rng.shuffle(self.draw_pile)
         self.discard_pile = []
         self.agent_hands = [self.draw_pile.pop() for _ in range(4)]
         self.user_hand = [self.draw_pile.pop() for _ in range(4)]
@@ -516,24 +597,71 @@ class StoolPigeonGame:
     
     def _loop_gui(self):
         """Main game loop: refresh screen and handle input."""
+        import pygame
         running = True
         clock = pygame.time.Clock()
+        last_view = None
         
         while running: 
-            clock.tick(self.fps)
-            
-            if self.background:
-                self.screen.blit(self.background, (0, 0))
+            if self.event_driven:
+                events = [pygame.event.wait(self._idle_timeout())]
+                events += pygame.event.get()
             else:
-                self.screen.fill((26, 26, 46))
-
-            self._refresh()
+                clock.tick(self.fps)
+                events = pygame.event.get()
 
-            for event in pygame.event.get():
+            for event in events:
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     self._handle_click(event.pos)
                 elif event.type == pygame.QUIT:
                     running = False
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE, pygame.VIDEORESIZE):
+                    last_view = None
+                    self._invalidate_screen()
+
+            self._expire_error_message()
+            view = self._view_signature(pygame.mouse.get_pos())
+            if self.event_driven and view == last_view:
+                continue
+            last_view = view
+            self._refresh()
+
+    def _idle_timeout(self):
+        """How long the event-driven loop may sleep, in milliseconds."""
+        if self.error_message:
+            remaining = self.error_message_until - time.monotonic()
+            return max(1, min(self.idle_timeout_ms, int(remaining * 1000) + 1))
+        return self.idle_timeout_ms
+
+    def _view_signature(self, mouse_pos):
+        """Everything the screen depends on; the event-driven loop redraws when it changes."""
+        state = self.state
+        return (
+            state.phase, state.current_player_idx, state.knocked_by, id(state.drawn_card),
+            tuple(map(id, self.user_hand)), tuple(map(id, self.agent_hands)),
+            len(self.draw_pile), id(self.discard_pile[-1]) if self.discard_pile else None,
+            self.peeked_card, self.bamboozle_first_card, self.vendetta_first_card,
+            self.error_message, self._hover_target(mouse_pos),
+        )
+
+    def _hover_target(self, pos):
+        """The clickable element under the mouse, as a hashable key (or None)."""
+        if not self.state.is_user_turn():
+            return None
+        for name, hand in (("user", self.user_hand), ("agent", self.agent_hands)):
+            for i, card in enumerate(hand):
+                if card is not None and card.rect and card.clickable and card.rect.collidepoint(pos):
+                    return (name, i)
+        for name, card in (("drawn", self.state.drawn_card),
+                           ("draw", self.draw_pile[-1] if self.draw_pile else None),
+                           ("discard", self.discard_pile[-1] if self.discard_pile else None)):
+            if card is not None and card.rect and card.clickable and card.rect.collidepoint(pos):
+                return (name, 0)
+        for name, button in (("knock", self.knock_button), ("done", self.done_button),
+                             ("eliminate", self.eliminate_button), ("add", self.add_button)):
+            if button.clickable and button.rect.collidepoint(pos):
+                return (name, 0)
+        return None
 
     def _main(self):
         """Start the game."""
@@ -542,5 +670,7 @@ class StoolPigeonGame:
 
 
 if __name__ == "__main__":
+    from events import EVENTS, CARDS
+    EVENTS.configure(CARDS, console=True)
     game = StoolPigeonGame(GUI=True, render_delay_sec=0.1)
     game._main()
\ No newline at end of file
@@ -1,5 +1,7 @@
 from enum import Enum, auto
 from cards import CardType
+from events import (EVENTS, ActionExecuted, ActionRejected, EffectActivated,
+                    CardMoved, CardsSwapped)
 
 class ActionType(Enum):
     """Types of actions a player can take."""
@@ -19,6 +21,8 @@ class ActionType(Enum):
 class Action: 
     """Represents a player action with optional targets."""
     
+    __slots__ = ("action_type", "target_player", "target_idx", "second_target")
+    
     def __init__(self, action_type, target_player=None, target_idx=None, second_target=None):
         self.action_type = action_type
         self.target_player = target_player
@@ -58,7 +62,9 @@ class Action:
     
     def execute_action(self, game, GamePhase):
         """Execute an action and update game state."""
-        print(f"Executing: {self.action_type}")
+        if EVENTS.actions:
+            EVENTS.emit(ActionExecuted(self.action_type, self.target_player,
+                                       self.target_idx, self.second_target))
         
         # Route to appropriate handler
         if self.action_type == ActionType.DRAW_FROM_PILE:
@@ -83,7 +89,8 @@ class Action:
         card = game.draw_pile.pop()
         game.state.drawn_card = card
         game.state.set_phase(GamePhase.DECIDE)
-        print(f"Drew: {card.card_type.name}" + (f" ({card.value})" if card.value else ""))
+        if EVENTS.cards:
+            EVENTS.emit(CardMoved(card.card_type, card.value, "draw_pile", "drawn"))
         
         self._activate_special_card_effect(game, GamePhase, card)
     
@@ -92,6 +99,8 @@ class Action:
         card = game.discard_pile.pop()
         game.state.drawn_card = card
         game.state.set_phase(GamePhase.DECIDE)
+        if EVENTS.cards:
+            EVENTS.emit(CardMoved(card.card_type, card.value, "discard_pile", "drawn"))
         
         self._activate_special_card_effect(game, GamePhase, card)
     
@@ -100,23 +109,25 @@ class Action:
         if card.card_type == CardType.STOOL_PIGEON:
             game.state.set_phase(GamePhase.STOOL_PIGEON_PEEK)
             game.state.pending_effect = CardType.STOOL_PIGEON
-            print("Stool Pigeon effect activated! Click any card to peek at it.")
         
         elif card.card_type == CardType.BAMBOOZLE:
             game.state.set_phase(GamePhase.BAMBOOZLE_SELECT)
             game.state.pending_effect = CardType.BAMBOOZLE
             game.state.clear_selection()
-            print("Bamboozle effect activated! Click two face-down cards to swap them.")
         
         elif card.card_type == CardType.VENDETTA:
             game.state.set_phase(GamePhase.VENDETTA_PEEK)
             game.state.pending_effect = CardType.VENDETTA
-            print("Vendetta effect activated! Peek at one card, then swap any two.")
         
         elif card.card_type == CardType.KINGPIN:
             game.state.set_phase(GamePhase.KINGPIN_CHOOSE)
             game.state.pending_effect = CardType.KINGPIN
-            print("Kingpin effect activated! Choose: Eliminate a card OR Add card to opponent.")
+        
+        else:
+            return
+        
+        if EVENTS.actions:
+            EVENTS.emit(EffectActivated(card.card_type))
     
     def _execute_keep_card(self, game, GamePhase):
         """Keep the drawn card by swapping it with a card in hand."""
@@ -125,13 +136,15 @@ class Action:
         
         # Validate swap
         if old_card is None:
-            print("Cannot swap with empty position!")
+            if EVENTS.actions:
+                EVENTS.emit(ActionRejected(self.action_type, "empty position"))
             if game.GUI:
                 game.show_error_message("This position is empty!")
             return
         
         if old_card.card_type == CardType.RAT:
-            print("Cannot swap out a RAT card! RAT cards are sticky and can only be removed by Kingpin.")
+            if EVENTS.actions:
+                EVENTS.emit(ActionRejected(self.action_type, "RAT cards can only be removed by Kingpin"))
             if game.GUI:
                 game.show_error_message("RAT cards are sticky! Cannot swap.")
             return
@@ -139,12 +152,19 @@ class Action:
         # Perform swap
         hand[self.target_idx] = game.state.drawn_card
         game.discard_pile.append(old_card)
+        if EVENTS.cards:
+            new_card = game.state.drawn_card
+            EVENTS.emit(CardMoved(new_card.card_type, new_card.value, "drawn", f"hand[{self.target_idx}]"))
+            EVENTS.emit(CardMoved(old_card.card_type, old_card.value, f"hand[{self.target_idx}]", "discard_pile"))
         game.state.drawn_card = None
         game.state.next_turn()
     
     def _execute_discard_drawn(self, game, GamePhase):
         """Discard the drawn card."""
-        game.discard_pile.append(game.state.drawn_card)
+        card = game.state.drawn_card
+        game.discard_pile.append(card)
+        if EVENTS.cards:
+            EVENTS.emit(CardMoved(card.card_type, card.value, "drawn", "discard_pile"))
         game.state.drawn_card = None
         game.state.next_turn()
     
@@ -163,7 +183,8 @@ class Action:
         
         # Validate swap
         if hand1[card1_idx] is None or hand2[card2_idx] is None:
-            print("Cannot swap with empty position!")
+            if EVENTS.actions:
+                EVENTS.emit(ActionRejected(self.action_type, "empty position"))
             if game.GUI:
                 game.show_error_message("Cannot swap with empty position!")
             game.bamboozle_first_card = None
@@ -172,7 +193,8 @@ class Action:
         
         # Perform swap (RAT cards CAN be swapped with Bamboozle/Vendetta)
         hand1[card1_idx], hand2[card2_idx] = hand2[card2_idx], hand1[card1_idx]
-        print(f"Swapped player {player1_idx} card {card1_idx} with player {player2_idx} card {card2_idx}")
+        if EVENTS.cards:
+            EVENTS.emit(CardsSwapped(player1_idx, card1_idx, player2_idx, card2_idx))
         
         # Clean up
         game.discard_pile.append(game.state.drawn_card)
@@ -186,14 +208,12 @@ class Action:
         eliminated_card = hand[self.target_idx]
         
         game.discard_pile.append(eliminated_card)
-        print(f"Kingpin eliminated: {eliminated_card.card_type.name}" + 
-              (f" ({eliminated_card.value})" if eliminated_card.value else ""))
+        if EVENTS.cards:
+            EVENTS.emit(CardMoved(eliminated_card.card_type, eliminated_card.value,
+                                  f"hand[{self.target_idx}]", "discard_pile"))
         
         hand[self.target_idx] = None
         
-        active_cards = sum(1 for card in hand if card is not None)
-        print(f"Player now has {active_cards} cards in hand")
-        
         # Clean up
         game.discard_pile.append(game.state.drawn_card)
         game.state.drawn_card = None
@@ -203,7 +223,8 @@ class Action:
     def _execute_kingpin_add(self, game, GamePhase):
         """Add a card to opponent's hand (Kingpin effect)."""
         if not game.draw_pile:
-            print("No cards left in draw pile! Cannot add card to opponent.")
+            if EVENTS.actions:
+                EVENTS.emit(ActionRejected(self.action_type, "draw pile is empty"))
             if game.GUI:
                 game.show_error_message("No cards left in draw pile!")
             return
@@ -212,9 +233,10 @@ class Action:
         opponent_hand = game.get_opponent_hand()
         opponent_hand.append(new_card)
         
-        opponent_name = "Agent" if game.state.is_user_turn() else "User"
-        print(f"Kingpin added card to {opponent_name}: {new_card.card_type.name}" + 
-              (f" ({new_card.value})" if new_card.value else ""))
+        if EVENTS.cards:
+            opponent_name = "agent" if game.state.is_user_turn() else "user"
+            EVENTS.emit(CardMoved(new_card.card_type, new_card.value, "draw_pile",
+                                  f"{opponent_name}_hand[{len(opponent_hand) - 1}]"))
         
         # Clean up
         game.discard_pile.append(game.state.drawn_card)
@@ -0,0 +1,109 @@
+"""
+Image cache for the pygame renderer.
+
+Every image is decoded from images/ once, converted to the display format
+for fast blits, and kept per (path, size) so cards and buttons blit a ready
+surface each frame. Paths that fail to load are remembered and not retried.
+
+Text is cached the same way: TEXT keeps the most recently rendered
+(font, text, color) surfaces in a bounded LRU, plus translucent overlay
+backgrounds per size, so steady-state frames render and allocate nothing.
+"""
+
+from collections import OrderedDict
+
+
+class AssetCache:
+    """Loads, converts and scales images on first use, then serves them from memory."""
+
+    def __init__(self):
+        self._surfaces = {}   # (path, size or None) -> Surface
+        self._missing = set()
+
+    def image(self, path, size=None):
+        """Return the surface for path scaled to size, or None if it can't be loaded."""
+        key = (path, size)
+        surface = self._surfaces.get(key)
+        if surface is not None or path in self._missing:
+            return surface
+
+        import pygame
+        original = self._surfaces.get((path, None))
+        if original is None:
+            try:
+                original = self._convert(pygame.image.load(path))
+            except (pygame.error, FileNotFoundError):
+                self._missing.add(path)
+                return None
+            self._surfaces[(path, None)] = original
+
+        surface = original if size is None else pygame.transform.scale(original, size)
+        self._surfaces[key] = surface
+        return surface
+
+    def preload(self, entries):
+        """Load (path, size) pairs up front so the first frames don't stall."""
+        for path, size in entries:
+            self.image(path, size)
+
+    def is_missing(self, path) -> bool:
+        return path in self._missing
+
+    def clear(self):
+        self._surfaces.clear()
+        self._missing.clear()
+
+    def _convert(self, surface):
+        import pygame
+        # convert() needs a display mode; before one is set, keep the raw surface.
+        if pygame.display.get_surface() is None:
+            return surface
+        if surface.get_flags() & pygame.SRCALPHA or surface.get_alpha() is not None:
+            return surface.convert_alpha()
+        return surface.convert()
+
+
+class TextCache:
+    """Bounded LRU of rendered text surfaces and overlay backgrounds."""
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._surfaces = OrderedDict()   # (font, text, color) -> Surface
+        self._overlays = {}              # (size, color, alpha) -> Surface
+
+    def render(self, font, text, color):
+        """Return font.render(text, True, color), rendering only on a miss."""
+        key = (font, text, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def overlay(self, size, color=(0, 0, 0), alpha=200):
+        """Return a filled surface of the given size with per-surface alpha."""
+        key = (tuple(size), tuple(color), alpha)
+        surface = self._overlays.get(key)
+        if surface is None:
+            import pygame
+            # Overlay sizes follow the message text; keep the set bounded too.
+            if len(self._overlays) >= self.max_size:
+                self._overlays.clear()
+            surface = pygame.Surface(key[0])
+            surface.set_alpha(alpha)
+            surface.fill(color)
+            self._overlays[key] = surface
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self._overlays.clear()
+
+
+ASSETS = AssetCache()
+TEXT = TextCache()
@@ -0,0 +1,471 @@
+"""
+Vectorized batch engine for Stool Pigeon.
+
+Holds N independent games of ref.StoolPigeonGame as NumPy arrays and steps
+them all together from an array of action indices. The rules mirror
+ref.StoolPigeonGame._apply_action, _do_draw, _end_turn and _calculate_scores;
+only the shuffle stream differs (NumPy instead of the random module).
+
+Games never rest in the DRAW phase: the draw that ref.apply_action performs
+before applying an action is done here at the end of each step, so every
+live game is always waiting on a decision from its current player.
+"""
+
+import numpy as np
+
+from ref import (StoolPigeonGame, ActionSpace, GamePhase,
+                 DECK_CODES as _DECK_BYTES, NUM_CARD_CODES, SPECIAL_CARD_CODES,
+                 CODE_STOOL_PIGEON, CODE_BAMBOOZLE, CODE_VENDETTA, CODE_KINGPIN,
+                 CODE_RAT, card_from_code)
+
+# =============================================================================
+# CARD CODES
+# =============================================================================
+
+# Cards are stored by their ref.Card code; 0 marks an empty slot.
+EMPTY = 0
+_CODE_TYPES = {code: card_type for card_type, code in SPECIAL_CARD_CODES.items()}
+
+
+def card_to_code(card) -> int:
+    return EMPTY if card is None else card.code
+
+
+DECK_CODES = np.frombuffer(_DECK_BYTES, dtype=np.int8).copy()
+DECK_SIZE = len(DECK_CODES)
+
+# Score of each code; the RAT entry is patched per game with the rat value.
+SCORE_TABLE = np.zeros(NUM_CARD_CODES, dtype=np.int16)
+SCORE_TABLE[1:13] = np.arange(1, 13)
+
+# =============================================================================
+# PHASE CODES
+# =============================================================================
+
+PHASE_DRAW = GamePhase.DRAW.value
+PHASE_DECIDE = GamePhase.DECIDE.value
+PHASE_RESOLVE_EFFECT = GamePhase.RESOLVE_EFFECT.value
+PHASE_VENDETTA_PEEK = GamePhase.VENDETTA_PEEK.value
+PHASE_VENDETTA_SWAP = GamePhase.VENDETTA_SWAP.value
+PHASE_FINAL_TURN = GamePhase.FINAL_TURN.value
+PHASE_GAME_OVER = GamePhase.GAME_OVER.value
+
+# =============================================================================
+# BATCH ENGINE
+# =============================================================================
+
+class BatchStoolPigeon:
+    """
+    N games of Stool Pigeon stepped together.
+
+    Crime scenes hold at most max_hand cards; KINGPIN_ADD is illegal against
+    a full crime scene, which is the only departure from ref.StoolPigeonGame.
+    Finished games are dealt again at the end of step() when auto_reset is
+    set, after their outcome has been returned.
+    """
+
+    def __init__(self, num_games: int, max_hand: int = 8, seed=None, auto_reset: bool = True):
+        N, H, D = num_games, max_hand, DECK_SIZE
+        self.num_games = N
+        self.max_hand = H
+        self.action_space = ActionSpace(H)
+        self._pair_a = np.array([a for a, _ in self.action_space.pairs], dtype=np.intp)
+        self._pair_b = np.array([b for _, b in self.action_space.pairs], dtype=np.intp)
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+
+        # Piles are filled from index 0; the top card sits at [len - 1].
+        self.scene = np.zeros((N, 2, H), dtype=np.int8)
+        self.scene_size = np.zeros((N, 2), dtype=np.int8)
+        self.memory = np.zeros((N, 2, H), dtype=np.int8)
+        self.opp_memory = np.zeros((N, 2, H), dtype=np.int8)
+        self.draw_pile = np.zeros((N, D), dtype=np.int8)
+        self.draw_len = np.zeros(N, dtype=np.int16)
+        self.discard_pile = np.zeros((N, D), dtype=np.int8)
+        self.discard_len = np.zeros(N, dtype=np.int16)
+        self.phase = np.zeros(N, dtype=np.int8)
+        self.pending_effect = np.zeros(N, dtype=np.int8)
+        self.current_player = np.zeros(N, dtype=np.int8)
+        self.knocked_by = np.full(N, -1, dtype=np.int8)
+        self.drawn_card = np.zeros(N, dtype=np.int8)
+        self.turn_count = np.zeros(N, dtype=np.int32)
+        self.done = np.zeros(N, dtype=bool)
+        self.scores = np.zeros((N, 2), dtype=np.int16)
+        self.winner = np.full(N, -1, dtype=np.int8)
+
+        self._all = np.arange(N)
+        self._cols = np.arange(H)
+        self._deck_cols = np.arange(D)
+        self.reset()
+
+    # =========================================================================
+    # SETUP
+    # =========================================================================
+
+    def reset(self, idx=None):
+        """Deal fresh games into the given rows (all rows by default)."""
+        g = self._all if idx is None else np.asarray(idx)
+        k = len(g)
+        if k == 0:
+            return
+        D = DECK_SIZE
+        deck = DECK_CODES[np.argsort(self.rng.random((k, D)), axis=1)]
+
+        # Same deal order as ref: each player pops four cards off the top.
+        self.scene[g] = EMPTY
+        self.scene[g, 0, :4] = deck[:, D-1:D-5:-1]
+        self.scene[g, 1, :4] = deck[:, D-5:D-9:-1]
+        self.scene_size[g] = 4
+        self.memory[g] = EMPTY
+        self.memory[g, :, :2] = self.scene[g, :, :2]
+        self.opp_memory[g] = EMPTY
+        self.draw_pile[g] = EMPTY
+        self.draw_pile[g, :D-8] = deck[:, :D-8]
+        self.draw_len[g] = D - 8
+        self.discard_pile[g] = EMPTY
+        self.discard_len[g] = 0
+        self.phase[g] = PHASE_DRAW
+        self.pending_effect[g] = EMPTY
+        self.current_player[g] = 0
+        self.knocked_by[g] = -1
+        self.drawn_card[g] = EMPTY
+        self.turn_count[g] = 0
+        self.done[g] = False
+        self.scores[g] = 0
+        self.winner[g] = -1
+        self._do_draw(g)
+
+    # =========================================================================
+    # LEGAL ACTIONS
+    # =========================================================================
+
+    def legal_action_mask(self, out=None) -> np.ndarray:
+        """Return an (N, action_space.size) bool mask of legal actions per game."""
+        L, H = self.action_space, self.max_hand
+        m = np.zeros((self.num_games, L.size), dtype=bool) if out is None else out
+        m[:] = False
+
+        p = self.current_player
+        own_size = self.scene_size[self._all, p]
+        opp_size = self.scene_size[self._all, 1 - p]
+        own_slots = self._cols < own_size[:, None]
+        opp_slots = self._cols < opp_size[:, None]
+        phase, pending = self.phase, self.pending_effect
+        resolve = phase == PHASE_RESOLVE_EFFECT
+
+        decide = (phase == PHASE_DECIDE) | (phase == PHASE_FINAL_TURN)
+        m[:, L.swap_blind:L.swap_blind + H] = decide[:, None] & own_slots
+        m[:, L.discard] = decide
+        m[:, L.knock] = (phase == PHASE_DECIDE) & (self.knocked_by < 0)
+
+        peek = (resolve & (pending == CODE_STOOL_PIGEON)) | (phase == PHASE_VENDETTA_PEEK)
+        m[:, L.peek_own:L.peek_own + H] = peek[:, None] & own_slots
+        m[:, L.peek_opponent:L.peek_opponent + H] = peek[:, None] & opp_slots
+
+        swap = (resolve & (pending == CODE_BAMBOOZLE)) | (phase == PHASE_VENDETTA_SWAP)
+        slots = np.concatenate((own_slots, opp_slots), axis=1)
+        m[:, L.swap_any_two:L.kingpin_eliminate] = (
+            swap[:, None] & slots[:, self._pair_a] & slots[:, self._pair_b])
+
+        kingpin = resolve & (pending == CODE_KINGPIN)
+        not_rat = self.scene[self._all, p] != CODE_RAT
+        m[:, L.kingpin_eliminate:L.kingpin_add] = kingpin[:, None] & own_slots & not_rat
+        m[:, L.kingpin_add] = kingpin & (self.draw_len > 0) & (opp_size < H)
+        m[:, L.skip_effect] = (resolve | (phase == PHASE_VENDETTA_PEEK) |
+                               (phase == PHASE_VENDETTA_SWAP))
+
+        m[self.done] = False
+        return m
+
+    # =========================================================================
+    # STEPPING
+    # =========================================================================
+
+    def step(self, actions, check: bool = False):
+        """
+        Apply one action index per game and advance every live game.
+
+        Entries for games that are already done are ignored. Returns
+        (finished, winner, scores): finished marks games that ended on this
+        step, winner is -1 for a tie or an unfinished game. With auto_reset
+        those games are dealt again before returning.
+        """
+        actions = np.asarray(actions)
+        live = np.flatnonzero(~self.done)
+        a = actions[live].astype(np.int32)
+        if check:
+            legal = self.legal_action_mask()[live, a]
+            if not legal.all():
+                bad = live[~legal]
+                raise ValueError(f"Illegal actions for games {bad.tolist()}")
+
+        L, H = self.action_space, self.max_hand
+        p = self.current_player[live].astype(np.intp)
+        to_end = []
+        to_resolve = []
+
+        # SWAP_BLIND
+        m = a < L.discard
+        if m.any():
+            g, pp, i = live[m], p[m], a[m]
+            drawn = self.drawn_card[g]
+            self._push_discard(g, self.scene[g, pp, i])
+            self.scene[g, pp, i] = drawn
+            self.memory[g, pp, i] = drawn
+            self.opp_memory[g, 1 - pp, i] = EMPTY
+            self.drawn_card[g] = EMPTY
+            to_end.append(g)
+
+        # DISCARD
+        m = a == L.discard
+        if m.any():
+            g = live[m]
+            card = self.drawn_card[g]
+            self._push_discard(g, card)
+            self.drawn_card[g] = EMPTY
+            effect = ((card == CODE_STOOL_PIGEON) | (card == CODE_BAMBOOZLE) |
+                      (card == CODE_KINGPIN))
+            vendetta = card == CODE_VENDETTA
+            self.pending_effect[g[effect]] = card[effect]
+            self.phase[g[effect]] = PHASE_RESOLVE_EFFECT
+            self.pending_effect[g[vendetta]] = CODE_VENDETTA
+            self.phase[g[vendetta]] = PHASE_VENDETTA_PEEK
+            to_end.append(g[~(effect | vendetta)])
+
+        # KNOCK
+        m = a == L.knock
+        if m.any():
+            g = live[m]
+            self.knocked_by[g] = p[m]
+            self.phase[g] = PHASE_FINAL_TURN
+            self.current_player[g] = 1 - p[m]
+            self.turn_count[g] += 1
+            self._do_draw(g)
+
+        # PEEK_OWN / PEEK_OPPONENT
+        m = (a >= L.peek_own) & (a < L.peek_opponent)
+        if m.any():
+            g, pp, i = live[m], p[m], a[m] - L.peek_own
+            self.memory[g, pp, i] = self.scene[g, pp, i]
+            to_resolve.append(g)
+        m = (a >= L.peek_opponent) & (a < L.swap_any_two)
+        if m.any():
+            g, pp, i = live[m], p[m], a[m] - L.peek_opponent
+            self.opp_memory[g, pp, i] = self.scene[g, 1 - pp, i]
+            to_resolve.append(g)
+
+        # SWAP_ANY_TWO
+        m = (a >= L.swap_any_two) & (a < L.kingpin_eliminate)
+        if m.any():
+            g, pp = live[m], p[m]
+            j = a[m] - L.swap_any_two
+            sa, sb = self._pair_a[j], self._pair_b[j]
+            rel_a, ca = sa // H, sa % H
+            rel_b, cb = sb // H, sb % H
+            pa = np.where(rel_a == 0, pp, 1 - pp)
+            pb = np.where(rel_b == 0, pp, 1 - pp)
+            card_a = self.scene[g, pa, ca]
+            self.scene[g, pa, ca] = self.scene[g, pb, cb]
+            self.scene[g, pb, cb] = card_a
+            # The swapping player forgets both slots.
+            for rel, c in ((rel_a, ca), (rel_b, cb)):
+                own = rel == 0
+                self.memory[g[own], pp[own], c[own]] = EMPTY
+                self.opp_memory[g[~own], pp[~own], c[~own]] = EMPTY
+            to_resolve.append(g)
+
+        # KINGPIN_ELIMINATE
+        m = (a >= L.kingpin_eliminate) & (a < L.kingpin_add)
+        if m.any():
+            g, pp, i = live[m], p[m], a[m] - L.kingpin_eliminate
+            self._push_discard(g, self.scene[g, pp, i])
+            src = self._cols + (self._cols >= i[:, None])
+            src = np.minimum(src, H - 1)
+            for arr in (self.scene, self.memory):
+                row = np.take_along_axis(arr[g, pp], src, axis=1)
+                row[:, -1] = EMPTY
+                arr[g, pp] = row
+            self.scene_size[g, pp] -= 1
+            to_resolve.append(g)
+
+        # KINGPIN_ADD
+        m = a == L.kingpin_add
+        if m.any():
+            g, pp = live[m], p[m]
+            has = self.draw_len[g] > 0
+            gh, qh = g[has], 1 - pp[has]
+            card = self._pop_draw(gh)
+            self.scene[gh, qh, self.scene_size[gh, qh]] = card
+            self.scene_size[gh, qh] += 1
+            to_resolve.append(g)
+
+        # SKIP_EFFECT
+        m = a == L.skip_effect
+        if m.any():
+            to_resolve.append(live[m])
+
+        if to_resolve:
+            self._resolve_effect_done(np.concatenate(to_resolve))
+        if to_end:
+            self._end_turn(np.concatenate(to_end))
+
+        # The draw ref.apply_action would do before the next action.
+        waiting = np.flatnonzero((self.phase == PHASE_DRAW) & ~self.done)
+        self._do_draw(waiting)
+
+        finished = np.zeros(self.num_games, dtype=bool)
+        finished[live] = self.done[live]
+        winner = np.where(finished, self.winner, -1).astype(np.int8)
+        scores = self.scores.copy()
+        if self.auto_reset and finished.any():
+            self.reset(np.flatnonzero(finished))
+        return finished, winner, scores
+
+    # =========================================================================
+    # RULE HELPERS (vectorized over game indices)
+    # =========================================================================
+
+    def _push_discard(self, g, cards):
+        self.discard_pile[g, self.discard_len[g]] = cards
+        self.discard_len[g] += 1
+
+    def _pop_draw(self, g):
+        self.draw_len[g] -= 1
+        return self.draw_pile[g, self.draw_len[g]]
+
+    def _resolve_effect_done(self, g):
+        vendetta = self.phase[g] == PHASE_VENDETTA_PEEK
+        self.phase[g[vendetta]] = PHASE_VENDETTA_SWAP
+        rest = g[~vendetta]
+        self.pending_effect[rest] = EMPTY
+        self._end_turn(rest)
+
+    def _end_turn(self, g):
+        final = self.phase[g] == PHASE_FINAL_TURN
+        over = g[final]
+        self.phase[over] = PHASE_GAME_OVER
+        self._calculate_scores(over)
+
+        rest = g[~final]
+        knocked = self.knocked_by[rest] >= 0
+        k = rest[knocked]
+        self.phase[k] = PHASE_FINAL_TURN
+        self.current_player[k] = 1 - self.knocked_by[k]
+        self.turn_count[k] += 1
+        self._do_draw(k)
+
+        o = rest[~knocked]
+        self.current_player[o] = 1 - self.current_player[o]
+        self.turn_count[o] += 1
+        self.phase[o] = PHASE_DRAW
+
+    def _do_draw(self, g):
+        if len(g) == 0:
+            return
+        empty = self.draw_len[g] == 0
+        if empty.any():
+            e = g[empty]
+            can_reshuffle = self.discard_len[e] > 1
+            self._reshuffle(e[can_reshuffle])
+            over = e[~can_reshuffle]
+            self.phase[over] = PHASE_GAME_OVER
+            self._calculate_scores(over)
+            g = np.concatenate((g[~empty], e[can_reshuffle]))
+
+        self.drawn_card[g] = self._pop_draw(g)
+        not_final = self.phase[g] != PHASE_FINAL_TURN
+        self.phase[g[not_final]] = PHASE_DECIDE
+
+    def _reshuffle(self, g):
+        """Shuffle all but the top discard back into the draw pile."""
+        if len(g) == 0:
+            return
+        keep = (self.discard_len[g] - 1).astype(np.intp)
+        top = self.discard_pile[g, keep]
+        in_pile = self._deck_cols < keep[:, None]
+        keys = np.where(in_pile, self.rng.random((len(g), DECK_SIZE)), 2.0)
+        order = np.argsort(keys, axis=1)
+        shuffled = np.take_along_axis(self.discard_pile[g], order, axis=1)
+        self.draw_pile[g] = np.where(in_pile, shuffled, EMPTY)
+        self.draw_len[g] = keep
+        self.discard_pile[g] = EMPTY
+        self.discard_pile[g, 0] = top
+        self.discard_len[g] = 1
+
+    def _calculate_scores(self, g):
+        if len(g) == 0:
+            return
+        top = self.draw_pile[g, np.maximum(self.draw_len[g] - 1, 0)]
+        numbered = (self.draw_len[g] > 0) & (top >= 1) & (top <= 12)
+        rat_value = np.where(numbered, top, 0).astype(np.int16)
+
+        scene = self.scene[g]
+        values = np.where(scene == CODE_RAT, rat_value[:, None, None], SCORE_TABLE[scene])
+        s = values.sum(axis=2)
+        self.scores[g] = s
+        self.winner[g] = np.where(s[:, 0] < s[:, 1], 0, np.where(s[:, 1] < s[:, 0], 1, -1))
+        self.done[g] = True
+
+    # =========================================================================
+    # CONVERSION TO AND FROM ref.StoolPigeonGame
+    # =========================================================================
+
+    def export_game(self, i: int) -> StoolPigeonGame:
+        """Build a headless ref.StoolPigeonGame holding the state of game i."""
+        game = StoolPigeonGame(GUI=False)
+        cards = lambda row, n: [card_from_code(c) for c in row[:n]]
+        known = lambda row: {k: card_from_code(c) for k, c in enumerate(row) if c != EMPTY}
+        for p, player in enumerate(game.players):
+            player["crime_scene"] = cards(self.scene[i, p], self.scene_size[i, p])
+            player["memory"] = known(self.memory[i, p])
+            player["opp_memory"] = known(self.opp_memory[i, p])
+        game.draw_pile = cards(self.draw_pile[i], self.draw_len[i])
+        game.discard_pile = cards(self.discard_pile[i], self.discard_len[i])
+        game.phase = GamePhase(int(self.phase[i]))
+        game.pending_effect = _CODE_TYPES.get(int(self.pending_effect[i]))
+        game.current_player_idx = int(self.current_player[i])
+        game.knocked_by = None if self.knocked_by[i] < 0 else int(self.knocked_by[i])
+        game.drawn_card = card_from_code(self.drawn_card[i])
+        game.turn_count = int(self.turn_count[i])
+        game.done = bool(self.done[i])
+        if game.done:
+            game.scores = (int(self.scores[i, 0]), int(self.scores[i, 1]))
+            game.winner = None if self.winner[i] < 0 else int(self.winner[i])
+        game.rebuild_card_counts()
+        game.rebuild_zobrist()
+        return game
+
+    def load_game(self, i: int, game: StoolPigeonGame):
+        """Copy the rule state of a ref.StoolPigeonGame into row i."""
+        codes = lambda cards: [card_to_code(c) for c in cards]
+        self.scene[i] = EMPTY
+        self.memory[i] = EMPTY
+        self.opp_memory[i] = EMPTY
+        for p, player in enumerate(game.players):
+            scene = player["crime_scene"]
+            if len(scene) > self.max_hand:
+                raise ValueError(f"Crime scene of {len(scene)} cards exceeds max_hand")
+            self.scene[i, p, :len(scene)] = codes(scene)
+            self.scene_size[i, p] = len(scene)
+            for k, c in player["memory"].items():
+                self.memory[i, p, k] = card_to_code(c)
+            for k, c in player["opp_memory"].items():
+                self.opp_memory[i, p, k] = card_to_code(c)
+        self.draw_pile[i] = EMPTY
+        self.draw_pile[i, :len(game.draw_pile)] = codes(game.draw_pile)
+        self.draw_len[i] = len(game.draw_pile)
+        self.discard_pile[i] = EMPTY
+        self.discard_pile[i, :len(game.discard_pile)] = codes(game.discard_pile)
+        self.discard_len[i] = len(game.discard_pile)
+        self.phase[i] = game.phase.value
+        self.pending_effect[i] = (EMPTY if game.pending_effect is None
+                                  else SPECIAL_CARD_CODES[game.pending_effect])
+        self.current_player[i] = game.current_player_idx
+        self.knocked_by[i] = -1 if game.knocked_by is None else game.knocked_by
+        self.drawn_card[i] = card_to_code(game.drawn_card)
+        self.turn_count[i] = game.turn_count
+        self.done[i] = game.done
+        self.scores[i] = game.scores
+        self.winner[i] = -1 if game.winner is None else game.winner
+        if self.phase[i] == PHASE_DRAW and not game.done:
+            self._do_draw(np.array([i]))
@@ -0,0 +1,232 @@
+"""
+Belief tracking over unseen cards for ref.StoolPigeonGame.
+
+The engine's players[i]["memory"] / ["opp_memory"] entries are deleted as
+soon as a card moves, even when the move was public. BeliefTracker follows
+one player's view of the game action by action instead:
+
+- remaining counts of every card code the observer hasn't located
+  (deck composition minus the discard pile, its own drawn card and every
+  slot it knows),
+- per crime-scene slot, the known card code or 0 for unknown.
+
+Bamboozle/Vendetta swaps name their slots, so known codes move with the
+cards instead of being forgotten; blind swaps, Kingpin adds and reshuffles
+turn the affected slots back into unknowns. Every unknown slot shares the
+same distribution (the remaining counts, normalized), so updates are O(1)
+per action and sampling complete hidden states needs no rescans.
+
+The tracker only sees what its observer would, so it must be told about
+every transition. Drive the game through it:
+
+    belief = BeliefTracker(game, observer=1)
+    belief.draw(game)                 # instead of game._do_draw()
+    belief.apply(game, action)        # instead of game.apply_action(action)
+
+or call observe_draw(game) / observe_action(game, action, actor) right after
+making the move yourself.
+
+After a reshuffle the returned discards are pooled with the other unseen
+cards, although strictly they can only be in the draw pile; reshuffles are
+rare enough that the tracker accepts this approximation.
+"""
+
+import numpy as np
+
+from ref import StoolPigeonGame, ActionType, GamePhase, CARDS, DECK_CODES, NUM_CARD_CODES
+
+UNKNOWN = 0
+
+_DECK_COUNTS = np.bincount(np.frombuffer(DECK_CODES, dtype=np.uint8),
+                           minlength=NUM_CARD_CODES).tolist()
+
+# =============================================================================
+# BELIEF TRACKER
+# =============================================================================
+
+class BeliefTracker:
+    """One player's knowledge of where the cards are."""
+
+    def __init__(self, game: StoolPigeonGame, observer: int):
+        self.observer = observer
+        self.counts = list(_DECK_COUNTS)      # Unseen cards per code
+        self.discard = [card.code for card in game.discard_pile]
+        for code in self.discard:
+            self.counts[code] -= 1
+
+        self.drawn = UNKNOWN                  # Observer's drawn card, if holding one
+        self._sync_drawn(game)
+
+        me = game.players[observer]
+        known = {observer: me["memory"], 1 - observer: me["opp_memory"]}
+        self.scenes = []
+        for p_idx, player in enumerate(game.players):
+            scene = [UNKNOWN] * len(player["crime_scene"])
+            for idx, card in known[p_idx].items():
+                scene[idx] = self._reveal(UNKNOWN, card.code)
+            self.scenes.append(scene)
+
+    # =========================================================================
+    # DRIVING THE GAME
+    # =========================================================================
+
+    def draw(self, game: StoolPigeonGame):
+        """game._do_draw(), then observe it."""
+        game._do_draw()
+        self.observe_draw(game)
+
+    def apply(self, game: StoolPigeonGame, action):
+        """game.apply_action(action), then observe it."""
+        if game.phase == GamePhase.DRAW:
+            self.draw(game)
+        actor = game.current_player_idx
+        game.apply_action(action)
+        self.observe_action(game, action, actor)
+
+    # =========================================================================
+    # OBSERVATIONS
+    # =========================================================================
+
+    def observe_draw(self, game: StoolPigeonGame):
+        """Update after a DRAW-phase draw."""
+        self._sync_piles(game)
+        self._sync_drawn(game)
+
+    def observe_action(self, game: StoolPigeonGame, action, actor: int):
+        """Update after actor's action has been applied to game."""
+        me = self.observer
+        scene = self.scenes[actor]
+        kind = action.action_type
+
+        if kind == ActionType.SWAP_BLIND:
+            idx = action.target_idx
+            self._discard(self._reveal(scene[idx], game.discard_pile[-1].code))
+            # Our own drawn card stays known; the opponent's is still unseen.
+            scene[idx] = self.drawn if actor == me else UNKNOWN
+            self.drawn = UNKNOWN
+
+        elif kind == ActionType.DISCARD:
+            code = game.discard_pile[-1].code
+            self._discard(code if actor == me else self._reveal(UNKNOWN, code))
+            self.drawn = UNKNOWN
+
+        elif kind == ActionType.KNOCK:
+            # The knocker's drawn card leaves the game unseen by the opponent.
+            self.drawn = UNKNOWN
+
+        elif kind == ActionType.PEEK_OWN:
+            if actor == me:
+                idx = action.target_idx
+                scene[idx] = self._reveal(scene[idx], game.players[me]["memory"][idx].code)
+
+        elif kind == ActionType.PEEK_OPPONENT:
+            if actor == me:
+                idx = action.target_idx
+                opp_scene = self.scenes[1 - me]
+                opp_scene[idx] = self._reveal(opp_scene[idx],
+                                              game.players[me]["opp_memory"][idx].code)
+
+        elif kind == ActionType.SWAP_ANY_TWO:
+            # Target players are relative to the actor: 0 = actor, 1 = opponent
+            s1 = self.scenes[actor if action.target_player == 0 else 1 - actor]
+            s2 = self.scenes[actor if action.target_player2 == 0 else 1 - actor]
+            i1, i2 = action.target_idx, action.target_idx2
+            s1[i1], s2[i2] = s2[i2], s1[i1]
+
+        elif kind == ActionType.KINGPIN_ELIMINATE:
+            idx = action.target_idx
+            self._discard(self._reveal(scene.pop(idx), game.discard_pile[-1].code))
+
+        elif kind == ActionType.KINGPIN_ADD:
+            opp_scene = self.scenes[1 - actor]
+            if len(opp_scene) < len(game.players[1 - actor]["crime_scene"]):
+                opp_scene.append(UNKNOWN)
+
+        self._sync_piles(game)
+        self._sync_drawn(game)
+
+    def _reveal(self, known: int, code: int) -> int:
+        """Record that a slot holding known (maybe UNKNOWN) turned out to be code."""
+        if known != code:
+            if known != UNKNOWN:
+                self.counts[known] += 1
+            self.counts[code] -= 1
+        return code
+
+    def _discard(self, code: int):
+        self.discard.append(code)
+
+    def _sync_piles(self, game: StoolPigeonGame):
+        # A reshuffle leaves only the top discard behind; the rest go back
+        # into the (unseen) draw pile.
+        if len(game.discard_pile) < len(self.discard):
+            for code in self.discard[:-1]:
+                self.counts[code] += 1
+            del self.discard[:-1]
+
+    def _sync_drawn(self, game: StoolPigeonGame):
+        if (self.drawn == UNKNOWN and game.drawn_card is not None and
+                game.current_player_idx == self.observer and not game.done):
+            self.drawn = game.drawn_card.code
+            self.counts[self.drawn] -= 1
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    def unseen_total(self) -> int:
+        return sum(self.counts)
+
+    def slot_distribution(self, player_idx: int) -> np.ndarray:
+        """Probability of each card code per slot, shape (slots, NUM_CARD_CODES)."""
+        scene = np.asarray(self.scenes[player_idx], dtype=np.intp)
+        total = self.unseen_total()
+        rows = np.zeros((len(scene), NUM_CARD_CODES))
+        if total:
+            rows[scene == UNKNOWN] = np.asarray(self.counts) / total
+        known = np.flatnonzero(scene != UNKNOWN)
+        rows[known, scene[known]] = 1.0
+        return rows
+
+    def known_scene(self, player_idx: int) -> list:
+        """The player's crime scene as Cards, None where unknown."""
+        return [CARDS[code] if code else None for code in self.scenes[player_idx]]
+
+    def unseen_cards(self) -> list:
+        """One Card per unseen card, in code order."""
+        return [CARDS[code] for code, n in enumerate(self.counts) for _ in range(n)]
+
+    def sample(self, game: StoolPigeonGame, n: int, rng: np.random.Generator = None):
+        """
+        Sample n complete hidden states at once.
+
+        Returns (scenes, drawn, draw_pile): per-player (n, slots) code arrays,
+        an (n,) array with the current player's drawn card code (0 if none)
+        and an (n, len(game.draw_pile)) array of draw pile codes, top last.
+        """
+        rng = rng or np.random.default_rng()
+        pool = np.repeat(np.arange(NUM_CARD_CODES, dtype=np.int8), self.counts)
+        # One independent permutation of the unseen pool per sample
+        order = rng.random((n, len(pool))).argsort(axis=1)
+        dealt = pool[order]
+
+        pos = 0
+        scenes = []
+        for scene in self.scenes:
+            codes = np.asarray(scene, dtype=np.int8)
+            out = np.broadcast_to(codes, (n, len(codes))).copy()
+            unknown = np.flatnonzero(codes == UNKNOWN)
+            out[:, unknown] = dealt[:, pos:pos + len(unknown)]
+            pos += len(unknown)
+            scenes.append(out)
+
+        if game.drawn_card is None:
+            drawn = np.zeros(n, dtype=np.int8)
+        elif self.drawn != UNKNOWN:
+            drawn = np.full(n, self.drawn, dtype=np.int8)
+        else:
+            drawn = dealt[:, pos].copy()
+            pos += 1
+
+        draw_pile = dealt[:, pos:pos + len(game.draw_pile)]
+        return scenes, drawn, draw_pile
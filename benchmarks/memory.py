@@ -0,0 +1,101 @@
+"""
+Memory per live game, measured with tracemalloc.
+
+Builds --games games of each engine, keeps them alive and reports the
+traced bytes per game, plus the size of one instance (object and its
+__dict__, if it has one) of the small classes every game holds many of.
+ref games are advanced a few random plies first so their piles and
+memories look like a game in progress (the agents used for that aren't
+counted); GUI-engine games are built with GUI=False.
+
+Usage: python benchmarks/memory.py [--games 1000] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ref
+import StoolPigeonGame as gui
+from cards import Card, CardType
+from actions import Action
+from button import Button
+from game_state import GameState
+
+
+def _ref_game(seed: int):
+    game = ref.StoolPigeonGame(GUI=False, seed=seed)
+    agents = [ref.RandomAgent(game, 0, seed=seed), ref.RandomAgent(game, 1, seed=seed + 1)]
+    for _ in range(10):
+        if game.done:
+            break
+        if game.phase == ref.GamePhase.DRAW:
+            game._do_draw()
+        game.apply_action(agents[game.current_player_idx].choose_action())
+    return game
+
+
+def _gui_game(seed: int):
+    return gui.StoolPigeonGame(GUI=False, seed=seed)
+
+
+def bytes_per_game(make, num_games: int) -> float:
+    make(0)     # Warm up caches and interned objects outside the measurement
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    games = [make(seed) for seed in range(1, num_games + 1)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del games
+    return total / num_games
+
+
+def instance_size(obj) -> int:
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def measure(num_games: int) -> dict:
+    return {
+        "ref_game_bytes": bytes_per_game(_ref_game, num_games),
+        "gui_game_bytes": bytes_per_game(_gui_game, num_games),
+        "instance_bytes": {
+            "cards.Card": instance_size(Card(CardType.NUMBERED, 5)),
+            "actions.Action": instance_size(Action.keep_card(0)),
+            "button.Button": instance_size(Button((0, 0), 10, 10, "images/knock-button.png")),
+            "game_state.GameState": instance_size(GameState()),
+            "ref.Card": instance_size(ref.Card(ref.CardType.NUMBERED, 5)),
+            "ref.Action": instance_size(ref.Action(ref.ActionType.SWAP_BLIND, 0)),
+            "ref.Button": instance_size(ref.Button(0, 0, 10, 10, "DRAW", (0, 0, 0), (0, 0, 0))),
+            "ref.ClickableCard": instance_size(ref.ClickableCard(0, 0, 10, 10)),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per live game")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = measure(args.games)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'ref game':<24}{report['ref_game_bytes']:>10.0f} bytes")
+    print(f"{'GUI engine game':<24}{report['gui_game_bytes']:>10.0f} bytes")
+    print("\nPer instance:")
+    for name, size in report["instance_bytes"].items():
+        print(f"{name:<24}{size:>10} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Load generator for server.py.
+
+Starts a server on a Unix socket (or uses --connect HOST:PORT / --unix
+PATH of a running one), opens --sessions games spread over --connections
+client connections, then keeps every connection busy playing random legal
+moves against the "random" agent until --actions moves have been made in
+total. Reports the median and tail request latency of the moves and, for
+a server it started itself, the server's resident memory with all sessions
+open.
+
+With --searching N, N more connections play against --search-agent for
+the whole run (not timed), so the latencies show how much agent searches
+slow the other sessions down.
+
+Usage: python benchmarks/server_load.py [--sessions 10000] [--connections 50]
+                                        [--actions 100000] [--searching 4] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_mb(pid: int) -> float:
+    """Resident set size of a process, from /proc (Linux only)."""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+async def _request(reader, writer, payload: dict) -> dict:
+    writer.write((json.dumps(payload) + "\n").encode())
+    return json.loads(await reader.readline())
+
+
+async def _client(open_connection, sessions: int, actions: int, latencies: list, rng: random.Random,
+                  ready: asyncio.Event, created: list):
+    reader, writer = await open_connection()
+    games = []
+    for _ in range(sessions):
+        response = await _request(reader, writer, {"op": "new", "agent": "random",
+                                                   "seed": rng.getrandbits(32)})
+        games.append(response)
+    created.append(len(games))
+    await ready.wait()
+
+    clock = time.perf_counter
+    done = 0
+    while done < actions:
+        for i, state in enumerate(games):
+            if done >= actions:
+                break
+            if not state["legal"]:
+                # Game over: replace it with a new one (not timed)
+                await _request(reader, writer, {"op": "close", "session": state["session"]})
+                state = games[i] = await _request(reader, writer, {
+                    "op": "new", "agent": "random", "seed": rng.getrandbits(32)})
+            start = clock()
+            games[i] = await _request(reader, writer, {"op": "act", "session": state["session"],
+                                                       "action": rng.choice(state["legal"])})
+            latencies.append(clock() - start)
+            if not games[i]["ok"]:
+                raise RuntimeError(games[i]["error"])
+            done += 1
+    writer.close()
+
+
+async def _searcher(open_connection, agent: str, rng: random.Random, stop: asyncio.Event,
+                    moves: list):
+    reader, writer = await open_connection()
+    state = {"legal": []}
+    while not stop.is_set():
+        if not state["legal"]:
+            if "session" in state:
+                await _request(reader, writer, {"op": "close", "session": state["session"]})
+            state = await _request(reader, writer, {"op": "new", "agent": agent,
+                                                    "seed": rng.getrandbits(32)})
+        else:
+            state = await _request(reader, writer, {"op": "act", "session": state["session"],
+                                                    "action": rng.choice(state["legal"])})
+        if not state["ok"]:
+            raise RuntimeError(state["error"])
+        moves.append(len(state["agent_moves"]))
+    writer.close()
+
+
+async def run_load(open_connection, num_sessions: int, connections: int, num_actions: int,
+                   on_ready=None, searching: int = 0, search_agent: str = "ismcts-1000") -> dict:
+    rng = random.Random(0)
+    latencies = []
+    created = []
+    ready = asyncio.Event()
+    per_conn = [num_sessions // connections + (i < num_sessions % connections)
+                for i in range(connections)]
+    actions = [num_actions // connections] * connections
+    clients = [asyncio.create_task(_client(open_connection, n, a, latencies,
+                                           random.Random(rng.getrandbits(64)), ready, created))
+               for n, a in zip(per_conn, actions)]
+    while len(created) < connections:
+        await asyncio.sleep(0.05)
+        for task in clients:
+            if task.done() and task.exception():
+                raise task.exception()
+    report = {"sessions": sum(created)}
+    if on_ready:
+        report.update(on_ready())
+
+    stop = asyncio.Event()
+    search_moves = []
+    searchers = [asyncio.create_task(_searcher(open_connection, search_agent,
+                                               random.Random(rng.getrandbits(64)), stop, search_moves))
+                 for _ in range(searching)]
+    while len(search_moves) < searching:
+        await asyncio.sleep(0.05)     # Every searcher is under way
+
+    start = time.perf_counter()
+    search_start = sum(search_moves)
+    ready.set()
+    await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    if searching:
+        report["search_moves"] = sum(search_moves) - search_start
+    await asyncio.gather(*searchers)
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3
+    report.update({
+        "actions": len(latencies),
+        "actions_per_sec": len(latencies) / elapsed,
+        "latency_ms_p50": pick(0.5),
+        "latency_ms_p90": pick(0.9),
+        "latency_ms_p99": pick(0.99),
+    })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="server.py load generator")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--actions", type=int, default=100000)
+    parser.add_argument("--connect", default=None, help="HOST:PORT of a running server")
+    parser.add_argument("--unix", default=None, help="Unix socket of a running server")
+    parser.add_argument("--searching", type=int, default=0,
+                        help="extra connections playing --search-agent throughout")
+    parser.add_argument("--search-agent", default="ismcts-1000")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    process = None
+    path = args.unix
+    if args.connect is None and path is None:
+        path = os.path.join(tempfile.mkdtemp(), "server.sock")
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--unix", path,
+                                    "--max-sessions", str(args.sessions * 2)],
+                                   stdout=subprocess.PIPE, text=True)
+        process.stdout.readline()       # "Serving on ..."
+
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        open_connection = lambda: asyncio.open_connection(host, int(port), limit=1 << 20)
+    else:
+        open_connection = lambda: asyncio.open_unix_connection(path, limit=1 << 20)
+    on_ready = (lambda: {"server_rss_mb": rss_mb(process.pid)}) if process else None
+
+    try:
+        report = asyncio.run(run_load(open_connection, args.sessions, args.connections,
+                                      args.actions, on_ready, args.searching, args.search_agent))
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key:<18}{value:>12.3f}" if isinstance(value, float) else f"{key:<18}{value:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Startup-time benchmark for headless games.
+
+Each scenario runs in a fresh interpreter and measures the time to import
+the game module and to construct the first game with GUI=False, and
+whether pygame ended up loaded. The "eager pygame" rows import pygame
+first, reproducing the cost every worker paid when the GUI modules
+imported it at module level.
+
+Usage: python benchmarks/startup.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+if {eager}:
+    import pygame
+import {module} as m
+t1 = time.perf_counter()
+m.StoolPigeonGame(GUI=False)
+t2 = time.perf_counter()
+print(json.dumps({{"import_ms": (t1 - t0) * 1e3, "construct_ms": (t2 - t1) * 1e3,
+                   "pygame_loaded": "pygame" in sys.modules}}))
+"""
+
+SCENARIOS = [
+    ("StoolPigeonGame", False),
+    ("StoolPigeonGame", True),
+    ("ref", False),
+    ("ref", True),
+]
+
+
+def pygame_available() -> bool:
+    probe = [sys.executable, "-c", "import importlib.util, sys; "
+             "sys.exit(importlib.util.find_spec('pygame') is None)"]
+    return subprocess.run(probe).returncode == 0
+
+
+def run_probe(module: str, eager: bool) -> dict:
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, eager=eager)],
+                         cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(repeat: int = 5) -> list:
+    """Return the median timings of each scenario over repeat fresh processes."""
+    results = []
+    has_pygame = pygame_available()
+    for module, eager in SCENARIOS:
+        if eager and not has_pygame:
+            continue
+        runs = [run_probe(module, eager) for _ in range(repeat)]
+        median = lambda k: sorted(r[k] for r in runs)[len(runs) // 2]
+        results.append({
+            "module": module,
+            "mode": "eager pygame" if eager else "headless",
+            "import_ms": median("import_ms"),
+            "construct_ms": median("construct_ms"),
+            "pygame_loaded": runs[0]["pygame_loaded"],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless startup-time benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+
+    results = measure(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'module':<18}{'mode':<15}{'import ms':>10}{'construct ms':>14}  pygame")
+    for r in results:
+        print(f"{r['module']:<18}{r['mode']:<15}{r['import_ms']:>10.1f}"
+              f"{r['construct_ms']:>14.2f}  {'yes' if r['pygame_loaded'] else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
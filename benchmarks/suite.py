@@ -0,0 +1,278 @@
+"""
+Benchmark suite for the engine and the renderer.
+
+Measures, in one process:
+
+    games_per_sec            ref games, RandomAgent vs RandomAgent
+    legal_actions_us.<phase> ref get_legal_actions() per decision, by phase
+    apply_action_us.<type>   ref apply_action() per call, by ActionType
+    setup_game_us            StoolPigeonGame._setup_game() (and ref_setup_game_us)
+    refresh_ms.<frame>       StoolPigeonGame._refresh() under SDL_VIDEODRIVER=dummy:
+                             idle (nothing changed), hover (one card changes)
+                             and full (whole screen redrawn)
+
+Every metric is the median of --repeat rounds. Results are compared with a
+baseline file (benchmarks/baseline.json by default); a metric that got worse
+by more than --threshold (a fraction) counts as a regression and the run
+exits with status 1. Baselines are machine-specific: regenerate one with
+--update-baseline on the machine the checks run on.
+
+The renderer metrics are skipped when pygame isn't installed.
+
+Usage: python benchmarks/suite.py [--json] [--output results.json]
+                                  [--baseline FILE] [--threshold 0.25] [--update-baseline]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ref import StoolPigeonGame, RandomAgent, GamePhase
+from selfplay import _play
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+SEED = 2024
+
+# =============================================================================
+# ENGINE
+# =============================================================================
+
+def bench_games(num_games: int) -> dict:
+    """Full headless games per second, reusing one game like selfplay's workers."""
+    game = StoolPigeonGame(GUI=False)
+    agents = [RandomAgent(game, 0), RandomAgent(game, 1)]
+    seeds = random.Random(SEED)
+    start = time.perf_counter()
+    for _ in range(num_games):
+        _play(game, agents, seeds.getrandbits(64), 1000, False)
+    return {"games_per_sec": num_games / (time.perf_counter() - start)}
+
+
+def bench_decisions(num_games: int, calls: int = 20) -> dict:
+    """Per-phase get_legal_actions() and per-type apply_action() cost, in µs."""
+    game = StoolPigeonGame(GUI=False)
+    agents = [RandomAgent(game, 0), RandomAgent(game, 1)]
+    seeds = random.Random(SEED)
+    clock = time.perf_counter_ns
+    legal = defaultdict(list)
+    apply = defaultdict(list)
+
+    for _ in range(num_games):
+        seed = seeds.getrandbits(64)
+        game.reseed_and_reset(seed)
+        for i, agent in enumerate(agents):
+            agent.rng.seed(f"{seed}/{i}")
+        while not game.is_terminal() and game.turn_count < 1000:
+            if game.phase == GamePhase.DRAW:
+                game._do_draw()
+                continue
+            start = clock()
+            for _ in range(calls):
+                game.get_legal_actions()
+            legal[game.phase.name].append((clock() - start) / calls)
+
+            action = agents[game.current_player_idx].choose_action()
+            start = clock()
+            game.apply_action(action)
+            apply[action.action_type.name].append(clock() - start)
+
+    results = {}
+    for prefix, samples in (("legal_actions_us", legal), ("apply_action_us", apply)):
+        for name, times in sorted(samples.items()):
+            results[f"{prefix}.{name}"] = _median(times) / 1e3
+    return results
+
+
+def bench_setup(calls: int) -> dict:
+    """Cost of dealing a fresh game, GUI class (headless) and ref engine."""
+    import StoolPigeonGame as gui
+
+    results = {}
+    for name, game in (("setup_game_us", gui.StoolPigeonGame(GUI=False, seed=SEED)),
+                       ("ref_setup_game_us", StoolPigeonGame(GUI=False, seed=SEED))):
+        start = time.perf_counter()
+        for _ in range(calls):
+            game._setup_game()
+        results[name] = (time.perf_counter() - start) / calls * 1e6
+    return results
+
+# =============================================================================
+# RENDERER
+# =============================================================================
+
+def pygame_available() -> bool:
+    import importlib.util
+    return importlib.util.find_spec("pygame") is not None
+
+
+def bench_refresh(frames: int) -> dict:
+    """StoolPigeonGame._refresh() frame times on the dummy video driver, in ms."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+    import StoolPigeonGame as gui
+
+    cwd = os.getcwd()
+    os.chdir(ROOT)      # Images are loaded relative to the repo root
+    try:
+        game = gui.StoolPigeonGame(GUI=True, seed=SEED)
+    finally:
+        os.chdir(cwd)
+
+    def per_frame(setup) -> float:
+        total = 0.0
+        for i in range(frames):
+            setup(i)
+            start = time.perf_counter()
+            game._refresh()
+            total += time.perf_counter() - start
+        return total / frames * 1e3
+
+    # The dummy driver has no pointer, so _refresh() is fed the mouse position
+    # directly; hovering toggles the highlight of the draw pile's top card.
+    mouse = [(5, 5)]
+    over, away = game.draw_pile[-1].rect.center, (5, 5)
+
+    def hover(i):
+        mouse[0] = over if i % 2 == 0 else away
+
+    get_pos = pygame.mouse.get_pos
+    pygame.mouse.get_pos = lambda: mouse[0]
+    try:
+        game._refresh()
+        results = {
+            "refresh_ms.idle": per_frame(lambda i: None),
+            "refresh_ms.hover": per_frame(hover),
+            "refresh_ms.full": per_frame(lambda i: game._invalidate_screen()),
+        }
+    finally:
+        pygame.mouse.get_pos = get_pos
+        pygame.quit()
+    return results
+
+# =============================================================================
+# SUITE
+# =============================================================================
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def _higher_is_better(name: str) -> bool:
+    return name.endswith("per_sec")
+
+
+def run_suite(repeat: int = 5, quick: bool = False) -> dict:
+    """Run every benchmark repeat times and return {metric: median value}."""
+    scale = 0.1 if quick else 1.0
+    benchmarks = [
+        lambda: bench_games(int(2000 * scale)),
+        lambda: bench_decisions(int(500 * scale)),
+        lambda: bench_setup(int(5000 * scale)),
+    ]
+    if pygame_available():
+        benchmarks.append(lambda: bench_refresh(int(200 * scale)))
+
+    rounds = defaultdict(list)
+    for _ in range(repeat):
+        for bench in benchmarks:
+            for name, value in bench().items():
+                rounds[name].append(value)
+    return {name: _median(values) for name, values in sorted(rounds.items())}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare results with baseline metrics.
+
+    Returns (name, baseline, current, change, regressed) rows; change is the
+    relative slowdown (positive = worse) whichever direction is better.
+    """
+    rows = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None or base == 0:
+            rows.append((name, None, value, None, False))
+            continue
+        change = (base - value) / base if _higher_is_better(name) else (value - base) / base
+        rows.append((name, base, value, change, change > threshold))
+    return rows
+
+
+def _metadata() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine and renderer benchmark suite")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="a tenth of the work per round")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown per metric (default: 0.25)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write the results to the baseline file instead of comparing")
+    args = parser.parse_args()
+
+    results = run_suite(args.repeat, args.quick)
+    report = {"meta": _metadata(), "results": results}
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {len(results)} metrics to {args.baseline}")
+        return
+
+    rows = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            rows = compare(results, json.load(f)["results"], args.threshold)
+        report["baseline"] = args.baseline
+        report["threshold"] = args.threshold
+        report["regressions"] = [name for name, *_, regressed in rows if regressed]
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    elif rows:
+        print(f"{'metric':<40}{'baseline':>12}{'current':>12}{'change':>9}")
+        for name, base, value, change, regressed in rows:
+            base_text = f"{base:>12.3f}" if base is not None else f"{'-':>12}"
+            change_text = f"{change:>+8.0%}" if change is not None else f"{'new':>8}"
+            print(f"{name:<40}{base_text}{value:>12.3f} {change_text}"
+                  f"{'  REGRESSION' if regressed else ''}")
+    else:
+        for name, value in results.items():
+            print(f"{name:<40}{value:>12.3f}")
+
+    if report.get("regressions"):
+        if not args.json:
+            print(f"\n{len(report['regressions'])} metric(s) slower than the baseline "
+                  f"by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,23 @@
-import pygame
+from assets import ASSETS
 
 class Button:
+    __slots__ = ("x", "y", "width", "height", "_rect", "image", "clickable")
+
     def __init__(self, position, width, height, image, clickable=True):
         self.x, self.y = position
         self.width = width
         self.height = height
-        self.rect = pygame.Rect(self.x, self.y, width, height)
+        self._rect = None
         self.image = image
         self.clickable = clickable
+
+    @property
+    def rect(self):
+        """The button's pygame.Rect, created on first use so headless games never import pygame."""
+        if self._rect is None:
+            import pygame
+            self._rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        return self._rect
     
     def enable(self):
         """Make the button clickable."""
@@ -26,12 +36,11 @@ class Button:
         return self.is_clickable and self.rect.collidepoint(pos)
     
     def draw(self, screen, mouse_pos=None):
-        try:
-            # Load and draw button image
-            card_image = pygame.image.load(self.image)
-            card_image = pygame.transform.scale(card_image, (self.width, self.height))
-            screen.blit(card_image, (self.rect.x, self.rect.y))
-        except pygame.error:
+        import pygame
+        button_image = ASSETS.image(self.image, (self.width, self.height))
+        if button_image is not None:
+            screen.blit(button_image, (self.rect.x, self.rect.y))
+        else:
             # If image loading fails, fall back to drawing a colored rectangle
             pygame.draw.rect(screen, "#000", self.rect)
 
@@ -1,5 +1,5 @@
-import pygame
 from enum import Enum, auto
+from assets import ASSETS
 
 # Define all card types available in the game
 class CardType(Enum):
@@ -12,10 +12,15 @@ class CardType(Enum):
     MEATBALL = auto()       # Special: Value = 0
 
 class Card: 
+    # A game holds every card of the deck, so instances carry no __dict__
+    __slots__ = ("card_type", "value", "face_up", "rect", "clickable")
+
     # Card dimensions in pixels
     CARD_WIDTH = 65
     CARD_HEIGHT = 90
 
+    CARDBACK_FILE = "images/cardback.png"
+
     IMAGE_FILES = {
         CardType.STOOL_PIGEON: "images/stool_pigeon.png",
         CardType.BAMBOOZLE: "images/bamboozle.png",
@@ -45,6 +50,12 @@ class Card:
         self.rect = None  # Updated when drawn; used for click detection
         self.clickable = clickable
 
+    @classmethod
+    def image_files(cls):
+        """All image paths a card can be drawn with (faces and back)."""
+        numbered = [f'images/witness-{value}.png' for value in range(2, 11)]
+        return numbered + list(cls.IMAGE_FILES.values()) + [cls.CARDBACK_FILE]
+
     def get_image_file(self):
         """Return the image file path for this card, if it has one."""
         if self.card_type == CardType.NUMBERED: 
@@ -71,6 +82,7 @@ class Card:
         """
         Draw this card on the screen at the given position.
         """
+        import pygame
         x, y = position
         self.rect = pygame.Rect(x, y, self.CARD_WIDTH, self.CARD_HEIGHT)
         card_color = self.CARD_COLORS[self.card_type]
@@ -85,17 +97,13 @@ class Card:
 
     def _draw_card_face(self, screen, card_color, position, mouse_pos=None, is_user_turn=None):
         """Draw the front of the card showing its details (color, name, value, description)."""
+        import pygame
         image = self.get_image_file()
-        if image:
-            try:
-                # If image 
-                card_image = pygame.image.load(image)
-                card_image = pygame.transform.scale(card_image, (self.CARD_WIDTH, self.CARD_HEIGHT))
-                screen.blit(card_image, self.rect)
-            except pygame.error:
-                # If image loading fails, fall back to drawing a colored rectangle
-                pygame.draw.rect(screen, card_color, self.rect)
+        card_image = ASSETS.image(image, (self.CARD_WIDTH, self.CARD_HEIGHT)) if image else None
+        if card_image is not None:
+            screen.blit(card_image, self.rect)
         else:
+            # No image (or it failed to load): draw a colored rectangle
             pygame.draw.rect(screen, card_color, self.rect)
     
         # Hover effect: brighten color if mouse is over this card
@@ -104,11 +112,11 @@ class Card:
             
     def _draw_face_down(self, screen, position, mouse_pos, is_user_turn):
         """Draw the back of the card (generic purple/blue design for hidden cards)."""
-        try:
-            cardback_image = pygame.image.load("images/cardback.png")
-            cardback_image = pygame.transform.scale(cardback_image, (self.CARD_WIDTH, self.CARD_HEIGHT))
+        import pygame
+        cardback_image = ASSETS.image(self.CARDBACK_FILE, (self.CARD_WIDTH, self.CARD_HEIGHT))
+        if cardback_image is not None:
             screen.blit(cardback_image, self.rect)
-        except pygame.error:
+        else:
             pygame.draw.rect(screen, (100, 70, 120), self.rect)
             pygame.draw.rect(screen, (80, 50, 100), self.rect, 2)
 
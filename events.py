@@ -0,0 +1,202 @@
+"""
+Structured event log for the game engine (game_state.py / actions.py).
+
+Engine code reports phase transitions, actions and card moves as typed
+records instead of printing them. Every call site is guarded by one of the
+level flags on EVENTS, e.g.
+
+    if EVENTS.phases:
+        EVENTS.emit(PhaseChanged(old_phase, new_phase))
+
+so with logging off (the default) a transition costs one attribute check and
+no record is built. Records can be echoed to the console and/or kept in a
+bounded in-memory ring buffer for post-mortem dumps.
+
+Set STOOL_PIGEON_LOG to a level name (actions, phases, cards) to turn on
+console output without code changes.
+"""
+
+import os
+import sys
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+# Levels, from least to most verbose
+OFF = 0
+ACTIONS = 1   # actions taken, knocks, effects, rejected moves
+PHASES = 2    # phase transitions and turn changes
+CARDS = 3     # individual card moves, swaps and selections
+
+LEVEL_NAMES = {"off": OFF, "actions": ACTIONS, "phases": PHASES, "cards": CARDS}
+
+# =============================================================================
+# EVENT RECORDS
+# =============================================================================
+
+class ActionExecuted(NamedTuple):
+    action_type: object
+    target_player: Optional[int]
+    target_idx: Optional[int]
+    second_target: Optional[tuple]
+    level = ACTIONS
+
+    def __str__(self):
+        return f"Executing: {self.action_type}"
+
+
+class EffectActivated(NamedTuple):
+    card_type: object
+    level = ACTIONS
+
+    def __str__(self):
+        return f"{self.card_type.name} effect activated!"
+
+
+class Knocked(NamedTuple):
+    player_idx: int
+    level = ACTIONS
+
+    def __str__(self):
+        return f"{'User' if self.player_idx == 0 else 'Agent'} knocked!"
+
+
+class ActionRejected(NamedTuple):
+    action_type: object
+    reason: str
+    level = ACTIONS
+
+    def __str__(self):
+        return f"{self.action_type.name} rejected: {self.reason}"
+
+
+class PhaseChanged(NamedTuple):
+    old_phase: object
+    new_phase: object
+    level = PHASES
+
+    def __str__(self):
+        return f"Phase: {self.old_phase.name} -> {self.new_phase.name}"
+
+
+class TurnStarted(NamedTuple):
+    player_idx: int
+    level = PHASES
+
+    def __str__(self):
+        return f"--- {'User' if self.player_idx == 0 else 'Agent'}'s Turn ---"
+
+
+class CardMoved(NamedTuple):
+    card_type: object
+    value: Optional[int]
+    source: str
+    dest: str
+    level = CARDS
+
+    def __str__(self):
+        value = f" ({self.value})" if self.value else ""
+        return f"Card {self.card_type.name}{value}: {self.source} -> {self.dest}"
+
+
+class CardsSwapped(NamedTuple):
+    player1_idx: int
+    card1_idx: int
+    player2_idx: int
+    card2_idx: int
+    level = CARDS
+
+    def __str__(self):
+        return (f"Swapped player {self.player1_idx} card {self.card1_idx} "
+                f"with player {self.player2_idx} card {self.card2_idx}")
+
+
+class CardSelected(NamedTuple):
+    player_idx: int
+    card_idx: int
+    level = CARDS
+
+    def __str__(self):
+        return f"Selected card: player {self.player_idx}, index {self.card_idx}"
+
+
+class CardPeeked(NamedTuple):
+    player_idx: int
+    card_idx: int
+    level = CARDS
+
+    def __str__(self):
+        return f"Peeked at card: player {self.player_idx}, index {self.card_idx}"
+
+
+class RequestFailed(NamedTuple):
+    op: object
+    error: str
+    traceback: str
+    level = ACTIONS
+
+    def __str__(self):
+        return f"Request {self.op!r} failed: {self.error}\n{self.traceback}"
+
+# =============================================================================
+# EVENT LOG
+# =============================================================================
+
+class EventLog:
+    """Level-gated event sink with optional console echo and ring buffer."""
+
+    def __init__(self):
+        self.level = OFF
+        self.console = False
+        self.buffer = None
+        # Guard flags checked at call sites; kept in sync by configure()
+        self.actions = False
+        self.phases = False
+        self.cards = False
+
+    def configure(self, level=OFF, console=False, buffer_size=None):
+        """
+        Set the verbosity and sinks.
+
+        level: OFF, ACTIONS, PHASES or CARDS (or its name).
+        console: echo each record to stdout.
+        buffer_size: keep the last N records in memory (None disables).
+        """
+        if isinstance(level, str):
+            level = LEVEL_NAMES[level.lower()]
+        self.level = level
+        self.console = console
+        self.buffer = deque(maxlen=buffer_size) if buffer_size else None
+        enabled = console or self.buffer is not None
+        self.actions = enabled and level >= ACTIONS
+        self.phases = enabled and level >= PHASES
+        self.cards = enabled and level >= CARDS
+
+    def emit(self, record):
+        if self.buffer is not None:
+            self.buffer.append((time.monotonic(), record))
+        if self.console:
+            print(record)
+
+    def records(self) -> list:
+        """Buffered records, oldest first."""
+        return [record for _, record in self.buffer] if self.buffer is not None else []
+
+    def dump(self, file=None):
+        """Write the buffered records with timestamps relative to the oldest."""
+        if not self.buffer:
+            return
+        file = file or sys.stdout
+        start = self.buffer[0][0]
+        for stamp, record in self.buffer:
+            print(f"[{stamp - start:9.4f}] {type(record).__name__}: {record}", file=file)
+
+    def clear(self):
+        if self.buffer is not None:
+            self.buffer.clear()
+
+
+EVENTS = EventLog()
+
+if os.environ.get("STOOL_PIGEON_LOG"):
+    EVENTS.configure(os.environ["STOOL_PIGEON_LOG"], console=True)
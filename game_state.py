@@ -1,4 +1,5 @@
 from enum import Enum, auto
+from events import EVENTS, PhaseChanged, TurnStarted, Knocked, CardSelected
 
 class GamePhase(Enum):
     """Represents the current phase of the game."""
@@ -19,6 +20,9 @@ class GamePhase(Enum):
 class GameState:
     """Holds all game state variables and state-related logic."""
     
+    __slots__ = ("current_player_idx", "phase", "knocked_by", "drawn_card", "pending_effect",
+                 "selected_card", "turns_since_knock")
+    
     def __init__(self):
         self.current_player_idx = 0
         self.phase = GamePhase.DRAW
@@ -52,7 +56,8 @@ class GameState:
         """Sets the current phase."""
         old_phase = self.phase
         self.phase = new_phase
-        print(f"Phase: {old_phase.name} -> {new_phase.name}")
+        if EVENTS.phases:
+            EVENTS.emit(PhaseChanged(old_phase, new_phase))
     
     def is_phase(self, phase):
         """Returns true if current phase matches the given phase."""
@@ -96,7 +101,8 @@ class GameState:
         
         # Set the phase to final turn if the player knocked, if not set it to draw. 
         self.set_phase(GamePhase.FINAL_TURN if self.knocked_by is not None else GamePhase.DRAW)
-        print(f"--- {self.get_current_player_name()}'s Turn ---")
+        if EVENTS.phases:
+            EVENTS.emit(TurnStarted(self.current_player_idx))
         return True
 
     # ========== KNOCK MANAGEMENT ==========
@@ -105,7 +111,8 @@ class GameState:
         """Handle when a player knocks. Returns True if knock was valid."""
         if self.knocked_by is None and self.phase != GamePhase.GAME_OVER:
             self.knocked_by = self.current_player_idx
-            print(f"{self.get_current_player_name()} knocked!")
+            if EVENTS.actions:
+                EVENTS.emit(Knocked(self.current_player_idx))
             return True
         return False
     
@@ -118,7 +125,8 @@ class GameState:
     def select_card(self, player_idx, card_idx):
         """Sets the selected card and player who selected it."""
         self.selected_card = (player_idx, card_idx)
-        print(f"Selected card: player {player_idx}, index {card_idx}")
+        if EVENTS.cards:
+            EVENTS.emit(CardSelected(player_idx, card_idx))
     
     def clear_selection(self):
         """Clears the selected card."""
@@ -0,0 +1,132 @@
+"""
+Gymnasium-style environment over ref.StoolPigeonGame.
+
+One learning seat plays against a pluggable opponent agent, which the
+environment moves internally; reset() and step() return as soon as the
+learning player has a decision to make (or the game is over).
+
+Observations come from observation.ObservationEncoder: remembered own
+cards, remembered opponent cards, hand sizes (the slot present flags),
+drawn card, discard top and counts, phase and pending effect. Actions are
+indices into a ref.ActionSpace; the legal ones are in info["action_mask"]
+and action_masks(). The reward is +1 for a win, -1 for a loss and 0
+otherwise, given when the game ends.
+
+The observation and mask arrays are allocated once and overwritten on every
+step; copy them if you need to keep one. The game and the opponent are also
+created once and reset in place: each episode gets a seed drawn from the
+stream reset(seed=...) starts, and opponents with an rng are reseeded from it.
+
+gymnasium is optional: with it installed the class is a gymnasium.Env with
+observation_space/action_space set, without it the same API works as a
+plain class.
+"""
+
+import io
+import random
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from ref import StoolPigeonGame, RandomAgent, ActionSpace, GamePhase, DECK_COUNTS
+from observation import ObservationEncoder
+
+try:
+    import gymnasium
+except ImportError:
+    gymnasium = None
+
+
+class StoolPigeonEnv(gymnasium.Env if gymnasium else object):
+    """Single-agent view of a two-player game."""
+
+    metadata = {"render_modes": ["ansi"]}
+
+    def __init__(self, player_idx: int = 0, opponent=RandomAgent, max_hand: int = 8,
+                 max_turns: int = 1000, render_mode=None):
+        """
+        player_idx: the learning player's seat.
+        opponent: callable (game, player_idx) -> agent with choose_action(),
+            e.g. RandomAgent or functools.partial(ISMCTSAgent, iterations=200).
+        max_turns: episodes are truncated after this many turns.
+        """
+        self.player_idx = player_idx
+        self.opponent_factory = opponent
+        self.max_turns = max_turns
+        self.render_mode = render_mode
+        self.space = ActionSpace(max_hand)
+        self.encoder = ObservationEncoder(max_hand)
+
+        self.game = None
+        self.opponent = None
+        self._seeds = random.Random()
+        self._obs = self.encoder.zeros()
+        self._mask = np.zeros(self.space.size, dtype=bool)
+        self._info = {"action_mask": self._mask}
+
+        if gymnasium:
+            self.observation_space = gymnasium.spaces.Box(
+                0.0, float(max(DECK_COUNTS)), (self.encoder.size,), np.float32)
+            self.action_space = gymnasium.spaces.Discrete(self.space.size)
+
+    def reset(self, seed=None, options=None):
+        if gymnasium:
+            super().reset(seed=seed)
+        if seed is not None:
+            self._seeds.seed(seed)
+        game_seed = self._seeds.getrandbits(64)
+        if self.game is None:
+            self.game = StoolPigeonGame(GUI=False, seed=game_seed)
+            self.opponent = self.opponent_factory(self.game, 1 - self.player_idx)
+        else:
+            self.game.reseed_and_reset(game_seed)
+        if hasattr(self.opponent, "rng"):
+            self.opponent.rng.seed(f"{game_seed}/opponent")
+        self._advance()
+        return self._observe(), self._info
+
+    def step(self, action):
+        game = self.game
+        if not self._mask[action]:
+            raise ValueError(f"illegal action index {action}")
+        game.apply_action(self.space.actions[action])
+        self._advance()
+
+        terminated = game.is_terminal()
+        truncated = not terminated and game.turn_count >= self.max_turns
+        reward = 0.0
+        if terminated and game.get_winner() is not None:
+            reward = 1.0 if game.get_winner() == self.player_idx else -1.0
+        return self._observe(), reward, terminated, truncated, self._info
+
+    def action_masks(self) -> np.ndarray:
+        """Legal actions for the current observation (MaskablePPO convention)."""
+        return self._mask
+
+    def render(self):
+        if self.render_mode == "ansi":
+            text = io.StringIO()
+            with redirect_stdout(text):
+                self.game.display_state(self.player_idx)
+            return text.getvalue()
+        return None
+
+    def _advance(self):
+        """Play draws and opponent moves until the learning player must decide."""
+        game = self.game
+        while not game.is_terminal() and game.turn_count < self.max_turns:
+            if game.phase == GamePhase.DRAW:
+                game._do_draw()
+            elif game.current_player_idx == self.player_idx:
+                break
+            else:
+                game.apply_action(self.opponent.choose_action())
+
+    def _observe(self) -> np.ndarray:
+        game = self.game
+        self.encoder.encode(game, self.player_idx, out=self._obs)
+        if game.is_terminal() or game.current_player_idx != self.player_idx:
+            self._mask[:] = False
+        else:
+            game.legal_action_mask(self.space, out=self._mask)
+        return self._obs
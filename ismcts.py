@@ -0,0 +1,322 @@
+"""
+Information-set Monte Carlo tree search agent for ref.StoolPigeonGame.
+
+Single-observer ISMCTS: one tree per move, keyed by action history. Every
+iteration samples a determinization, i.e. a full game state consistent with
+what the agent has seen (its memory of both crime scenes, the discard pile
+and its drawn card), then walks the tree restricted to the actions legal in
+that sample, expands one node, finishes the game with random play and backs
+up the result. Unseen cards are dealt uniformly from the cards not accounted
+for; memories that can no longer be true (the card is known to be elsewhere)
+are dropped. Given a belief.BeliefTracker for its seat, the agent deals from
+the tracker's view instead, which keeps cards known through public swaps.
+
+ISMCTSAgent is a drop-in replacement for RandomAgent:
+
+    agent = ISMCTSAgent(game, 1, iterations=2000)      # or time_limit=0.5
+    game.apply_action(agent.choose_action())
+    print(agent.iterations_per_second)
+
+Usage: python ismcts.py --games 20 --iterations 1000 [--belief]
+"""
+
+import argparse
+import math
+import random
+import time
+from typing import Optional
+
+from ref import StoolPigeonGame, RandomAgent, GamePhase, Action, CARDS, DECK_CODES, NUM_CARD_CODES
+
+# =============================================================================
+# SEARCH TREE
+# =============================================================================
+
+class _Node:
+    """Statistics for one action history; reward is from player's point of view."""
+
+    __slots__ = ("parent", "action", "player", "children", "visits", "reward", "avails")
+
+    def __init__(self, parent=None, action=None, player=None):
+        self.parent = parent
+        self.action = action
+        self.player = player      # Who chose action (None at the root)
+        self.children = {}        # Action -> _Node
+        self.visits = 0
+        self.reward = 0.0
+        self.avails = 1
+
+    def select(self, actions, exploration):
+        """UCB1 over the children available in this determinization."""
+        best, best_value = None, -1.0
+        for action in actions:
+            child = self.children[action]
+            child.avails += 1
+            value = (child.reward / child.visits +
+                     exploration * math.sqrt(math.log(child.avails) / child.visits))
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+# =============================================================================
+# DETERMINIZATION
+# =============================================================================
+
+class _Determinizer:
+    """Samples full game states consistent with one player's information."""
+
+    def __init__(self, game: StoolPigeonGame, observer: int, belief=None):
+        self.game = game
+        # The drawn card is only visible to the player who drew it.
+        self.drawn_known = game.drawn_card is not None and game.current_player_idx == observer
+        if belief is not None:
+            self.scenes = [belief.known_scene(p_idx) for p_idx in range(len(game.players))]
+            self.pool = belief.unseen_cards()
+            return
+
+        counts = [0] * NUM_CARD_CODES
+        for code in DECK_CODES:
+            counts[code] += 1
+        for card in game.discard_pile:
+            counts[card.code] -= 1
+
+        if self.drawn_known:
+            counts[game.drawn_card.code] -= 1
+
+        me = game.players[observer]
+        known = {observer: me["memory"], 1 - observer: me["opp_memory"]}
+        self.scenes = []    # Per player, crime scene with None for unknown slots
+        for p_idx, player in enumerate(game.players):
+            scene = [None] * len(player["crime_scene"])
+            for idx, card in known[p_idx].items():
+                if idx < len(scene) and counts[card.code] > 0:
+                    counts[card.code] -= 1
+                    scene[idx] = card
+            self.scenes.append(scene)
+
+        self.pool = [CARDS[code] for code in range(NUM_CARD_CODES) for _ in range(counts[code])]
+
+    def sample(self, target: StoolPigeonGame, rng: random.Random):
+        """Overwrite target's rule state with a fresh determinization."""
+        game = self.game
+        pool = self.pool[:]
+        rng.shuffle(pool)
+
+        for scene, player in zip(self.scenes, target.players):
+            player["crime_scene"] = [card if card is not None else pool.pop() for card in scene]
+            player["memory"] = {}
+            player["opp_memory"] = {}
+
+        drawn = game.drawn_card
+        if drawn is not None and not self.drawn_known:
+            drawn = pool.pop()
+
+        # Whatever is left over was lost unseen (a knocker's drawn card)
+        del pool[len(game.draw_pile):]
+        target.draw_pile = pool
+        target.discard_pile = game.discard_pile[:]
+        target.drawn_card = drawn
+        target.current_player_idx = game.current_player_idx
+        target.phase = game.phase
+        target.knocked_by = game.knocked_by
+        target.pending_effect = game.pending_effect
+        target.turn_count = game.turn_count
+        target.done = game.done
+        target.winner = game.winner
+        target.scores = game.scores
+        # Reshuffles inside the search draw from the agent's own rng
+        target.reshuffle_seed = rng.getrandbits(64)
+        target.reshuffles = 0
+        target.selected_card = None
+        target._undo_stack = []
+        target.rebuild_card_counts()
+        target.rebuild_zobrist()
+
+# =============================================================================
+# ISMCTS AGENT
+# =============================================================================
+
+class ISMCTSAgent:
+    """
+    Searches each move under an iteration and/or wall-clock budget.
+
+    iterations: iterations per move (used when time_limit is None).
+    time_limit: seconds per move; overrides iterations when set.
+    exploration: UCB1 exploration constant.
+    rollout_turns: random playouts longer than this many turns are scored
+        as if the game ended there, since games without a knock never end.
+    belief: optional belief.BeliefTracker observing the game for player_idx.
+    """
+
+    def __init__(self, game: StoolPigeonGame, player_idx: int, iterations: int = 1000,
+                 time_limit: Optional[float] = None, exploration: float = 0.7,
+                 rollout_turns: int = 60, seed: Optional[int] = None, belief=None):
+        self.game = game
+        self.player_idx = player_idx
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rollout_turns = rollout_turns
+        self.belief = belief
+        self.rng = random.Random(seed)
+        self._scratch = None
+
+        # Search statistics: last move and running totals
+        self.last_iterations = 0
+        self.last_elapsed = 0.0
+        self.total_iterations = 0
+        self.total_elapsed = 0.0
+
+    @property
+    def iterations_per_second(self) -> float:
+        return self.total_iterations / self.total_elapsed if self.total_elapsed else 0.0
+
+    def choose_action(self) -> Optional[Action]:
+        actions = self.game.get_legal_actions()
+        if len(actions) <= 1:
+            return actions[0] if actions else None
+
+        root = self._search()
+        return max(actions, key=lambda a: root.children[a].visits if a in root.children else -1)
+
+    def _search(self) -> _Node:
+        if self._scratch is None:
+            self._scratch = StoolPigeonGame(GUI=False, rng=self.rng)
+        determinizer = _Determinizer(self.game, self.player_idx, self.belief)
+        root = _Node()
+
+        start = time.perf_counter()
+        deadline = start + self.time_limit if self.time_limit is not None else None
+        n = 0
+        while (time.perf_counter() < deadline) if deadline is not None else (n < self.iterations):
+            determinizer.sample(self._scratch, self.rng)
+            self._iterate(root, self._scratch)
+            n += 1
+
+        elapsed = time.perf_counter() - start
+        self.last_iterations, self.last_elapsed = n, elapsed
+        self.total_iterations += n
+        self.total_elapsed += elapsed
+        return root
+
+    def _iterate(self, root: _Node, game: StoolPigeonGame):
+        """One select / expand / simulate / backpropagate pass."""
+        rng = self.rng
+        node = root
+
+        # Selection: descend while every available action has been tried
+        while not game.done:
+            if game.phase == GamePhase.DRAW:
+                game._do_draw()
+                continue
+            actions = game.get_legal_actions()
+            untried = [a for a in actions if a not in node.children]
+            player = game.current_player_idx
+            if untried:
+                # Expansion
+                action = rng.choice(untried)
+                for a in actions:
+                    if a in node.children:
+                        node.children[a].avails += 1
+                child = node.children[action] = _Node(node, action, player)
+                game._apply_action(action)
+                node = child
+                break
+            node = node.select(actions, self.exploration)
+            game._apply_action(node.action)
+
+        # Simulation
+        turn_limit = game.turn_count + self.rollout_turns
+        while not game.done:
+            if game.turn_count >= turn_limit:
+                game._calculate_scores()
+                break
+            if game.phase == GamePhase.DRAW:
+                game._do_draw()
+                continue
+            game._apply_action(rng.choice(game.get_legal_actions()))
+
+        # Backpropagation
+        winner = game.winner
+        while node is not root:
+            node.visits += 1
+            node.reward += 0.5 if winner is None else float(winner == node.player)
+            node = node.parent
+        root.visits += 1
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def _play_vs_random(seat, make_agent, use_belief, seeds, max_turns=1000):
+    """Play ISMCTS in seat against RandomAgent; returns the selfplay result code."""
+    from selfplay import TIE, TRUNCATED
+    from belief import BeliefTracker
+
+    game = StoolPigeonGame(GUI=False, seed=seeds.getrandbits(64))
+    belief = BeliefTracker(game, seat) if use_belief else None
+    agents = [None, None]
+    agents[seat] = make_agent(game, seat, belief)
+    agents[1 - seat] = RandomAgent(game, 1 - seat, seed=seeds.getrandbits(64))
+
+    while not game.is_terminal():
+        if game.turn_count >= max_turns:
+            return TRUNCATED
+        if game.phase == GamePhase.DRAW:
+            game._do_draw()
+            if belief:
+                belief.observe_draw(game)
+            continue
+        actor = game.current_player_idx
+        action = agents[actor].choose_action()
+        game.apply_action(action)
+        if belief:
+            belief.observe_action(game, action, actor)
+
+    winner = game.get_winner()
+    return TIE if winner is None else winner
+
+
+def main():
+    from selfplay import TIE, TRUNCATED
+
+    parser = argparse.ArgumentParser(description="ISMCTS agent vs RandomAgent")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds per move")
+    parser.add_argument("--belief", action="store_true", help="track unseen cards with belief.py")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    seeds = random.Random(args.seed)
+    agents = []
+
+    def make_agent(game, player_idx, belief):
+        agent = ISMCTSAgent(game, player_idx, iterations=args.iterations,
+                            time_limit=args.time_limit, seed=seeds.getrandbits(64),
+                            belief=belief)
+        agents.append(agent)
+        return agent
+
+    wins = ties = truncated = 0
+    for i in range(args.games):
+        # Alternate seats so the first-player advantage cancels out
+        seat = i % 2
+        result = _play_vs_random(seat, make_agent, args.belief, seeds)
+        if result == TRUNCATED:
+            truncated += 1
+        elif result == TIE:
+            ties += 1
+        elif result == seat:
+            wins += 1
+
+    iterations = sum(a.total_iterations for a in agents)
+    elapsed = sum(a.total_elapsed for a in agents)
+    print(f"ISMCTS vs Random: {wins}W {ties}T {args.games - wins - ties - truncated}L "
+          f"({truncated} truncated) over {args.games} games")
+    print(f"Search: {iterations} iterations in {elapsed:.2f}s "
+          f"({iterations / elapsed if elapsed else 0:.0f} iterations/s)")
+
+
+if __name__ == "__main__":
+    main()
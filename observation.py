@@ -0,0 +1,87 @@
+"""
+Fixed-size observation vectors for ref.StoolPigeonGame.
+
+An observation is what one player can see, flattened into float32 features
+so batches stack into a single (N, size) array:
+
+    own slots        max_hand x NUM_CARD_CODES one-hot of the remembered
+                     card (code 0 = slot present but unknown), plus a
+                     present flag per slot
+    opponent slots   the same, from opp_memory
+    drawn card       one-hot, only while it is this player's to see
+    discard top      one-hot
+    discard counts   cards of each code in the discard pile
+    phase            one-hot over GamePhase
+    pending effect   one-hot: none, Stool Pigeon, Bamboozle, Vendetta, Kingpin
+    knocked          [this player knocked, opponent knocked]
+    draw pile        fraction of the deck left in the draw pile
+
+encode() writes into a caller-provided row so streaming code can reuse its
+buffers.
+"""
+
+import numpy as np
+
+from ref import StoolPigeonGame, CardType, GamePhase, NUM_CARD_CODES, DECK_CODES, ZONE_DISCARD
+
+_EFFECTS = (None, CardType.STOOL_PIGEON, CardType.BAMBOOZLE, CardType.VENDETTA, CardType.KINGPIN)
+_PHASES = tuple(GamePhase)
+
+
+class ObservationEncoder:
+    """Encodes one player's view of a game into a float32 vector."""
+
+    def __init__(self, max_hand: int = 8):
+        self.max_hand = max_hand
+        H, C = max_hand, NUM_CARD_CODES
+
+        # Feature offsets, in layout order
+        self.own = 0
+        self.own_present = self.own + H * C
+        self.opp = self.own_present + H
+        self.opp_present = self.opp + H * C
+        self.drawn = self.opp_present + H
+        self.discard_top = self.drawn + C
+        self.discard_counts = self.discard_top + C
+        self.phase = self.discard_counts + C
+        self.effect = self.phase + len(_PHASES)
+        self.knocked = self.effect + len(_EFFECTS)
+        self.draw_left = self.knocked + 2
+        self.size = self.draw_left + 1
+
+    def zeros(self, n: int = None) -> np.ndarray:
+        """A buffer for one observation, or n of them."""
+        return np.zeros(self.size if n is None else (n, self.size), dtype=np.float32)
+
+    def encode(self, game: StoolPigeonGame, player_idx: int, out: np.ndarray = None) -> np.ndarray:
+        """Write player_idx's observation of game into out (allocated if None)."""
+        if out is None:
+            out = self.zeros()
+        else:
+            out[:] = 0
+        C = NUM_CARD_CODES
+        me = game.players[player_idx]
+
+        for base, present, scene, memory in (
+                (self.own, self.own_present, me["crime_scene"], me["memory"]),
+                (self.opp, self.opp_present, game.players[1 - player_idx]["crime_scene"],
+                 me["opp_memory"])):
+            n = min(len(scene), self.max_hand)
+            out[present:present + n] = 1.0
+            for idx in range(n):
+                card = memory.get(idx)
+                out[base + idx * C + (card.code if card is not None else 0)] = 1.0
+
+        if (game.drawn_card is not None and game.current_player_idx == player_idx
+                and not game.done):
+            out[self.drawn + game.drawn_card.code] = 1.0
+        if game.discard_pile:
+            out[self.discard_top + game.discard_pile[-1].code] = 1.0
+        out[self.discard_counts:self.discard_counts + C] = game.zone_counts(ZONE_DISCARD)
+
+        out[self.phase + _PHASES.index(game.phase)] = 1.0
+        out[self.effect + _EFFECTS.index(game.pending_effect)] = 1.0
+        if game.knocked_by is not None:
+            out[self.knocked + (game.knocked_by != player_idx)] = 1.0
+        out[self.draw_left] = len(game.draw_pile) / len(DECK_CODES)
+        return out
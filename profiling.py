@@ -0,0 +1,170 @@
+"""
+Opt-in hot-path counters for the game engines and agents.
+
+PROFILER records call counts and cumulative wall time for:
+
+    ref phase / ref action        ref.StoolPigeonGame._apply_action, keyed by
+                                  the GamePhase it was called in and by ActionType
+    actions phase / actions action
+                                  actions.Action.execute_action (the GUI engine),
+                                  keyed the same way
+    agent                         choose_action() per agent class
+
+Nothing is instrumented until enable() is called: it swaps timing wrappers
+in for those methods and disable() puts the originals back, so with
+profiling off the engine runs exactly the code it always did.
+
+    with profiling():
+        play_game()
+    PROFILER.report()
+
+Times are inclusive: an agent's time covers any searching it does, and
+ISMCTS rollouts call _apply_action, so they show up under "ref" too.
+"""
+
+import functools
+import sys
+import time
+from contextlib import contextmanager
+
+SECTIONS = ("ref phase", "ref action", "actions phase", "actions action", "agent")
+
+
+class Profiler:
+    """Call counters installed by patching the hot methods."""
+
+    def __init__(self):
+        # (section, name) -> [calls, total ns]
+        self.counters = {}
+        self._patches = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._patches)
+
+    def enable(self, agent_classes=None):
+        """
+        Install the counters.
+
+        agent_classes: classes whose choose_action() is timed (default:
+        ref.RandomAgent and ismcts.ISMCTSAgent).
+        """
+        if self._patches:
+            return
+        import ref
+        import actions
+
+        if agent_classes is None:
+            from ismcts import ISMCTSAgent
+            agent_classes = (ref.RandomAgent, ISMCTSAgent)
+
+        self._patch(ref.StoolPigeonGame, "_apply_action", self._time_ref_action)
+        self._patch(actions.Action, "execute_action", self._time_gui_action)
+        for cls in agent_classes:
+            self._patch(cls, "choose_action", self._time_agent)
+
+    def disable(self):
+        """Restore the original methods; the counts are kept."""
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+
+    def reset(self):
+        self.counters.clear()
+
+    def _patch(self, owner, name, make_wrapper):
+        original = owner.__dict__[name]
+        setattr(owner, name, functools.wraps(original)(make_wrapper(original)))
+        self._patches.append((owner, name, original))
+
+    # =========================================================================
+    # WRAPPERS
+    # =========================================================================
+
+    def _time_ref_action(self, original):
+        counters, clock = self.counters, time.perf_counter_ns
+
+        def _apply_action(game, action):
+            phase = game.phase
+            start = clock()
+            try:
+                return original(game, action)
+            finally:
+                elapsed = clock() - start
+                _count(counters, ("ref phase", phase.name), elapsed)
+                _count(counters, ("ref action", action.action_type.name), elapsed)
+        return _apply_action
+
+    def _time_gui_action(self, original):
+        counters, clock = self.counters, time.perf_counter_ns
+
+        def execute_action(action, game, GamePhase):
+            phase = game.state.phase
+            start = clock()
+            try:
+                return original(action, game, GamePhase)
+            finally:
+                elapsed = clock() - start
+                _count(counters, ("actions phase", phase.name), elapsed)
+                _count(counters, ("actions action", action.action_type.name), elapsed)
+        return execute_action
+
+    def _time_agent(self, original):
+        counters, clock = self.counters, time.perf_counter_ns
+
+        def choose_action(agent):
+            start = clock()
+            try:
+                return original(agent)
+            finally:
+                _count(counters, ("agent", type(agent).__name__), clock() - start)
+        return choose_action
+
+    # =========================================================================
+    # RESULTS
+    # =========================================================================
+
+    def snapshot(self) -> dict:
+        """{section: {name: {"calls": n, "total_s": seconds}}}, JSON-ready."""
+        result = {}
+        for (section, name), (calls, total) in sorted(self.counters.items()):
+            result.setdefault(section, {})[name] = {"calls": calls, "total_s": total / 1e9}
+        return result
+
+    def report(self, file=None):
+        """Print a table per section, slowest total first."""
+        file = file or sys.stdout
+        snapshot = self.snapshot()
+        for section in SECTIONS:
+            rows = snapshot.get(section)
+            if not rows:
+                continue
+            section_total = sum(row["total_s"] for row in rows.values())
+            print(f"\n{section:<24}{'calls':>10}{'total ms':>12}{'us/call':>10}{'share':>8}",
+                  file=file)
+            for name, row in sorted(rows.items(), key=lambda item: -item[1]["total_s"]):
+                calls, total = row["calls"], row["total_s"]
+                print(f"{name:<24}{calls:>10}{total * 1e3:>12.2f}{total / calls * 1e6:>10.2f}"
+                      f"{total / section_total if section_total else 0:>8.1%}", file=file)
+
+
+def _count(counters, key, elapsed):
+    entry = counters.get(key)
+    if entry is None:
+        counters[key] = [1, elapsed]
+    else:
+        entry[0] += 1
+        entry[1] += elapsed
+
+
+PROFILER = Profiler()
+
+
+@contextmanager
+def profiling(agent_classes=None):
+    """Enable PROFILER for the duration of a with block."""
+    PROFILER.enable(agent_classes)
+    try:
+        yield PROFILER
+    finally:
+        PROFILER.disable()
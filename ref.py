@@ -5,6 +5,7 @@ Supports one human player vs one AI agent with optional clickable Pygame GUI.
 
 import random
 import copy
+import struct
 import time
 from enum import Enum, auto
 from dataclasses import dataclass, field
@@ -23,38 +24,77 @@ class CardType(Enum):
     RAT = auto()
     MEATBALL = auto()
 
-@dataclass
+# Card codes: 0 means "no card", 1-12 are numbered cards by value and the
+# special cards follow. Codes index the lookup tables below.
+NO_CARD = 0
+CODE_STOOL_PIGEON = 13
+CODE_BAMBOOZLE = 14
+CODE_VENDETTA = 15
+CODE_KINGPIN = 16
+CODE_RAT = 17
+CODE_MEATBALL = 18
+NUM_CARD_CODES = 19
+
+SPECIAL_CARD_CODES = {
+    CardType.STOOL_PIGEON: CODE_STOOL_PIGEON,
+    CardType.BAMBOOZLE: CODE_BAMBOOZLE,
+    CardType.VENDETTA: CODE_VENDETTA,
+    CardType.KINGPIN: CODE_KINGPIN,
+    CardType.RAT: CODE_RAT,
+    CardType.MEATBALL: CODE_MEATBALL,
+}
+
+CARD_NAMES = ("-",) + tuple(str(v) for v in range(1, 13)) + (
+    "PIGEON", "BAMBOOZLE", "VENDETTA", "KINGPIN", "RAT", "MEATBALL")
+CARD_SCORES = (0,) + tuple(range(1, 13)) + (0,) * 6
+
+@dataclass(frozen=True, slots=True)
 class Card:
     card_type: CardType
     value: int = 0
+    code: int = field(default=NO_CARD, init=False, repr=False, compare=False)
     
     def __post_init__(self):
-        if self.card_type == CardType.MEATBALL:
-            self.value = 0
-        elif self.card_type != CardType.NUMBERED:
-            self.value = 0
+        if self.card_type != CardType.NUMBERED:
+            object.__setattr__(self, "value", 0)
+            object.__setattr__(self, "code", SPECIAL_CARD_CODES[self.card_type])
+        else:
+            object.__setattr__(self, "code", self.value)
+    
+    def __eq__(self, other):
+        return isinstance(other, Card) and self.code == other.code
+    
+    def __hash__(self):
+        return self.code
     
     def get_score_value(self, rat_value: int = 0) -> int:
-        if self.card_type == CardType.RAT:
+        if self.code == CODE_RAT:
             return rat_value
-        elif self.card_type == CardType.MEATBALL:
-            return 0
-        elif self.card_type == CardType.NUMBERED:
-            return self.value
-        return 0
+        return CARD_SCORES[self.code]
     
     def __repr__(self):
-        if self.card_type == CardType.NUMBERED:
-            return f"{self.value}"
-        names = {
-            CardType.STOOL_PIGEON: "PIGEON",
-            CardType.BAMBOOZLE: "BAMBOOZLE", 
-            CardType.VENDETTA: "VENDETTA",
-            CardType.KINGPIN: "KINGPIN",
-            CardType.RAT: "RAT",
-            CardType.MEATBALL: "MEATBALL"
-        }
-        return names.get(self.card_type, self.card_type.name)
+        return CARD_NAMES[self.code]
+
+# One shared Card per code; piles, hands and memories only hold these.
+CARDS = (None,) + tuple(Card(CardType.NUMBERED, v) for v in range(1, 13)) + tuple(
+    Card(t) for t in SPECIAL_CARD_CODES)
+
+DECK_CODES = bytes(
+    [v for v in range(1, 13) for _ in range(2)] +
+    [CODE_STOOL_PIGEON, CODE_BAMBOOZLE, CODE_VENDETTA] * 4 +
+    [CODE_KINGPIN, CODE_RAT, CODE_MEATBALL] * 2
+)
+
+def card_from_code(code: int) -> Optional[Card]:
+    return CARDS[code]
+
+def encode_cards(cards) -> bytearray:
+    """Pack a pile or crime scene into one byte per card (0 for None)."""
+    return bytearray(NO_CARD if c is None else c.code for c in cards)
+
+def decode_cards(codes) -> list:
+    """Inverse of encode_cards(), returning the shared Card instances."""
+    return [CARDS[c] for c in codes]
 
 # =============================================================================
 # ACTION DEFINITIONS
@@ -71,7 +111,7 @@ class ActionType(Enum):
     KINGPIN_ADD = auto()
     SKIP_EFFECT = auto()
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Action:
     action_type: ActionType
     target_idx: Optional[int] = None
@@ -89,11 +129,263 @@ class GamePhase(Enum):
     FINAL_TURN = auto()
     GAME_OVER = auto()
 
+# An action draws at most this many cards: the DRAW phase draw plus the next
+# player's draw after a knock or a final-turn hand-off (or a KINGPIN_ADD).
+_UNDO_DRAW_DEPTH = 2
+
+# The crime scenes and memories each action can change, as (scenes,
+# memories) with 0 for the player to move and 1 for the opponent; undo
+# records save only these. Draws change neither.
+_UNDO_TOUCHES = {
+    ActionType.SWAP_BLIND: ((0,), ((0, "memory"), (1, "opp_memory"))),
+    ActionType.DISCARD: ((), ()),
+    ActionType.KNOCK: ((), ()),
+    ActionType.PEEK_OWN: ((), ((0, "memory"),)),
+    ActionType.PEEK_OPPONENT: ((), ((0, "opp_memory"),)),
+    ActionType.SWAP_ANY_TWO: ((0, 1), ((0, "memory"), (0, "opp_memory"))),
+    ActionType.KINGPIN_ELIMINATE: ((0,), ((0, "memory"),)),
+    ActionType.KINGPIN_ADD: ((1,), ()),
+    ActionType.SKIP_EFFECT: ((), ()),
+}
+
+# =============================================================================
+# SERIALIZED STATE
+# =============================================================================
+
+# StoolPigeonGame.to_bytes(): this header, then per player the crime scene,
+# memory and opp_memory as in state_key(), then the draw and discard piles
+# and card_counts (one byte each, so restoring doesn't recount).
+#   magic, version, phase, current player, pending effect code, knocked_by,
+#   winner (255 = None), flags (done, human player << 1), drawn card code,
+#   turn_count, scores, reshuffle_seed, reshuffles
+_STATE_HEADER = struct.Struct("<4sBBBBBBBBIhhQI")
+_STATE_MAGIC = b"SPGS"
+STATE_VERSION = 1
+_PHASE_BY_VALUE = {phase.value: phase for phase in GamePhase}
+
+# =============================================================================
+# CARD COUNT INDEX
+# =============================================================================
+
+# StoolPigeonGame.card_counts is a flat list of NUM_COUNT_ZONES rows of
+# NUM_CARD_CODES counts: card_counts[zone * NUM_CARD_CODES + code]. The
+# KNOWN rows count the cards a player can locate: the discard pile, its own
+# drawn card and its memory/opp_memory entries.
+ZONE_DRAW = 0
+ZONE_DISCARD = 1
+ZONE_SCENE = 2      # + player index
+ZONE_HELD = 4       # The drawn card
+ZONE_KNOWN = 5      # + player index
+NUM_COUNT_ZONES = 7
+
+DECK_COUNTS = tuple(DECK_CODES.count(code) for code in range(NUM_CARD_CODES))
+
+# Row offsets into card_counts, for the hot paths that update it inline
+_DRAW_ROW = ZONE_DRAW * NUM_CARD_CODES
+_DISCARD_ROW = ZONE_DISCARD * NUM_CARD_CODES
+_SCENE_ROWS = (ZONE_SCENE * NUM_CARD_CODES, (ZONE_SCENE + 1) * NUM_CARD_CODES)
+_HELD_ROW = ZONE_HELD * NUM_CARD_CODES
+_KNOWN_ROWS = (ZONE_KNOWN * NUM_CARD_CODES, (ZONE_KNOWN + 1) * NUM_CARD_CODES)
+
+# =============================================================================
+# ZOBRIST KEYS
+# =============================================================================
+
+# Random 64-bit keys for StoolPigeonGame.zobrist_key()/info_set_key().
+# _ZOBRIST_CARDS[zone][slot][code] for the DRAW, DISCARD, SCENE and HELD
+# (slot 0 only) zones, with a slot per position in the zone. Code NO_CARD
+# stands for a face-down card: information-set hashes see how many cards a
+# hidden zone holds, not which, and _ZOBRIST_FILLED[zone][n] is the XOR of
+# those keys for slots 0..n-1. _ZOBRIST_MEMORY[player][key][idx][code]
+# covers memory and opp_memory; the status keys are indexed by phase,
+# pending effect code, player to move and knocked_by (None, 0 or 1).
+ZOBRIST_SLOTS = len(DECK_CODES)     # No zone can hold more than the deck
+
+def _zobrist_rows(rng: random.Random) -> tuple:
+    return tuple(tuple(rng.getrandbits(64) for _ in range(NUM_CARD_CODES))
+                 for _ in range(ZOBRIST_SLOTS))
+
+def _filled_prefix(rows: tuple) -> tuple:
+    prefix = [0]
+    for row in rows:
+        prefix.append(prefix[-1] ^ row[NO_CARD])
+    return tuple(prefix)
+
+# A fixed seed, so hashes agree across processes and runs
+_zobrist_rng = random.Random(0x5700_1916E0)
+_ZOBRIST_CARDS = tuple(_zobrist_rows(_zobrist_rng) for _ in range(ZONE_HELD + 1))
+_ZOBRIST_FILLED = tuple(_filled_prefix(rows) for rows in _ZOBRIST_CARDS)
+_ZOBRIST_MEMORY = tuple({key: _zobrist_rows(_zobrist_rng) for key in ("memory", "opp_memory")}
+                        for _ in range(2))
+_ZOBRIST_STATUS = tuple(_zobrist_rng.getrandbits(64)
+                        for _ in range((len(GamePhase) + 1) * NUM_CARD_CODES * 2 * 3))
+_ZOBRIST_VIEWER = (_zobrist_rng.getrandbits(64), _zobrist_rng.getrandbits(64))
+del _zobrist_rng
+
+# Per-zone key rows for the hot paths
+_Z_DRAW = _ZOBRIST_CARDS[ZONE_DRAW]
+_Z_DISCARD = _ZOBRIST_CARDS[ZONE_DISCARD]
+_Z_SCENES = (_ZOBRIST_CARDS[ZONE_SCENE], _ZOBRIST_CARDS[ZONE_SCENE + 1])
+_Z_HELD = _ZOBRIST_CARDS[ZONE_HELD][0]
+_Z_MEMORY = tuple(keys["memory"] for keys in _ZOBRIST_MEMORY)
+_Z_OPP_MEMORY = tuple(keys["opp_memory"] for keys in _ZOBRIST_MEMORY)
+
+def _zobrist_of(rows: tuple, cards: list) -> int:
+    """XOR of the keys of a pile or crime scene, slot by slot."""
+    z = 0
+    for row, card in zip(rows, cards):
+        z ^= row[card.code]
+    return z
+
+# =============================================================================
+# LEGAL ACTION TABLES
+# =============================================================================
+
+# Shared action tuples, keyed as in StoolPigeonGame.get_legal_actions()
+_ACTION_TABLES = {}
+_KINGPIN_TABLES = {}
+_SWAP_TABLES = {}
+
+def _swap_any_two_actions(n_own: int, n_opp: int) -> tuple:
+    actions = _SWAP_TABLES.get((n_own, n_opp))
+    if actions is None:
+        all_cards = [(0, i) for i in range(n_own)] + [(1, i) for i in range(n_opp)]
+        actions = _SWAP_TABLES[(n_own, n_opp)] = tuple(
+            Action(ActionType.SWAP_ANY_TWO, target_idx=c1, target_player=p1,
+                   target_idx2=c2, target_player2=p2)
+            for idx1, (p1, c1) in enumerate(all_cards)
+            for p2, c2 in all_cards[idx1+1:])
+    return actions
+
+def _build_legal_actions(phase, pending_effect, n_own, n_opp, knocked, draw_empty) -> tuple:
+    actions = []
+    
+    if phase in (GamePhase.DECIDE, GamePhase.FINAL_TURN):
+        for i in range(n_own):
+            actions.append(Action(ActionType.SWAP_BLIND, target_idx=i))
+        actions.append(Action(ActionType.DISCARD))
+        if phase == GamePhase.DECIDE and not knocked:
+            actions.append(Action(ActionType.KNOCK))
+    
+    elif phase == GamePhase.RESOLVE_EFFECT:
+        if pending_effect == CardType.STOOL_PIGEON:
+            for i in range(n_own):
+                actions.append(Action(ActionType.PEEK_OWN, target_idx=i))
+            for i in range(n_opp):
+                actions.append(Action(ActionType.PEEK_OPPONENT, target_idx=i))
+            actions.append(Action(ActionType.SKIP_EFFECT))
+        
+        elif pending_effect == CardType.BAMBOOZLE:
+            actions.extend(_swap_any_two_actions(n_own, n_opp))
+            actions.append(Action(ActionType.SKIP_EFFECT))
+        
+        elif pending_effect == CardType.KINGPIN:
+            # RAT cards are masked out per hand in get_legal_actions()
+            for i in range(n_own):
+                actions.append(Action(ActionType.KINGPIN_ELIMINATE, target_idx=i))
+            if not draw_empty:
+                actions.append(Action(ActionType.KINGPIN_ADD))
+            actions.append(Action(ActionType.SKIP_EFFECT))
+    
+    elif phase == GamePhase.VENDETTA_PEEK:
+        for i in range(n_own):
+            actions.append(Action(ActionType.PEEK_OWN, target_idx=i))
+        for i in range(n_opp):
+            actions.append(Action(ActionType.PEEK_OPPONENT, target_idx=i))
+        actions.append(Action(ActionType.SKIP_EFFECT))
+    
+    elif phase == GamePhase.VENDETTA_SWAP:
+        actions.extend(_swap_any_two_actions(n_own, n_opp))
+        actions.append(Action(ActionType.SKIP_EFFECT))
+    
+    return tuple(actions)
+
+# =============================================================================
+# FIXED ACTION INDEX SPACE
+# =============================================================================
+
+class ActionSpace:
+    """
+    Stable integer encoding of every Action for crime scenes of up to
+    max_hand cards, for learners that need a fixed-size action vector.
+    
+    Slots are numbered 0..max_hand-1 for the acting player's crime scene and
+    max_hand..2*max_hand-1 for the opponent's, following the target_player
+    convention of SWAP_ANY_TWO. Actions on positions past max_hand have no
+    index and are left out of masks.
+    """
+    
+    def __init__(self, max_hand: int = 8):
+        H = max_hand
+        self.max_hand = H
+        self.hand_mask = (1 << H) - 1
+        self.swap_blind = 0
+        self.discard = H
+        self.knock = H + 1
+        self.peek_own = H + 2
+        self.peek_opponent = 2 * H + 2
+        self.swap_any_two = 3 * H + 2
+        self.pairs = tuple((a, b) for a in range(2 * H) for b in range(a + 1, 2 * H))
+        self.kingpin_eliminate = self.swap_any_two + len(self.pairs)
+        self.kingpin_add = self.kingpin_eliminate + H
+        self.skip_effect = self.kingpin_add + 1
+        self.size = self.skip_effect + 1
+        
+        actions = [Action(ActionType.SWAP_BLIND, target_idx=i) for i in range(H)]
+        actions += [Action(ActionType.DISCARD), Action(ActionType.KNOCK)]
+        actions += [Action(ActionType.PEEK_OWN, target_idx=i) for i in range(H)]
+        actions += [Action(ActionType.PEEK_OPPONENT, target_idx=i) for i in range(H)]
+        actions += [Action(ActionType.SWAP_ANY_TWO, target_idx=a % H, target_player=a // H,
+                           target_idx2=b % H, target_player2=b // H) for a, b in self.pairs]
+        actions += [Action(ActionType.KINGPIN_ELIMINATE, target_idx=i) for i in range(H)]
+        actions += [Action(ActionType.KINGPIN_ADD), Action(ActionType.SKIP_EFFECT)]
+        self.actions = tuple(actions)
+        self._index = {a: i for i, a in enumerate(self.actions)}
+        self._table_bits = {}
+        self._masks = {}
+    
+    def action(self, index: int) -> Action:
+        return self.actions[index]
+    
+    def index(self, action: Action) -> Optional[int]:
+        """Index of an action, or None if it targets a position past max_hand."""
+        i = self._index.get(action)
+        if i is None and action.action_type == ActionType.SWAP_ANY_TWO:
+            # The same swap with its two targets given in the other order
+            i = self._index.get(Action(ActionType.SWAP_ANY_TWO,
+                                       target_idx=action.target_idx2,
+                                       target_player=action.target_player2,
+                                       target_idx2=action.target_idx,
+                                       target_player2=action.target_player))
+        return i
+    
+    def bits_of(self, actions) -> int:
+        bits = 0
+        for a in actions:
+            i = self._index.get(a)
+            if i is not None:
+                bits |= 1 << i
+        return bits
+    
+    def mask_of(self, bits: int):
+        """Read-only NumPy bool mask for a bitset, cached per distinct bitset."""
+        mask = self._masks.get(bits)
+        if mask is None:
+            import numpy as np
+            mask = np.array([(bits >> i) & 1 for i in range(self.size)], dtype=bool)
+            mask.flags.writeable = False
+            self._masks[bits] = mask
+        return mask
+
+DEFAULT_ACTION_SPACE = ActionSpace()
+
 # =============================================================================
 # CLICKABLE BUTTON CLASS
 # =============================================================================
 
 class Button:
+    __slots__ = ("rect", "text", "color", "hover_color", "text_color", "enabled", "visible")
+    
     def __init__(self, x, y, width, height, text, color, hover_color, text_color=(0,0,0)):
         self.rect = (x, y, width, height)
         self.text = text
@@ -125,6 +417,9 @@ class Button:
 # =============================================================================
 
 class ClickableCard:
+    __slots__ = ("rect", "card", "face_up", "label", "player_idx", "card_idx",
+                 "selected", "enabled", "visible")
+    
     def __init__(self, x, y, width, height, card=None, face_up=False, label="", player_idx=0, card_idx=0):
         self.rect = (x, y, width, height)
         self.card = card
@@ -195,8 +490,46 @@ class ClickableCard:
 # =============================================================================
 
 class StoolPigeonGame:
-    def __init__(self, GUI=False, render_delay_sec=0.3, human_player_idx=0):
+    # Rendering tables, shared by every game
+    cardColors = {
+        CardType.NUMBERED: (125, 124, 122), #
+        CardType.STOOL_PIGEON: (18, 13, 49), #
+        CardType.BAMBOOZLE: (108, 207, 246), #
+        CardType.VENDETTA: (69, 74, 222), #
+        CardType.KINGPIN: (216, 241, 160),
+        CardType.RAT: (224, 153, 0), #
+        CardType.MEATBALL: (49, 37, 9) #
+    }
+
+    # Emoji icons for special cards
+    cardEmojis = {
+        CardType.STOOL_PIGEON: "𓅪",
+        CardType.BAMBOOZLE: "⇆",
+        CardType.VENDETTA: "💀",
+        CardType.KINGPIN: "👑",
+        CardType.RAT: "🐀",
+        CardType.MEATBALL: "🍖"
+    }
+
+    # Fallback text if emoji font unavailable
+    cardFallback = {
+        CardType.STOOL_PIGEON: "PGN",
+        CardType.BAMBOOZLE: "BMB",
+        CardType.VENDETTA: "VND",
+        CardType.KINGPIN: "KNG",
+        CardType.RAT: "RAT",
+        CardType.MEATBALL: "MTB"
+    }
+    
+    def __init__(self, GUI=False, render_delay_sec=0.3, human_player_idx=0, deal=None,
+                 seed=None, rng=None):
+        """
+        seed/rng: the game's own random.Random, used for the deal and to
+        pick reshuffle_seed (a new one seeded with seed unless rng is given).
+        """
         self.GUI = GUI
+        self.seed = seed
+        self.rng = rng if rng is not None else random.Random(seed)
         self.sleeptime = render_delay_sec
         self.cardWidth = 65
         self.cardHeight = 90
@@ -209,36 +542,6 @@ class StoolPigeonGame:
         self.gold = (255, 215, 0)
         self.red = (220, 20, 60)
         
-        self.cardColors = {
-            CardType.NUMBERED: (125, 124, 122), #
-            CardType.STOOL_PIGEON: (18, 13, 49), #
-            CardType.BAMBOOZLE: (108, 207, 246), #
-            CardType.VENDETTA: (69, 74, 222), #
-            CardType.KINGPIN: (216, 241, 160),
-            CardType.RAT: (224, 153, 0), #
-            CardType.MEATBALL: (49, 37, 9) #
-        }
-        
-        # Emoji icons for special cards
-        self.cardEmojis = {
-            CardType.STOOL_PIGEON: "𓅪",
-            CardType.BAMBOOZLE: "⇆",
-            CardType.VENDETTA: "💀",
-            CardType.KINGPIN: "👑",
-            CardType.RAT: "🐀",
-            CardType.MEATBALL: "🍖"
-        }
-        
-        # Fallback text if emoji font unavailable
-        self.cardFallback = {
-            CardType.STOOL_PIGEON: "PGN",
-            CardType.BAMBOOZLE: "BMB",
-            CardType.VENDETTA: "VND",
-            CardType.KINGPIN: "KNG",
-            CardType.RAT: "RAT",
-            CardType.MEATBALL: "MTB"
-        }
-        
         # Pygame objects
         self.screen = None
         self.clock = None
@@ -266,6 +569,28 @@ class StoolPigeonGame:
         self.winner = None
         self.scores = (0, 0)
         
+        # Reshuffle n shuffles with a stream seeded from (reshuffle_seed, n)
+        # alone, so a game restored from to_bytes() reshuffles the same way
+        self.reshuffle_seed = 0
+        self.reshuffles = 0
+        
+        # Cards per zone and code, see CARD COUNT INDEX
+        self.card_counts = [0] * (NUM_COUNT_ZONES * NUM_CARD_CODES)
+        
+        # Incremental Zobrist hashes, see ZOBRIST KEYS: [crime scenes and
+        # drawn card, discard pile, draw pile, player 0's memories, player
+        # 1's memories]. None until zobrist_key()/info_set_key() is first
+        # called, so games that never ask for a key don't keep them.
+        self._zobrist = None
+        
+        # Undo records for push_action()/undo()
+        self._undo_stack = []
+        self._recording = None
+        
+        # Called with the new draw pile after each reshuffle; may reorder it
+        # in place (trajectory.py records and replays reshuffles this way).
+        self.reshuffle_hook = None
+        
         # GUI state
         self.buttons = []
         self.clickable_cards = []
@@ -273,7 +598,7 @@ class StoolPigeonGame:
         self.message = ""
         self.message_timer = 0
         
-        self._setup_game()
+        self._setup_game(deal)
         
         if self.GUI:
             self._init_pygame()
@@ -337,23 +662,17 @@ class StoolPigeonGame:
         print("No emoji font found, using text fallback for card icons.")
     
     def _create_deck(self) -> list:
-        deck = []
-        for val in range(1, 13):
-            deck.append(Card(CardType.NUMBERED, val))
-            deck.append(Card(CardType.NUMBERED, val))
-        for _ in range(4):
-            deck.append(Card(CardType.STOOL_PIGEON))
-            deck.append(Card(CardType.BAMBOOZLE))
-            deck.append(Card(CardType.VENDETTA))
-        for _ in range(2):
-            deck.append(Card(CardType.KINGPIN))
-            deck.append(Card(CardType.RAT))
-            deck.append(Card(CardType.MEATBALL))
-        return deck
+        return [CARDS[c] for c in DECK_CODES]
     
-    def _setup_game(self):
-        self.draw_pile = self._create_deck()
-        random.shuffle(self.draw_pile)
+    def _setup_game(self, deal: Optional[bytes] = None):
+        """Deal a new game from a shuffled deck, or from deal (card codes, bottom first)."""
+        if deal is None:
+            self.draw_pile = self._create_deck()
+            self.rng.shuffle(self.draw_pile)
+        else:
+            self.draw_pile = decode_cards(deal)
+        self.reshuffle_seed = self.rng.getrandbits(64)
+        self.reshuffles = 0
         
         for player in self.players:
             player["crime_scene"] = []
@@ -375,73 +694,94 @@ class StoolPigeonGame:
         self.turn_count = 0
         self.done = False
         self.winner = None
+        self.scores = (0, 0)
         self.selected_card = None
+        self._undo_stack = []
+        self._count_deal()
+        self._zobrist = None
         self.message = "Game started! Click DRAW to begin."
     
     # =========================================================================
     # CORE GAME LOGIC
     # =========================================================================
     
-    def get_legal_actions(self) -> list:
-        actions = []
-        player = self.players[self.current_player_idx]
-        opp = self.players[1 - self.current_player_idx]
+    def get_legal_actions(self) -> tuple:
+        """
+        Return the legal actions as a shared, immutable tuple.
         
+        Tables are built once per (phase, pending effect, hand sizes, knocked,
+        draw pile empty) and reused; only Kingpin needs a per-hand RAT mask.
+        """
         if self.phase == GamePhase.DRAW:
-            return []
-        
-        elif self.phase in (GamePhase.DECIDE, GamePhase.FINAL_TURN):
-            for i in range(len(player["crime_scene"])):
-                actions.append(Action(ActionType.SWAP_BLIND, target_idx=i))
-            actions.append(Action(ActionType.DISCARD))
-            if self.phase == GamePhase.DECIDE and self.knocked_by is None:
-                actions.append(Action(ActionType.KNOCK))
-        
-        elif self.phase == GamePhase.RESOLVE_EFFECT:
-            if self.pending_effect == CardType.STOOL_PIGEON:
-                for i in range(len(player["crime_scene"])):
-                    actions.append(Action(ActionType.PEEK_OWN, target_idx=i))
-                for i in range(len(opp["crime_scene"])):
-                    actions.append(Action(ActionType.PEEK_OPPONENT, target_idx=i))
-                actions.append(Action(ActionType.SKIP_EFFECT))
-            
-            elif self.pending_effect == CardType.BAMBOOZLE:
-                actions.extend(self._get_swap_any_two_actions())
-                actions.append(Action(ActionType.SKIP_EFFECT))
-            
-            elif self.pending_effect == CardType.KINGPIN:
-                for i, card in enumerate(player["crime_scene"]):
-                    if card.card_type != CardType.RAT:
-                        actions.append(Action(ActionType.KINGPIN_ELIMINATE, target_idx=i))
-                if len(self.draw_pile) > 0:
-                    actions.append(Action(ActionType.KINGPIN_ADD))
-                actions.append(Action(ActionType.SKIP_EFFECT))
-        
-        elif self.phase == GamePhase.VENDETTA_PEEK:
-            for i in range(len(player["crime_scene"])):
-                actions.append(Action(ActionType.PEEK_OWN, target_idx=i))
-            for i in range(len(opp["crime_scene"])):
-                actions.append(Action(ActionType.PEEK_OPPONENT, target_idx=i))
-            actions.append(Action(ActionType.SKIP_EFFECT))
-        
-        elif self.phase == GamePhase.VENDETTA_SWAP:
-            actions.extend(self._get_swap_any_two_actions())
-            actions.append(Action(ActionType.SKIP_EFFECT))
-        
+            return ()
+        key = self._legal_key()
+        actions = _ACTION_TABLES.get(key)
+        if actions is None:
+            actions = _ACTION_TABLES[key] = _build_legal_actions(*key)
+        
+        if self.pending_effect == CardType.KINGPIN and self.phase == GamePhase.RESOLVE_EFFECT:
+            rat_mask = self._rat_mask()
+            if rat_mask:
+                filtered = _KINGPIN_TABLES.get((key, rat_mask))
+                if filtered is None:
+                    filtered = _KINGPIN_TABLES[(key, rat_mask)] = tuple(
+                        a for a in actions
+                        if a.action_type != ActionType.KINGPIN_ELIMINATE
+                        or not rat_mask & (1 << a.target_idx))
+                return filtered
         return actions
     
+    def _legal_key(self) -> tuple:
+        return (self.phase, self.pending_effect,
+                len(self.players[self.current_player_idx]["crime_scene"]),
+                len(self.players[1 - self.current_player_idx]["crime_scene"]),
+                self.knocked_by is not None, not self.draw_pile)
+    
+    def _rat_mask(self) -> int:
+        """Bitmask of the current player's crime scene positions holding a RAT."""
+        rat_mask = 0
+        for i, card in enumerate(self.players[self.current_player_idx]["crime_scene"]):
+            if card.code == CODE_RAT:
+                rat_mask |= 1 << i
+        return rat_mask
+    
+    def legal_action_bits(self, space=None) -> int:
+        """Legal actions as a bitset over an ActionSpace (bit i = action index i)."""
+        if self.phase == GamePhase.DRAW:
+            return 0
+        space = space or DEFAULT_ACTION_SPACE
+        key = self._legal_key()
+        bits = space._table_bits.get(key)
+        if bits is None:
+            actions = _ACTION_TABLES.get(key)
+            if actions is None:
+                actions = _ACTION_TABLES[key] = _build_legal_actions(*key)
+            bits = space._table_bits[key] = space.bits_of(actions)
+        if self.pending_effect == CardType.KINGPIN and self.phase == GamePhase.RESOLVE_EFFECT:
+            bits &= ~((self._rat_mask() & space.hand_mask) << space.kingpin_eliminate)
+        return bits
+    
+    def legal_action_mask(self, space=None, out=None):
+        """
+        Legal actions as a NumPy bool array over an ActionSpace.
+        
+        The returned array is shared and read-only; pass out to have the
+        mask copied into a buffer of your own instead.
+        """
+        space = space or DEFAULT_ACTION_SPACE
+        mask = space.mask_of(self.legal_action_bits(space))
+        if out is not None:
+            out[:] = mask
+            return out
+        return mask
+    
+    def apply_action_index(self, index: int, space=None):
+        """apply_action() for an index into an ActionSpace."""
+        self.apply_action((space or DEFAULT_ACTION_SPACE).actions[index])
+    
     def _get_swap_any_two_actions(self):
-        actions = []
-        player = self.players[self.current_player_idx]
-        opp = self.players[1 - self.current_player_idx]
-        all_cards = [(0, i) for i in range(len(player["crime_scene"]))]
-        all_cards += [(1, i) for i in range(len(opp["crime_scene"]))]
-        for idx1, (p1, c1) in enumerate(all_cards):
-            for p2, c2 in all_cards[idx1+1:]:
-                actions.append(Action(ActionType.SWAP_ANY_TWO,
-                                     target_idx=c1, target_player=p1,
-                                     target_idx2=c2, target_player2=p2))
-        return actions
+        return _swap_any_two_actions(len(self.players[self.current_player_idx]["crime_scene"]),
+                                     len(self.players[1 - self.current_player_idx]["crime_scene"]))
     
     def apply_action(self, action: Action):
         if self.phase == GamePhase.DRAW:
@@ -451,17 +791,42 @@ class StoolPigeonGame:
             self._refresh()
     
     def _apply_action(self, action: Action):
-        player = self.players[self.current_player_idx]
-        opp = self.players[1 - self.current_player_idx]
+        p_idx = self.current_player_idx
+        player = self.players[p_idx]
+        opp = self.players[1 - p_idx]
         
         if action.action_type == ActionType.SWAP_BLIND:
             idx = action.target_idx
             old_card = player["crime_scene"][idx]
             player["crime_scene"][idx] = self.drawn_card
             self.discard_pile.append(old_card)
+            counts = self.card_counts
+            old, new, scene = old_card.code, self.drawn_card.code, _SCENE_ROWS[p_idx]
+            counts[scene + old] -= 1
+            counts[_DISCARD_ROW + old] += 1
+            counts[_KNOWN_ROWS[0] + old] += 1
+            counts[_KNOWN_ROWS[1] + old] += 1
+            counts[_HELD_ROW + new] -= 1
+            counts[scene + new] += 1
+            # The drawn card stays known to the player, now through memory
+            forgotten = player["memory"].get(idx)
+            if forgotten is not None:
+                counts[_KNOWN_ROWS[p_idx] + forgotten.code] -= 1
             player["memory"][idx] = self.drawn_card
-            if idx in opp["opp_memory"]:
-                del opp["opp_memory"][idx]
+            opp_forgotten = opp["opp_memory"].pop(idx, None)
+            if opp_forgotten is not None:
+                counts[_KNOWN_ROWS[1 - p_idx] + opp_forgotten.code] -= 1
+            z = self._zobrist
+            if z is not None:
+                row = _Z_SCENES[p_idx][idx]
+                z[0] ^= row[old] ^ row[new] ^ _Z_HELD[new]
+                z[1] ^= _Z_DISCARD[len(self.discard_pile) - 1][old]
+                row = _Z_MEMORY[p_idx][idx]
+                z[3 + p_idx] ^= row[new]
+                if forgotten is not None:
+                    z[3 + p_idx] ^= row[forgotten.code]
+                if opp_forgotten is not None:
+                    z[4 - p_idx] ^= _Z_OPP_MEMORY[1 - p_idx][idx][opp_forgotten.code]
             self.message = f"Swapped with position {idx}, discarded {old_card}"
             self.drawn_card = None
             self._end_turn()
@@ -470,6 +835,14 @@ class StoolPigeonGame:
             card = self.drawn_card
             self.discard_pile.append(card)
             self.drawn_card = None
+            counts = self.card_counts
+            counts[_HELD_ROW + card.code] -= 1
+            counts[_DISCARD_ROW + card.code] += 1
+            counts[_KNOWN_ROWS[1 - p_idx] + card.code] += 1
+            z = self._zobrist
+            if z is not None:
+                z[0] ^= _Z_HELD[card.code]
+                z[1] ^= _Z_DISCARD[len(self.discard_pile) - 1][card.code]
             if card.card_type == CardType.STOOL_PIGEON:
                 self.pending_effect = CardType.STOOL_PIGEON
                 self.phase = GamePhase.RESOLVE_EFFECT
@@ -491,6 +864,12 @@ class StoolPigeonGame:
                 self._end_turn()
         
         elif action.action_type == ActionType.KNOCK:
+            # The knocker's drawn card leaves play; the next draw replaces it.
+            if self.drawn_card is not None:
+                self._count(self.drawn_card, ZONE_HELD, -1)
+                self._count_known(self.drawn_card, -1, p_idx)
+                if self._zobrist is not None:
+                    self._zobrist[0] ^= _Z_HELD[self.drawn_card.code]
             self.knocked_by = self.current_player_idx
             self.message = f"{player['name']} KNOCKED! Final turn for opponent."
             self.phase = GamePhase.FINAL_TURN
@@ -500,13 +879,13 @@ class StoolPigeonGame:
         
         elif action.action_type == ActionType.PEEK_OWN:
             idx = action.target_idx
-            player["memory"][idx] = player["crime_scene"][idx]
+            self._remember(p_idx, "memory", idx, player["crime_scene"][idx])
             self.message = f"Peeked: position {idx} is {player['crime_scene'][idx]}"
             self._resolve_effect_done()
         
         elif action.action_type == ActionType.PEEK_OPPONENT:
             idx = action.target_idx
-            player["opp_memory"][idx] = opp["crime_scene"][idx]
+            self._remember(p_idx, "opp_memory", idx, opp["crime_scene"][idx])
             self.message = f"Peeked: opponent's {idx} is {opp['crime_scene'][idx]}"
             self._resolve_effect_done()
         
@@ -517,23 +896,46 @@ class StoolPigeonGame:
             p1, p2 = players_map[p1_idx], players_map[p2_idx]
             p1["crime_scene"][c1_idx], p2["crime_scene"][c2_idx] = \
                 p2["crime_scene"][c2_idx], p1["crime_scene"][c1_idx]
+            # Target players are relative: 0 is the current player
+            abs1 = p_idx if p1_idx == 0 else 1 - p_idx
+            abs2 = p_idx if p2_idx == 0 else 1 - p_idx
+            if self._zobrist is not None:
+                row1, row2 = _Z_SCENES[abs1][c1_idx], _Z_SCENES[abs2][c2_idx]
+                code1, code2 = p1["crime_scene"][c1_idx].code, p2["crime_scene"][c2_idx].code
+                self._zobrist[0] ^= row1[code1] ^ row1[code2] ^ row2[code1] ^ row2[code2]
+            if p1_idx != p2_idx:
+                zone1, zone2 = ZONE_SCENE + abs1, ZONE_SCENE + abs2
+                self._count_move(p2["crime_scene"][c2_idx], zone1, zone2)
+                self._count_move(p1["crime_scene"][c1_idx], zone2, zone1)
             # Clear memories
-            if c1_idx in player["memory"] and p1_idx == 0:
-                del player["memory"][c1_idx]
-            if c2_idx in player["memory"] and p2_idx == 0:
-                del player["memory"][c2_idx]
-            if c1_idx in player["opp_memory"] and p1_idx == 1:
-                del player["opp_memory"][c1_idx]
-            if c2_idx in player["opp_memory"] and p2_idx == 1:
-                del player["opp_memory"][c2_idx]
+            self._forget(p_idx, "memory" if p1_idx == 0 else "opp_memory", c1_idx)
+            self._forget(p_idx, "memory" if p2_idx == 0 else "opp_memory", c2_idx)
             self.message = "Cards swapped!"
             self.selected_card = None
             self._resolve_effect_done()
         
         elif action.action_type == ActionType.KINGPIN_ELIMINATE:
             idx = action.target_idx
-            removed = player["crime_scene"].pop(idx)
+            scene = player["crime_scene"]
+            removed = scene.pop(idx)
             self.discard_pile.append(removed)
+            self._count_move(removed, ZONE_SCENE + p_idx, ZONE_DISCARD)
+            self._count_known(removed, 1)
+            self._forget(p_idx, "memory", idx)
+            z = self._zobrist
+            if z is not None:
+                # The cards and memories after idx move down a slot
+                rows = _Z_SCENES[p_idx]
+                z_cards = rows[idx][removed.code]
+                for slot in range(idx, len(scene)):
+                    code = scene[slot].code
+                    z_cards ^= rows[slot + 1][code] ^ rows[slot][code]
+                z[0] ^= z_cards
+                z[1] ^= _Z_DISCARD[len(self.discard_pile) - 1][removed.code]
+                rows = _Z_MEMORY[p_idx]
+                for k, v in player["memory"].items():
+                    if k > idx:
+                        z[3 + p_idx] ^= rows[k][v.code] ^ rows[k - 1][v.code]
             new_mem = {}
             for k, v in player["memory"].items():
                 if k < idx:
@@ -548,6 +950,11 @@ class StoolPigeonGame:
             if self.draw_pile:
                 new_card = self.draw_pile.pop()
                 opp["crime_scene"].append(new_card)
+                self._count_move(new_card, ZONE_DRAW, ZONE_SCENE + 1 - p_idx)
+                z = self._zobrist
+                if z is not None:
+                    z[2] ^= _Z_DRAW[len(self.draw_pile)][new_card.code]
+                    z[0] ^= _Z_SCENES[1 - p_idx][len(opp["crime_scene"]) - 1][new_card.code]
                 self.message = "Added a card to opponent's crime scene!"
             self._resolve_effect_done()
         
@@ -584,24 +991,127 @@ class StoolPigeonGame:
     def _do_draw(self):
         if not self.draw_pile:
             if len(self.discard_pile) > 1:
+                if self._recording is not None and self._recording[-1] is None:
+                    self._recording[-1] = list(self.discard_pile)
                 top = self.discard_pile.pop()
                 self.draw_pile = self.discard_pile
                 self.discard_pile = [top]
-                random.shuffle(self.draw_pile)
+                for card in self.draw_pile:
+                    self._count_move(card, ZONE_DISCARD, ZONE_DRAW)
+                    self._count_known(card, -1)
+                # Built here rather than kept per game: reshuffles are rare and
+                # a Mersenne Twister is 2.5 KB
+                random.Random(self.reshuffle_seed << 32 | self.reshuffles).shuffle(self.draw_pile)
+                self.reshuffles += 1
+                if self.reshuffle_hook is not None:
+                    self.reshuffle_hook(self.draw_pile)
+                z = self._zobrist
+                if z is not None:
+                    z[1] = _Z_DISCARD[0][top.code]
+                    z[2] = _zobrist_of(_Z_DRAW, self.draw_pile)
             else:
                 self.phase = GamePhase.GAME_OVER
                 self._calculate_scores()
                 self.done = True
                 return
         
-        self.drawn_card = self.draw_pile.pop()
+        self.drawn_card = card = self.draw_pile.pop()
+        counts = self.card_counts
+        counts[_DRAW_ROW + card.code] -= 1
+        counts[_HELD_ROW + card.code] += 1
+        counts[_KNOWN_ROWS[self.current_player_idx] + card.code] += 1
+        z = self._zobrist
+        if z is not None:
+            z[0] ^= _Z_HELD[card.code]
+            z[2] ^= _Z_DRAW[len(self.draw_pile)][card.code]
         if self.phase != GamePhase.FINAL_TURN:
             self.phase = GamePhase.DECIDE
         self.message = f"Drew {self.drawn_card}. Choose: swap with a card, discard, or knock."
     
+    # =========================================================================
+    # MAKE / UNMAKE FOR TREE SEARCH
+    # =========================================================================
+    
+    def push_action(self, action: Action):
+        """Like apply_action(), but records an undo entry for undo()."""
+        self._recording = self._make_undo_record(*_UNDO_TOUCHES[action.action_type])
+        try:
+            self.apply_action(action)
+        finally:
+            self._undo_stack.append(self._recording)
+            self._recording = None
+    
+    def push_draw(self):
+        """Undoable version of the DRAW phase's _do_draw()."""
+        self._recording = self._make_undo_record()
+        try:
+            self._do_draw()
+        finally:
+            self._undo_stack.append(self._recording)
+            self._recording = None
+    
+    def undo(self):
+        """Restore the state from before the last push_action()/push_draw()."""
+        (self.phase, self.current_player_idx, self.knocked_by, self.drawn_card,
+         self.pending_effect, self.turn_count, self.done, self.winner, self.scores,
+         self.message, self.selected_card, self.reshuffles, scenes, memories, self.card_counts,
+         self._zobrist, draw_len, draw_tail, discard_len, reshuffle) = self._undo_stack.pop()
+        
+        for p_idx, scene in scenes:
+            self.players[p_idx]["crime_scene"][:] = scene
+        for p_idx, key, mem in memories:
+            self.players[p_idx][key] = mem
+        
+        if reshuffle is None:
+            # Piles only lost cards off the top of the draw pile and gained
+            # cards on top of the discard pile.
+            del self.draw_pile[max(draw_len - _UNDO_DRAW_DEPTH, 0):]
+            self.draw_pile.extend(draw_tail)
+            del self.discard_pile[discard_len:]
+        else:
+            # A reshuffle only happens once the draw pile is empty, so the
+            # saved tail is the whole pile from before the action.
+            self.draw_pile = list(draw_tail)
+            self.discard_pile = reshuffle[:discard_len]
+    
+    def reseed_and_reset(self, seed, deal: Optional[bytes] = None):
+        """Start a new game from seed in place, reusing this object and its rng."""
+        self.seed = seed
+        self.rng.seed(seed)
+        self._setup_game(deal)
+    
+    def can_undo(self) -> bool:
+        return bool(self._undo_stack)
+    
+    def _make_undo_record(self, scenes=(), memories=()) -> list:
+        """
+        Save what an action can change: the status fields, the scenes and
+        memories listed in _UNDO_TOUCHES, the tops of the piles and
+        card_counts. card_counts is copied whole: one 133-entry list copy
+        is cheaper than logging each count the action moves.
+        
+        The last entry is filled in by _do_draw() if the action reshuffles.
+        """
+        p_idx = self.current_player_idx
+        players = self.players
+        return [
+            self.phase, p_idx, self.knocked_by, self.drawn_card,
+            self.pending_effect, self.turn_count, self.done, self.winner, self.scores,
+            self.message, self.selected_card, self.reshuffles,
+            tuple((p_idx ^ rel, tuple(players[p_idx ^ rel]["crime_scene"])) for rel in scenes),
+            tuple((p_idx ^ rel, key, dict(players[p_idx ^ rel][key])) for rel, key in memories),
+            self.card_counts[:],
+            None if self._zobrist is None else self._zobrist[:],
+            len(self.draw_pile), self.draw_pile[-_UNDO_DRAW_DEPTH:], len(self.discard_pile),
+            None,
+        ]
+    
     def _calculate_scores(self):
         rat_value = 0
-        if self.draw_pile:
+        counts = self.card_counts
+        rats = (counts[ZONE_SCENE * NUM_CARD_CODES + CODE_RAT] +
+                counts[(ZONE_SCENE + 1) * NUM_CARD_CODES + CODE_RAT])
+        if rats and self.draw_pile:
             top = self.draw_pile[-1]
             if top.card_type == CardType.NUMBERED:
                 rat_value = top.value
@@ -628,6 +1138,303 @@ class StoolPigeonGame:
     def get_winner(self) -> Optional[int]:
         return self.winner
     
+    def state_key(self) -> bytes:
+        """Pack the rule state into bytes, cheap to hash, compare and store."""
+        key = bytearray()
+        for player in self.players:
+            key.append(len(player["crime_scene"]))
+            key += encode_cards(player["crime_scene"])
+            for mem in (player["memory"], player["opp_memory"]):
+                key.append(len(mem))
+                for idx in sorted(mem):
+                    key.append(idx)
+                    key.append(mem[idx].code)
+        key.append(len(self.draw_pile))
+        key += encode_cards(self.draw_pile)
+        key.append(len(self.discard_pile))
+        key += encode_cards(self.discard_pile)
+        key.append(self.phase.value)
+        key.append(SPECIAL_CARD_CODES[self.pending_effect] if self.pending_effect else NO_CARD)
+        key.append(self.current_player_idx)
+        key.append(255 if self.knocked_by is None else self.knocked_by)
+        key.append(NO_CARD if self.drawn_card is None else self.drawn_card.code)
+        key.append(self.done)
+        return bytes(key)
+    
+    # =========================================================================
+    # SERIALIZATION
+    # =========================================================================
+    
+    def to_bytes(self) -> bytes:
+        """
+        Encode the rule state into a compact versioned blob (about 220 bytes).
+        
+        Covers the crime scenes, memories, piles, phase, pending effect,
+        knocked_by, turn count, scores, reshuffle_seed and reshuffles, so a
+        restored copy reshuffles exactly like the original. The game's rng
+        (only used for the deal), undo history and GUI state are left out.
+        """
+        flags = self.done | self.human_player_idx << 1
+        out = bytearray(_STATE_HEADER.pack(
+            _STATE_MAGIC, STATE_VERSION, self.phase.value, self.current_player_idx,
+            SPECIAL_CARD_CODES[self.pending_effect] if self.pending_effect else NO_CARD,
+            255 if self.knocked_by is None else self.knocked_by,
+            255 if self.winner is None else self.winner, flags,
+            NO_CARD if self.drawn_card is None else self.drawn_card.code,
+            self.turn_count, self.scores[0], self.scores[1],
+            self.reshuffle_seed, self.reshuffles))
+        for player in self.players:
+            out.append(len(player["crime_scene"]))
+            out += encode_cards(player["crime_scene"])
+            for mem in (player["memory"], player["opp_memory"]):
+                out.append(len(mem))
+                for idx, card in mem.items():
+                    out.append(idx)
+                    out.append(card.code)
+        for pile in (self.draw_pile, self.discard_pile):
+            out.append(len(pile))
+            out += encode_cards(pile)
+        out += bytes(self.card_counts)
+        return bytes(out)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "StoolPigeonGame":
+        """A new headless game restored from to_bytes(); see load_bytes()."""
+        game = cls(GUI=False, deal=DECK_CODES, seed=0)
+        game.load_bytes(data)
+        return game
+    
+    def load_bytes(self, data: bytes):
+        """
+        Restore the state saved by to_bytes() into this game, in place.
+        
+        Cheaper than from_bytes() for workers that reuse one game object.
+        The undo history is cleared; the game's rng is left alone.
+        """
+        (magic, version, phase, current, pending, knocked_by, winner, flags, drawn,
+         turn_count, score0, score1, reshuffle_seed, reshuffles) = _STATE_HEADER.unpack_from(data)
+        if magic != _STATE_MAGIC or version != STATE_VERSION:
+            raise ValueError(f"not a version {STATE_VERSION} game state")
+        
+        pos = _STATE_HEADER.size
+        for player in self.players:
+            n = data[pos]
+            player["crime_scene"] = [CARDS[code] for code in data[pos + 1:pos + 1 + n]]
+            pos += 1 + n
+            for key in ("memory", "opp_memory"):
+                n = data[pos]
+                pairs = data[pos + 1:pos + 1 + 2 * n]
+                player[key] = {pairs[i]: CARDS[pairs[i + 1]] for i in range(0, 2 * n, 2)}
+                pos += 1 + 2 * n
+        piles = []
+        for _ in range(2):
+            n = data[pos]
+            piles.append([CARDS[code] for code in data[pos + 1:pos + 1 + n]])
+            pos += 1 + n
+        self.draw_pile, self.discard_pile = piles
+        self.card_counts = list(data[pos:pos + NUM_COUNT_ZONES * NUM_CARD_CODES])
+        
+        human = flags >> 1
+        self.human_player_idx = human
+        for p_idx, player in enumerate(self.players):
+            player["name"] = "You" if p_idx == human else "AI"
+            player["is_human"] = p_idx == human
+        
+        self.phase = _PHASE_BY_VALUE[phase]
+        self.current_player_idx = current
+        self.pending_effect = CARDS[pending].card_type if pending else None
+        self.knocked_by = None if knocked_by == 255 else knocked_by
+        self.winner = None if winner == 255 else winner
+        self.done = bool(flags & 1)
+        self.drawn_card = CARDS[drawn]
+        self.turn_count = turn_count
+        self.scores = (score0, score1)
+        self.reshuffle_seed = reshuffle_seed
+        self.reshuffles = reshuffles
+        self.selected_card = None
+        self._undo_stack = []
+        self._zobrist = None
+    
+    # =========================================================================
+    # CARD COUNTS
+    # =========================================================================
+    
+    def rebuild_card_counts(self):
+        """Recount card_counts from scratch; call after writing game state directly."""
+        n = NUM_CARD_CODES
+        counts = self.card_counts = [0] * (NUM_COUNT_ZONES * n)
+        zones = ((ZONE_DRAW, self.draw_pile), (ZONE_DISCARD, self.discard_pile),
+                 (ZONE_SCENE, self.players[0]["crime_scene"]),
+                 (ZONE_SCENE + 1, self.players[1]["crime_scene"]))
+        for zone, cards in zones:
+            for card in cards:
+                counts[zone * n + card.code] += 1
+        
+        for p_idx, player in enumerate(self.players):
+            base = (ZONE_KNOWN + p_idx) * n
+            counts[base:base + n] = counts[ZONE_DISCARD * n:(ZONE_DISCARD + 1) * n]
+            for mem in (player["memory"], player["opp_memory"]):
+                for card in mem.values():
+                    counts[base + card.code] += 1
+        
+        if self.drawn_card is not None and not self.done:
+            self._count(self.drawn_card, ZONE_HELD, 1)
+            self._count_known(self.drawn_card, 1, self.current_player_idx)
+    
+    def _count_deal(self):
+        """rebuild_card_counts() for a fresh deal: only scenes and memories left the deck."""
+        counts = self.card_counts = [0] * (NUM_COUNT_ZONES * NUM_CARD_CODES)
+        counts[_DRAW_ROW:_DRAW_ROW + NUM_CARD_CODES] = DECK_COUNTS
+        for p_idx, player in enumerate(self.players):
+            scene = _SCENE_ROWS[p_idx]
+            for card in player["crime_scene"]:
+                counts[_DRAW_ROW + card.code] -= 1
+                counts[scene + card.code] += 1
+            for card in player["memory"].values():
+                counts[_KNOWN_ROWS[p_idx] + card.code] += 1
+    
+    def _count(self, card: Card, zone: int, delta: int):
+        self.card_counts[zone * NUM_CARD_CODES + card.code] += delta
+    
+    def _count_move(self, card: Card, src: int, dst: int):
+        counts = self.card_counts
+        counts[src * NUM_CARD_CODES + card.code] -= 1
+        counts[dst * NUM_CARD_CODES + card.code] += 1
+    
+    def _count_known(self, card: Card, delta: int, player_idx: Optional[int] = None):
+        """Adjust one player's KNOWN row, or both for discard pile changes."""
+        counts = self.card_counts
+        if player_idx is None:
+            counts[ZONE_KNOWN * NUM_CARD_CODES + card.code] += delta
+            counts[(ZONE_KNOWN + 1) * NUM_CARD_CODES + card.code] += delta
+        else:
+            counts[(ZONE_KNOWN + player_idx) * NUM_CARD_CODES + card.code] += delta
+    
+    def _remember(self, player_idx: int, key: str, idx: int, card: Card):
+        """Set players[player_idx][key][idx] (key is "memory" or "opp_memory")."""
+        mem = self.players[player_idx][key]
+        old = mem.get(idx)
+        if old is not None:
+            self._count_known(old, -1, player_idx)
+        mem[idx] = card
+        self._count_known(card, 1, player_idx)
+        z = self._zobrist
+        if z is not None:
+            row = _ZOBRIST_MEMORY[player_idx][key][idx]
+            z[3 + player_idx] ^= row[card.code] ^ (row[old.code] if old is not None else 0)
+    
+    def _forget(self, player_idx: int, key: str, idx: int):
+        old = self.players[player_idx][key].pop(idx, None)
+        if old is not None:
+            self._count_known(old, -1, player_idx)
+            if self._zobrist is not None:
+                self._zobrist[3 + player_idx] ^= _ZOBRIST_MEMORY[player_idx][key][idx][old.code]
+    
+    def zone_counts(self, zone: int) -> list:
+        """Cards per code in one zone."""
+        base = zone * NUM_CARD_CODES
+        return self.card_counts[base:base + NUM_CARD_CODES]
+    
+    def unknown_counts(self, player_idx: int) -> list:
+        """
+        Cards per code that player_idx cannot locate.
+        
+        Memories are not cleared by every move (e.g. the opponent's swaps),
+        so a stale entry can count a card twice; counts are clamped at 0.
+        """
+        base = (ZONE_KNOWN + player_idx) * NUM_CARD_CODES
+        counts = self.card_counts
+        return [max(DECK_COUNTS[code] - counts[base + code], 0) for code in range(NUM_CARD_CODES)]
+    
+    def rat_value_distribution(self, player_idx: Optional[int] = None) -> list:
+        """
+        P(RAT scores v) for v in 0..12, if the top of the draw pile were unseen.
+        
+        With player_idx, the top card is drawn from that player's unknown
+        cards; without, from the actual draw pile composition. Special cards
+        and an empty draw pile score the RAT as 0.
+        """
+        counts = self.zone_counts(ZONE_DRAW) if player_idx is None else self.unknown_counts(player_idx)
+        total = sum(counts)
+        if not total:
+            return [1.0] + [0.0] * 12
+        dist = [0.0] + [counts[v] / total for v in range(1, 13)]
+        dist[0] = 1.0 - sum(dist)
+        return dist
+    
+    def expected_unknown_value(self, player_idx: int) -> float:
+        """Expected score of a card player_idx hasn't located (e.g. an unknown slot)."""
+        counts = self.unknown_counts(player_idx)
+        total = sum(counts)
+        if not total:
+            return 0.0
+        numbered = sum(v * counts[v] for v in range(1, 13))
+        # The RAT takes the value of the draw pile's top card, itself an unknown card
+        rat_value = numbered / total
+        return (numbered + counts[CODE_RAT] * rat_value) / total
+    
+    # =========================================================================
+    # ZOBRIST HASHING
+    # =========================================================================
+    
+    def zobrist_key(self) -> int:
+        """
+        64-bit hash of the rule state, for transposition tables.
+        
+        Covers every card by zone and slot (the piles in order), the drawn
+        card, phase, pending effect, player to move and knocked_by. Memories
+        are left out since they don't change what can happen next; see
+        info_set_key(). The first call hashes the game from scratch; after
+        that, actions keep the parts up to date as they move cards.
+        """
+        z = self._zobrist
+        if z is None:
+            z = self._rehash()
+        return z[0] ^ z[1] ^ z[2] ^ self._status_key()
+    
+    def info_set_key(self, player_idx: int) -> int:
+        """
+        64-bit hash of what player_idx knows: the discard pile, how many
+        cards the draw pile and each crime scene hold, its memory and
+        opp_memory, its own drawn card and the status fields of
+        zobrist_key(). Positions the player can't tell apart share a key.
+        """
+        z = self._zobrist
+        if z is None:
+            z = self._rehash()
+        scenes = [player["crime_scene"] for player in self.players]
+        key = (z[1] ^ z[3 + player_idx] ^ self._status_key() ^
+               _ZOBRIST_VIEWER[player_idx] ^ _ZOBRIST_FILLED[ZONE_DRAW][len(self.draw_pile)] ^
+               _ZOBRIST_FILLED[ZONE_SCENE][len(scenes[0])] ^
+               _ZOBRIST_FILLED[ZONE_SCENE + 1][len(scenes[1])])
+        if player_idx == self.current_player_idx and self.drawn_card is not None and not self.done:
+            key ^= _Z_HELD[self.drawn_card.code]
+        return key
+    
+    def _status_key(self) -> int:
+        pending = SPECIAL_CARD_CODES[self.pending_effect] if self.pending_effect else NO_CARD
+        knocked = 0 if self.knocked_by is None else self.knocked_by + 1
+        return _ZOBRIST_STATUS[((self.phase.value * NUM_CARD_CODES + pending) * 2 +
+                                self.current_player_idx) * 3 + knocked]
+    
+    def rebuild_zobrist(self):
+        """Drop the hashes; call after writing game state directly. The next key rehashes."""
+        self._zobrist = None
+    
+    def _rehash(self) -> list:
+        cards = (_zobrist_of(_Z_SCENES[0], self.players[0]["crime_scene"]) ^
+                 _zobrist_of(_Z_SCENES[1], self.players[1]["crime_scene"]))
+        if self.drawn_card is not None and not self.done:
+            cards ^= _Z_HELD[self.drawn_card.code]
+        z = [cards, _zobrist_of(_Z_DISCARD, self.discard_pile),
+             _zobrist_of(_Z_DRAW, self.draw_pile), 0, 0]
+        for p_idx, player in enumerate(self.players):
+            for key, rows in _ZOBRIST_MEMORY[p_idx].items():
+                for idx, card in player[key].items():
+                    z[3 + p_idx] ^= rows[idx][card.code]
+        self._zobrist = z
+        return z
+    
     # =========================================================================
     # PYGAME GUI WITH CLICK HANDLING
     # =========================================================================
@@ -1097,35 +1904,67 @@ class StoolPigeonGame:
     # TEXT MODE
     # =========================================================================
     
-    def display_state(self, for_player_idx=None):
+    def get_view(self, for_player_idx=None) -> dict:
+        """
+        What one player can see, as a JSON-ready dict.
+
+        Cards are their names (str(card)); slots the player doesn't know are
+        None. The drawn card is only shown to the player holding it, and the
+        scores only once the game is over.
+        """
         if for_player_idx is None:
             for_player_idx = self.human_player_idx
         player = self.players[for_player_idx]
         opp = self.players[1 - for_player_idx]
+        memory, opp_memory = player["memory"], player["opp_memory"]
+        drawn = self.drawn_card
+        if drawn is not None and (self.current_player_idx != for_player_idx or self.done):
+            drawn = None
+        
+        return {
+            "player": for_player_idx,
+            "turn": self.turn_count,
+            "phase": self.phase.name,
+            "current_player": self.current_player_idx,
+            "pending_effect": self.pending_effect.name if self.pending_effect else None,
+            "draw_count": len(self.draw_pile),
+            "discard_count": len(self.discard_pile),
+            "discard_top": repr(self.discard_pile[-1]) if self.discard_pile else None,
+            "knocked_by": self.knocked_by,
+            "crime_scene": [repr(memory[i]) if i in memory else None
+                            for i in range(len(player["crime_scene"]))],
+            "opponent_scene": [repr(opp_memory[i]) if i in opp_memory else None
+                               for i in range(len(opp["crime_scene"]))],
+            "drawn": repr(drawn) if drawn is not None else None,
+            "done": self.done,
+            "winner": self.winner,
+            "scores": list(self.scores) if self.done else None,
+        }
+    
+    def display_state(self, for_player_idx=None):
+        view = self.get_view(for_player_idx)
         
         print("\n" + "="*50)
-        print(f"Turn {self.turn_count} | Phase: {self.phase.name}")
-        print(f"Draw: {len(self.draw_pile)} | Discard: {len(self.discard_pile)}", end="")
-        if self.discard_pile:
-            print(f" (top: {self.discard_pile[-1]})")
+        print(f"Turn {view['turn']} | Phase: {view['phase']}")
+        print(f"Draw: {view['draw_count']} | Discard: {view['discard_count']}", end="")
+        if view["discard_top"]:
+            print(f" (top: {view['discard_top']})")
         else:
             print()
         
-        if self.knocked_by is not None:
-            print(f"*** {self.players[self.knocked_by]['name']} KNOCKED! ***")
+        if view["knocked_by"] is not None:
+            print(f"*** {self.players[view['knocked_by']]['name']} KNOCKED! ***")
         
         print(f"\nYour crime scene:")
-        for i, card in enumerate(player["crime_scene"]):
-            known = player["memory"].get(i)
-            print(f"  [{i}] {known if known else '???'}")
+        for i, known in enumerate(view["crime_scene"]):
+            print(f"  [{i}] {known or '???'}")
         
         print(f"\nOpponent's crime scene:")
-        for i in range(len(opp["crime_scene"])):
-            known = player["opp_memory"].get(i)
-            print(f"  [{i}] {known if known else '???'}")
+        for i, known in enumerate(view["opponent_scene"]):
+            print(f"  [{i}] {known or '???'}")
         
-        if self.drawn_card:
-            print(f"\nDrawn: {self.drawn_card}")
+        if view["drawn"]:
+            print(f"\nDrawn: {view['drawn']}")
         print("="*50)
     
     def print_legal_actions(self):
@@ -1140,13 +1979,14 @@ class StoolPigeonGame:
 # =============================================================================
 
 class RandomAgent:
-    def __init__(self, game: StoolPigeonGame, player_idx: int):
+    def __init__(self, game: StoolPigeonGame, player_idx: int, seed=None, rng=None):
         self.game = game
         self.player_idx = player_idx
+        self.rng = rng if rng is not None else random.Random(seed)
     
     def choose_action(self) -> Optional[Action]:
         actions = self.game.get_legal_actions()
-        return random.choice(actions) if actions else None
+        return self.rng.choice(actions) if actions else None
 
 # =============================================================================
 # TEXT MODE PLAY
@@ -1187,10 +2027,54 @@ def play_text():
 # MAIN
 # =============================================================================
 
+def play_headless(num_games: int):
+    """Play RandomAgent vs RandomAgent games without a display."""
+    from selfplay import play_game
+    start = time.perf_counter()
+    turns = sum(play_game(seed=i)[3] for i in range(num_games))
+    elapsed = time.perf_counter() - start
+    print(f"{num_games} games, {turns} turns in {elapsed:.2f}s "
+          f"({num_games / elapsed:.0f} games/s)")
+
+
+def run_profiled(func, path: str):
+    """Run func under cProfile with the profiling.PROFILER counters on; dump pstats to path."""
+    import cProfile
+    import pstats
+    from profiling import PROFILER, profiling
+
+    profiler = cProfile.Profile()
+    with profiling():
+        profiler.runcall(func)
+    profiler.dump_stats(path)
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    PROFILER.report()
+    print(f"\npstats written to {path}")
+
+
 if __name__ == "__main__":
+    import argparse
     import sys
-    if len(sys.argv) > 1 and sys.argv[1] == "--text":
-        play_text()
+    # Modules importing ref (selfplay, profiling) must see these classes, not a second copy
+    sys.modules.setdefault("ref", sys.modules[__name__])
+
+    parser = argparse.ArgumentParser(description="Stool Pigeon")
+    parser.add_argument("--text", action="store_true", help="play in the terminal")
+    parser.add_argument("--games", type=int, help="play N headless RandomAgent games")
+    parser.add_argument("--profile", nargs="?", const="ref.pstats", metavar="FILE",
+                        help="run under cProfile and dump pstats to FILE (default: ref.pstats)")
+    args = parser.parse_args()
+
+    def run():
+        if args.games:
+            play_headless(args.games)
+        elif args.text:
+            play_text()
+        else:
+            game = StoolPigeonGame(GUI=True, render_delay_sec=0.1, human_player_idx=0)
+            game.run_gui()
+
+    if args.profile:
+        run_profiled(run, args.profile)
     else:
-        game = StoolPigeonGame(GUI=True, render_delay_sec=0.1, human_player_idx=0)
-        game.run_gui()
\ No newline at end of file
+        run()
\ No newline at end of file
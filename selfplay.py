@@ -0,0 +1,214 @@
+"""
+Headless self-play runner for ref.StoolPigeonGame.
+
+Plays M agent-vs-agent games across a process pool and reports win rates,
+score distributions and game lengths. Games are split into fixed-size
+chunks; each chunk gets a seed derived from the master seed and comes back
+as one compact result, so a run is reproducible for a given master seed
+regardless of how chunks are scheduled onto workers. Each game has its own
+seed, so any game can also be replayed on its own with play_game(seed=...).
+
+--record writes each game to a trajectory file (see trajectory.py).
+
+Usage: python selfplay.py --games 100000 --workers 64 --seed 1 [--record games.sptraj]
+"""
+
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from ref import StoolPigeonGame, RandomAgent, GamePhase
+
+# Result codes for a finished game
+TIE = -1
+TRUNCATED = -2
+
+# =============================================================================
+# GAME LOOP
+# =============================================================================
+
+def play_game(agent_classes=(RandomAgent, RandomAgent), max_turns: int = 1000,
+              seed: int = None, record: bool = False):
+    """
+    Play one headless game and return (result, score0, score1, turns).
+
+    seed makes the game and its agents reproducible. With record=True a
+    fifth item holds the game's trajectory record (bytes).
+    """
+    game = StoolPigeonGame(GUI=False)
+    agents = [cls(game, i) for i, cls in enumerate(agent_classes)]
+    return _play(game, agents, seed, max_turns, record)
+
+
+def _play(game, agents, seed, max_turns, record):
+    """Reset game and agents in place from seed (None: keep the fresh deal) and play it out."""
+    if seed is not None:
+        game.reseed_and_reset(seed)
+        # Agents with their own rng get a stream derived from the game seed
+        for i, agent in enumerate(agents):
+            if hasattr(agent, "rng"):
+                agent.rng.seed(f"{seed}/{i}")
+    recorder = None
+    if record:
+        from trajectory import GameRecorder
+        recorder = GameRecorder(game)
+
+    result = None
+    while not game.is_terminal():
+        if game.turn_count >= max_turns:
+            result = TRUNCATED, 0, 0, game.turn_count
+            break
+        if game.phase == GamePhase.DRAW:
+            game._do_draw()
+            continue
+        action = agents[game.current_player_idx].choose_action()
+        if recorder:
+            recorder.record(action)
+        game.apply_action(action)
+
+    if result is None:
+        s0, s1 = game.get_scores()
+        winner = game.get_winner()
+        result = (TIE if winner is None else winner), s0, s1, game.turn_count
+    if recorder:
+        return result + (recorder.finish(result[0]),)
+    return result
+
+
+def _play_chunk(task):
+    """Worker entry point: play a chunk of games seeded from one derived seed."""
+    seed, num_games, agent_classes, max_turns, record = task
+    seeds = random.Random(seed)
+    # One game and one set of agents per chunk, reset in place for every game
+    game = StoolPigeonGame(GUI=False)
+    agents = [cls(game, i) for i, cls in enumerate(agent_classes)]
+    return [_play(game, agents, seeds.getrandbits(64), max_turns, record)
+            for _ in range(num_games)]
+
+# =============================================================================
+# STATISTICS
+# =============================================================================
+
+class SelfPlayStats:
+    """Aggregated results of a self-play run."""
+
+    def __init__(self):
+        self.games = 0
+        self.wins = [0, 0]
+        self.ties = 0
+        self.truncated = 0
+        self.score_hist = [Counter(), Counter()]
+        self.length_hist = Counter()
+        self.elapsed = 0.0
+
+    def add(self, results):
+        for result, s0, s1, turns, *_ in results:
+            self.games += 1
+            if result == TRUNCATED:
+                self.truncated += 1
+                continue
+            if result == TIE:
+                self.ties += 1
+            else:
+                self.wins[result] += 1
+            self.score_hist[0][s0] += 1
+            self.score_hist[1][s1] += 1
+            self.length_hist[turns] += 1
+
+    def win_rates(self) -> tuple:
+        n = max(self.games, 1)
+        return self.wins[0] / n, self.wins[1] / n, self.ties / n
+
+    def mean_score(self, player_idx: int) -> float:
+        hist = self.score_hist[player_idx]
+        n = sum(hist.values())
+        return sum(s * c for s, c in hist.items()) / n if n else 0.0
+
+    def mean_length(self) -> float:
+        n = sum(self.length_hist.values())
+        return sum(t * c for t, c in self.length_hist.items()) / n if n else 0.0
+
+    def report(self) -> str:
+        p0, p1, tie = self.win_rates()
+        rate = self.games / self.elapsed if self.elapsed else 0.0
+        lengths = sorted(self.length_hist.elements())
+        median = lengths[len(lengths) // 2] if lengths else 0
+        return "\n".join([
+            f"Games: {self.games} in {self.elapsed:.2f}s ({rate:.0f} games/s)",
+            f"Win rate: P0 {p0:.3f} | P1 {p1:.3f} | Tie {tie:.3f} | Truncated {self.truncated}",
+            f"Mean score: P0 {self.mean_score(0):.2f} | P1 {self.mean_score(1):.2f}",
+            f"Game length (turns): mean {self.mean_length():.2f} | median {median} | "
+            f"max {max(lengths) if lengths else 0}",
+        ])
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+def run_selfplay(num_games: int, workers: int = None, seed: int = 0, chunk_size: int = 500,
+                 agent_classes=(RandomAgent, RandomAgent), max_turns: int = 1000,
+                 record_path: str = None) -> SelfPlayStats:
+    """
+    Play num_games games across a process pool and aggregate the results.
+
+    With record_path, every game is appended to that trajectory file.
+    """
+    workers = workers or os.cpu_count() or 1
+    master = random.Random(seed)
+    tasks = []
+    remaining = num_games
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        tasks.append((master.getrandbits(64), n, tuple(agent_classes), max_turns,
+                      record_path is not None))
+        remaining -= n
+
+    writer = None
+    if record_path is not None:
+        from trajectory import TrajectoryWriter
+        writer = TrajectoryWriter(record_path)
+
+    def collect(results):
+        stats.add(results)
+        if writer:
+            for entry in results:
+                writer.write(entry[4])
+
+    stats = SelfPlayStats()
+    start = time.perf_counter()
+    try:
+        if workers == 1:
+            for task in tasks:
+                collect(_play_chunk(task))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map() yields in submission order, which keeps aggregation deterministic.
+                for results in pool.map(_play_chunk, tasks):
+                    collect(results)
+    finally:
+        if writer:
+            writer.close()
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Stool Pigeon self-play")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--record", default=None, help="append games to this trajectory file")
+    args = parser.parse_args()
+
+    stats = run_selfplay(args.games, args.workers, args.seed, args.chunk_size,
+                         max_turns=args.max_turns, record_path=args.record)
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+Asyncio game server for human-vs-agent games on ref.StoolPigeonGame.
+
+Clients talk newline-delimited JSON over TCP or a Unix socket: one request
+object per line, one response object per line, in order. A request may
+carry an "id", which is echoed back.
+
+    {"op": "new", "seat": 0, "agent": "random", "seed": 7}
+    {"op": "act", "session": "...", "action": 12}
+    {"op": "view", "session": "..."}
+    {"op": "close", "session": "..."}
+    {"op": "actions"}          the action table: index -> fields
+    {"op": "stats"}
+
+new/act/view answer with the player's view (StoolPigeonGame.get_view()),
+the legal action indices (over ref.DEFAULT_ACTION_SPACE) and the moves the
+agent made since the last response; errors are {"ok": false, "error": ...}.
+DRAW phases are played automatically, so every response is positioned at
+the player's next decision or the end of the game. "agent" is one of the
+names registered in tournament.AGENTS.
+
+A session is a game plus its agent and isn't tied to a connection: a client
+can reconnect and carry on with the session id. Sessions unused for
+--idle-timeout seconds are evicted. Agents named in --inline-agents (cheap
+ones like "random") move on the event loop. The others search in a pool of
+worker processes: the game goes over as StoolPigeonGame.to_bytes(), a
+fresh agent picks a move there and only its action index comes back, so a
+long search doesn't hold the GIL and stall other sessions.
+
+Usage: python server.py [--host 127.0.0.1 --port 8765 | --unix /tmp/stoolpigeon.sock]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from events import EVENTS, RequestFailed
+from ref import StoolPigeonGame, GamePhase, DEFAULT_ACTION_SPACE
+from tournament import AGENTS
+
+_ACTIONS = DEFAULT_ACTION_SPACE.actions
+
+
+class ProtocolError(Exception):
+    """A request the server can't carry out; reported back to the client."""
+
+
+def _init_worker(niceness: int):
+    # Searches yield to the event loop when busy workers outnumber the cores
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+def _agent_move(agent_name: str, state: bytes, player_idx: int) -> int:
+    """Worker process task: the action index AGENTS[agent_name] picks in a to_bytes() state."""
+    game = StoolPigeonGame.from_bytes(state)
+    return DEFAULT_ACTION_SPACE.index(AGENTS[agent_name](game, player_idx).choose_action())
+
+
+def _action_json(action) -> dict:
+    fields = {"index": DEFAULT_ACTION_SPACE.index(action), "type": action.action_type.name}
+    for name in ("target_idx", "target_idx2", "target_player", "target_player2"):
+        value = getattr(action, name)
+        if value is not None:
+            fields[name] = value
+    return fields
+
+# =============================================================================
+# SESSIONS
+# =============================================================================
+
+class Session:
+    """
+    One game between a remote player and an agent. agent is the agent
+    object for inline agents and None for those run in worker processes.
+    """
+
+    __slots__ = ("id", "game", "seat", "agent_name", "agent", "last_used", "busy", "agent_moves")
+
+    def __init__(self, session_id: str, game: StoolPigeonGame, seat: int, agent_name: str, agent):
+        self.id = session_id
+        self.game = game
+        self.seat = seat
+        self.agent_name = agent_name
+        self.agent = agent
+        self.last_used = time.monotonic()
+        self.busy = False
+        self.agent_moves = []
+
+    def legal(self) -> list:
+        game = self.game
+        if game.done or game.current_player_idx != self.seat:
+            return []
+        bits = game.legal_action_bits()
+        legal = []
+        while bits:
+            low = bits & -bits
+            legal.append(low.bit_length() - 1)
+            bits ^= low
+        return legal
+
+
+class GameServer:
+    """Sessions, request dispatch and idle eviction."""
+
+    def __init__(self, idle_timeout: float = 300.0, max_sessions: int = 20000,
+                 agent_workers: int = 4, inline_agents=("random",), agent_nice: int = 10):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.inline_agents = set(inline_agents)
+        self.executor = ProcessPoolExecutor(max_workers=agent_workers, initializer=_init_worker,
+                                            initargs=(agent_nice,))
+        self.sessions = OrderedDict()     # Least recently used first
+        self.evicted = 0
+        self.requests = 0
+        self._handlers = {
+            "new": self._op_new,
+            "act": self._op_act,
+            "view": self._op_view,
+            "close": self._op_close,
+            "actions": self._op_actions,
+            "stats": self._op_stats,
+        }
+
+    # =========================================================================
+    # CONNECTIONS
+    # =========================================================================
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b'{"ok": false, "error": "request line too long"}\n')
+                    break
+                if not line:
+                    break
+                writer.write(await self.dispatch(line))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, line: bytes) -> bytes:
+        """Handle one request line and return the encoded response line."""
+        self.requests += 1
+        request_id = op = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise ProtocolError("request is not valid JSON")
+            if not isinstance(request, dict):
+                raise ProtocolError("request must be a JSON object")
+            request_id, op = request.get("id"), request.get("op")
+            handler = self._handlers.get(op) if isinstance(op, str) else None
+            if handler is None:
+                raise ProtocolError(f"unknown op {op!r}")
+            response = await handler(request)
+            response["ok"] = True
+        except ProtocolError as e:
+            response = {"ok": False, "error": str(e)}
+        except Exception as e:
+            # A bug, not a bad request: keep the connection and report it
+            if EVENTS.actions:
+                EVENTS.emit(RequestFailed(op, repr(e), traceback.format_exc()))
+            response = {"ok": False, "error": "internal error"}
+        if request_id is not None:
+            response["id"] = request_id
+        return (json.dumps(response) + "\n").encode()
+
+    # =========================================================================
+    # OPERATIONS
+    # =========================================================================
+
+    async def _op_new(self, request: dict) -> dict:
+        if len(self.sessions) >= self.max_sessions:
+            raise ProtocolError("server is full")
+        # type() rather than isinstance(): JSON true/false are bools, which
+        # are ints, and 1.0 == 1
+        seat = request.get("seat", 0)
+        if type(seat) is not int or seat not in (0, 1):
+            raise ProtocolError("seat must be 0 or 1")
+        seed = request.get("seed")
+        if seed is not None and type(seed) is not int:
+            raise ProtocolError("seed must be an integer")
+        name = request.get("agent", "random")
+        if not isinstance(name, str):
+            raise ProtocolError("agent must be a string")
+        # Only registered names: "class:key=value" specs would let a client
+        # pick search budgets that tie up the agent workers indefinitely
+        factory = AGENTS.get(name)
+        if factory is None:
+            raise ProtocolError(f"unknown agent {name!r} (known: {', '.join(AGENTS)})")
+
+        game = StoolPigeonGame(GUI=False, human_player_idx=seat, seed=seed)
+        agent = None
+        if name in self.inline_agents:
+            try:
+                agent = factory(game, 1 - seat)
+            except (TypeError, ValueError) as e:
+                raise ProtocolError(f"can't create agent {name!r}: {e}")
+        session = Session(secrets.token_hex(8), game, seat, name, agent)
+        # Registered only once it has started, so a failed start leaves nothing behind
+        response = await self._advance_and_view(session)
+        self.sessions[session.id] = session
+        return response
+
+    async def _op_act(self, request: dict) -> dict:
+        session = self._session(request)
+        game = session.game
+        index = request.get("action")
+        if game.done or game.current_player_idx != session.seat:
+            raise ProtocolError("not your turn")
+        if (not isinstance(index, int) or not 0 <= index < DEFAULT_ACTION_SPACE.size
+                or not game.legal_action_bits() >> index & 1):
+            raise ProtocolError(f"illegal action {index!r}")
+        game.apply_action(_ACTIONS[index])
+        return await self._advance_and_view(session)
+
+    async def _op_view(self, request: dict) -> dict:
+        return self._view(self._session(request))
+
+    async def _op_close(self, request: dict) -> dict:
+        session = self._session(request)
+        del self.sessions[session.id]
+        return {"session": session.id}
+
+    async def _op_actions(self, request: dict) -> dict:
+        return {"actions": [_action_json(action) for action in _ACTIONS]}
+
+    async def _op_stats(self, request: dict) -> dict:
+        return {"sessions": len(self.sessions), "evicted": self.evicted, "requests": self.requests}
+
+    def _session(self, request: dict) -> Session:
+        session_id = request.get("session")
+        session = self.sessions.get(session_id) if isinstance(session_id, str) else None
+        if session is None:
+            raise ProtocolError("unknown or expired session")
+        if session.busy:
+            raise ProtocolError("session is busy with an earlier request")
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(session.id)
+        return session
+
+    # =========================================================================
+    # GAME FLOW
+    # =========================================================================
+
+    async def _advance_and_view(self, session: Session) -> dict:
+        """Play draws and agent moves until the player must decide, then report."""
+        game = session.game
+        session.busy = True
+        try:
+            while not game.done:
+                if game.phase == GamePhase.DRAW:
+                    game._do_draw()
+                elif game.current_player_idx == session.seat:
+                    break
+                else:
+                    if session.agent is not None:
+                        action = session.agent.choose_action()
+                    else:
+                        loop = asyncio.get_running_loop()
+                        index = await loop.run_in_executor(self.executor, _agent_move, session.agent_name,
+                                                           game.to_bytes(), 1 - session.seat)
+                        action = _ACTIONS[index]
+                    session.agent_moves.append(_action_json(action))
+                    game.apply_action(action)
+        finally:
+            session.busy = False
+            session.last_used = time.monotonic()
+        return self._view(session)
+
+    def _view(self, session: Session) -> dict:
+        moves, session.agent_moves = session.agent_moves, []
+        return {"session": session.id, "view": session.game.get_view(session.seat),
+                "legal": session.legal(), "agent_moves": moves}
+
+    # =========================================================================
+    # EVICTION
+    # =========================================================================
+
+    def evict_idle(self, now: float = None) -> int:
+        """Drop sessions idle for longer than idle_timeout; returns how many."""
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.idle_timeout
+        sessions = self.sessions
+        evicted = 0
+        # Ordered by last use, so only the expired prefix is visited
+        while sessions:
+            session = next(iter(sessions.values()))
+            if session.last_used > cutoff or session.busy:
+                break
+            del sessions[session.id]
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    async def reap_forever(self):
+        interval = max(0.05, min(self.idle_timeout / 4, 5.0))
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+async def serve(server: GameServer, host: str = "127.0.0.1", port: int = 8765, unix: str = None):
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle_connection, path=unix)
+    else:
+        listener = await asyncio.start_server(server.handle_connection, host, port)
+    reaper = asyncio.create_task(server.reap_forever())
+    names = ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"Serving on {names}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        reaper.cancel()
+        server.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stool Pigeon NDJSON game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket instead")
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="seconds")
+    parser.add_argument("--max-sessions", type=int, default=20000)
+    parser.add_argument("--agent-workers", type=int, default=4, help="processes for non-inline agents")
+    parser.add_argument("--agent-nice", type=int, default=10, help="priority decrement of those processes")
+    parser.add_argument("--inline-agents", nargs="*", default=["random"],
+                        help=f"agents run on the event loop (known: {', '.join(AGENTS)})")
+    args = parser.parse_args()
+
+    server = GameServer(args.idle_timeout, args.max_sessions, args.agent_workers, args.inline_agents,
+                        args.agent_nice)
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
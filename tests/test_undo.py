@@ -0,0 +1,73 @@
+"""push_action()/push_draw()/undo() restore the ref engine exactly."""
+
+import random
+
+import pytest
+
+from ref import StoolPigeonGame, ActionType, GamePhase
+
+
+def snapshot(game):
+    return game.to_bytes(), bytes(game.card_counts)
+
+
+def push_random(game, rng, knock=True):
+    if game.phase == GamePhase.DRAW:
+        game.push_draw()
+    else:
+        actions = [a for a in game.get_legal_actions() if knock or a.action_type != ActionType.KNOCK]
+        game.push_action(rng.choice(actions))
+
+
+def play_and_unwind(game, rng, plies, knock=True):
+    """Push up to plies moves, then undo them all, checking every state on the way back."""
+    history = []
+    while len(history) < plies and not game.done:
+        history.append(snapshot(game))
+        push_random(game, rng, knock)
+    pushed = len(history)
+    while history:
+        game.undo()
+        assert snapshot(game) == history.pop()
+    assert not game.can_undo()
+    return pushed
+
+
+@pytest.mark.parametrize("knock", [True, False])
+@pytest.mark.parametrize("seed", range(20))
+def test_undo_restores_every_ply(seed, knock):
+    # Random games knock early; without knocks they reach every effect
+    game = StoolPigeonGame(GUI=False, seed=seed)
+    assert play_and_unwind(game, random.Random(seed), 200, knock) > 0
+
+
+def test_undo_across_reshuffle():
+    # Games without knocks run until the draw pile empties and is reshuffled
+    game = StoolPigeonGame(GUI=False, seed=3)
+    rng = random.Random(3)
+    history = []
+    while game.reshuffles < 2:
+        history.append((snapshot(game), game.reshuffles))
+        push_random(game, rng, knock=False)
+    while history:
+        game.undo()
+        assert (snapshot(game), game.reshuffles) == history.pop()
+
+
+def test_undo_mid_game_then_replay():
+    # Undoing part of a line and replaying it reaches the same state
+    game = StoolPigeonGame(GUI=False, seed=11)
+    rng = random.Random(11)
+    for _ in range(30):
+        push_random(game, rng, knock=False)
+    line_rng = random.Random(99)
+    state = line_rng.getstate()
+    for _ in range(10):
+        push_random(game, line_rng, knock=False)
+    after = snapshot(game)
+    for _ in range(10):
+        game.undo()
+    line_rng.setstate(state)
+    for _ in range(10):
+        push_random(game, line_rng, knock=False)
+    assert snapshot(game) == after
@@ -0,0 +1,74 @@
+"""Incremental Zobrist keys match a from-scratch rehash."""
+
+import random
+
+import pytest
+
+from ref import StoolPigeonGame, ActionType, GamePhase
+
+
+def keys(game):
+    return game.zobrist_key(), game.info_set_key(0), game.info_set_key(1)
+
+
+def rehashed_keys(game):
+    fresh = StoolPigeonGame.from_bytes(game.to_bytes())
+    fresh.rebuild_zobrist()
+    return keys(fresh)
+
+
+def push_random(game, rng, knock):
+    if game.phase == GamePhase.DRAW:
+        game.push_draw()
+    else:
+        actions = [a for a in game.get_legal_actions() if knock or a.action_type != ActionType.KNOCK]
+        game.push_action(rng.choice(actions))
+
+
+@pytest.mark.parametrize("knock", [True, False])
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_keys_match_rehash(seed, knock):
+    game = StoolPigeonGame(GUI=False, seed=seed)
+    rng = random.Random(seed)
+    history = []
+    while len(history) < 300 and not game.done:
+        history.append(keys(game))
+        assert history[-1] == rehashed_keys(game)
+        push_random(game, rng, knock)
+    assert keys(game) == rehashed_keys(game)
+    while history:
+        game.undo()
+        assert keys(game) == history.pop()
+
+
+def test_keys_across_reshuffles():
+    game = StoolPigeonGame(GUI=False, seed=5)
+    rng = random.Random(5)
+    keys(game)
+    history = []
+    while game.reshuffles < 3:
+        history.append(keys(game))
+        push_random(game, rng, knock=False)
+        assert keys(game) == rehashed_keys(game)
+    while history:
+        game.undo()
+        assert keys(game) == history.pop()
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_info_set_key_ignores_draw_pile_order(seed):
+    # Neither player can see the draw pile, so swapping two of its cards
+    # changes the state but not what either player knows
+    game = StoolPigeonGame(GUI=False, seed=seed)
+    rng = random.Random(seed)
+    for _ in range(rng.randrange(20)):
+        push_random(game, rng, knock=False)
+    pile = game.draw_pile
+    i, j = next((i, j) for i in range(len(pile)) for j in range(i)
+                if pile[i].code != pile[j].code)
+    before = keys(game)
+    pile[i], pile[j] = pile[j], pile[i]
+    game.rebuild_zobrist()
+    after = keys(game)
+    assert after[0] != before[0]
+    assert after[1:] == before[1:]
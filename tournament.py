@@ -0,0 +1,387 @@
+"""
+Agent tournaments for ref.StoolPigeonGame.
+
+Agents come from a registry of factories, callables (game, player_idx) ->
+agent with choose_action(), like the ones selfplay and gym_env take. Names
+can also be specs of a registered class with keyword arguments, e.g.
+"ismcts:iterations=200,exploration=1.0".
+
+Every pairing plays games_per_pairing games, split into chunks that run on
+a process pool. Seats alternate game by game, so each agent moves first in
+half of the games and the first-mover advantage cancels out. Pairings are
+either a full round robin or Swiss rounds (agents with equal match points
+meet, no rematches while avoidable).
+
+Results are appended to a JSON-lines file as chunks complete: a config
+line, then one line per chunk with its game outcomes ("A"/"B" = the
+pairing's first/second agent won, "T" tie, "X" truncated). Rerunning with
+the same file skips the chunks already in it, so an interrupted tournament
+resumes where it stopped. Elo ratings are updated game by game as chunks
+arrive (and rebuilt from the file on resume), so they depend on the order
+chunks finished in; the win/loss counts don't.
+
+Factories must be picklable to reach the workers: classes or
+functools.partial of them, not lambdas.
+
+Usage: python tournament.py random ismcts:iterations=50 ismcts:iterations=200
+           --games 1000 --format swiss --rounds 3 --results results.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from itertools import combinations
+
+from ref import StoolPigeonGame, RandomAgent
+from selfplay import _play, TIE, TRUNCATED
+from ismcts import ISMCTSAgent
+
+# =============================================================================
+# AGENT REGISTRY
+# =============================================================================
+
+AGENT_CLASSES = {
+    "random": RandomAgent,
+    "ismcts": ISMCTSAgent,
+}
+
+AGENTS = {
+    "random": RandomAgent,
+    "ismcts-50": partial(ISMCTSAgent, iterations=50),
+    "ismcts-200": partial(ISMCTSAgent, iterations=200),
+    "ismcts-1000": partial(ISMCTSAgent, iterations=1000),
+}
+
+
+def register(name: str, factory):
+    """Add an agent factory to the registry."""
+    AGENTS[name] = factory
+
+
+def resolve_agent(spec: str):
+    """A registered name, or "class:key=value,..." over AGENT_CLASSES."""
+    if spec in AGENTS:
+        return AGENTS[spec]
+    base, _, params = spec.partition(":")
+    if base not in AGENT_CLASSES:
+        raise ValueError(f"unknown agent {spec!r}")
+    kwargs = {}
+    for item in filter(None, params.split(",")):
+        key, _, value = item.partition("=")
+        kwargs[key.strip()] = _parse_value(value.strip())
+    return partial(AGENT_CLASSES[base], **kwargs)
+
+
+def _parse_value(text: str):
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return {"None": None, "True": True, "False": False}.get(text, text)
+
+
+def _describe(factory) -> str:
+    """A stable description of a factory, for checking resumed tournaments."""
+    if isinstance(factory, partial):
+        args = [_describe(factory.func)] + [repr(a) for a in factory.args]
+        args += [f"{k}={v!r}" for k, v in sorted(factory.keywords.items())]
+        return f"partial({', '.join(args)})"
+    return f"{factory.__module__}.{factory.__qualname__}"
+
+# =============================================================================
+# MATCHES
+# =============================================================================
+
+def _play_match_chunk(task):
+    """Worker entry point: play games first_game.. of a pairing; returns the outcome string."""
+    seed, factory_a, factory_b, first_game, num_games, max_turns = task
+    seeds = random.Random(seed)
+    # One game and both seatings per chunk, reset in place for every game
+    game = StoolPigeonGame(GUI=False)
+    seatings = ([factory_a(game, 0), factory_b(game, 1)],
+                [factory_b(game, 0), factory_a(game, 1)])
+    outcomes = []
+    for n in range(first_game, first_game + num_games):
+        swapped = n % 2
+        result = _play(game, seatings[swapped], seeds.getrandbits(64), max_turns, False)[0]
+        if result == TRUNCATED:
+            outcomes.append("X")
+        elif result == TIE:
+            outcomes.append("T")
+        else:
+            outcomes.append("A" if (result == 0) != swapped else "B")
+    return "".join(outcomes)
+
+
+class Elo:
+    """Incremental Elo ratings, updated one game at a time."""
+
+    def __init__(self, names, k: float = 4.0, initial: float = 1500.0):
+        self.k = k
+        self.ratings = {name: initial for name in names}
+
+    def expected(self, a: str, b: str) -> float:
+        return 1.0 / (1.0 + 10.0 ** ((self.ratings[b] - self.ratings[a]) / 400.0))
+
+    def update(self, a: str, b: str, outcomes: str):
+        ratings, k = self.ratings, self.k
+        for outcome in outcomes:
+            if outcome == "X":
+                continue
+            score = 1.0 if outcome == "A" else 0.0 if outcome == "B" else 0.5
+            delta = k * (score - self.expected(a, b))
+            ratings[a] += delta
+            ratings[b] -= delta
+
+# =============================================================================
+# TOURNAMENT
+# =============================================================================
+
+class Tournament:
+    """
+    A round robin or Swiss tournament between named agent factories.
+
+    games_per_pairing: games each pairing plays (seats alternate).
+    rounds: Swiss rounds (ignored for round robin).
+    chunk_size: games per worker task.
+    results_path: JSON-lines file to append to and resume from.
+    """
+
+    def __init__(self, agents: dict, games_per_pairing: int = 1000, fmt: str = "round-robin",
+                 rounds: int = None, seed: int = 0, chunk_size: int = 500,
+                 max_turns: int = 1000, k: float = 4.0, results_path: str = None):
+        if fmt not in ("round-robin", "swiss"):
+            raise ValueError(f"unknown format {fmt!r}")
+        if len(agents) < 2:
+            raise ValueError("a tournament needs at least two agents")
+        self.agents = dict(agents)
+        self.names = list(agents)
+        self.games_per_pairing = games_per_pairing
+        self.format = fmt
+        self.rounds = 1 if fmt == "round-robin" else (rounds or max(1, (len(agents) - 1).bit_length()))
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.max_turns = max_turns
+        self.results_path = results_path
+
+        self.elo = Elo(self.names, k)
+        self.wins = {name: 0 for name in self.names}
+        self.losses = {name: 0 for name in self.names}
+        self.ties = {name: 0 for name in self.names}
+        self.truncated = {name: 0 for name in self.names}
+        self.first_seat_wins = 0          # Games won by whoever moved first
+        self.decided_games = 0
+        self._chunks = {}                 # (round, a, b, chunk) -> outcomes
+        self._file = None
+
+    def config(self) -> dict:
+        return {
+            "type": "config",
+            "agents": {name: _describe(factory) for name, factory in self.agents.items()},
+            "games_per_pairing": self.games_per_pairing,
+            "format": self.format,
+            "rounds": self.rounds,
+            "seed": self.seed,
+            "chunk_size": self.chunk_size,
+            "max_turns": self.max_turns,
+        }
+
+    # =========================================================================
+    # RUNNING
+    # =========================================================================
+
+    def run(self, workers: int = None):
+        """Play every pairing not already in the results file."""
+        workers = workers or os.cpu_count() or 1
+        self._open_results()
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for round_idx in range(self.rounds):
+                tasks = {}
+                for a, b in self.pairings(round_idx):
+                    for chunk, first in enumerate(range(0, self.games_per_pairing, self.chunk_size)):
+                        key = (round_idx, a, b, chunk)
+                        if key in self._chunks:
+                            continue
+                        seed = random.Random(f"{self.seed}/{round_idx}/{a}/{b}/{chunk}").getrandbits(64)
+                        n = min(self.chunk_size, self.games_per_pairing - first)
+                        tasks[key] = (seed, self.agents[a], self.agents[b], first, n, self.max_turns)
+
+                if pool is None:
+                    for key, task in tasks.items():
+                        self._record(key, _play_match_chunk(task))
+                else:
+                    futures = {pool.submit(_play_match_chunk, task): key for key, task in tasks.items()}
+                    for future in as_completed(futures):
+                        self._record(futures[future], future.result())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def pairings(self, round_idx: int) -> list:
+        """The (a, b) pairings of a round; Swiss rounds depend on earlier results."""
+        if self.format == "round-robin":
+            return list(combinations(self.names, 2))
+
+        points = self.match_points(before_round=round_idx)
+        played = {frozenset((a, b)) for (r, a, b, _) in self._chunks if r < round_idx}
+        order = sorted(self.names, key=lambda name: -points[name])
+        pairs = []
+        if len(order) % 2:
+            # The lowest-ranked agent with the fewest byes sits out the round
+            byes = self._byes(round_idx)
+            order.remove(min(reversed(order), key=byes.get))
+        while order:
+            a = order.pop(0)
+            # Nearest-ranked opponent not met yet, else the nearest one
+            b = next((b for b in order if frozenset((a, b)) not in played), order[0])
+            order.remove(b)
+            pairs.append((a, b))
+        return pairs
+
+    def match_points(self, before_round: int = None) -> dict:
+        """1 per pairing won or Swiss bye, 0.5 per pairing drawn (by games won)."""
+        totals = {}
+        for (round_idx, a, b, _), outcomes in self._chunks.items():
+            if before_round is None or round_idx < before_round:
+                score = totals.setdefault((round_idx, a, b), [0, 0])
+                score[0] += outcomes.count("A")
+                score[1] += outcomes.count("B")
+        points = {name: float(n) for name, n in self._byes(before_round).items()}
+        for (_, a, b), (wins_a, wins_b) in totals.items():
+            points[a] += 1.0 if wins_a > wins_b else 0.5 if wins_a == wins_b else 0.0
+            points[b] += 1.0 if wins_b > wins_a else 0.5 if wins_a == wins_b else 0.0
+        return points
+
+    def _byes(self, before_round: int = None) -> dict:
+        """Swiss rounds each agent sat out, among the rounds with results."""
+        byes = {name: 0 for name in self.names}
+        if self.format != "swiss":
+            return byes
+        seated = {}
+        for (round_idx, a, b, _) in self._chunks:
+            if before_round is None or round_idx < before_round:
+                seated.setdefault(round_idx, set()).update((a, b))
+        for names in seated.values():
+            for name in self.names:
+                if name not in names:
+                    byes[name] += 1
+        return byes
+
+    # =========================================================================
+    # RESULTS
+    # =========================================================================
+
+    def _record(self, key, outcomes: str, write: bool = True):
+        round_idx, a, b, chunk = key
+        self._chunks[key] = outcomes
+        self.elo.update(a, b, outcomes)
+
+        wins_a, wins_b = outcomes.count("A"), outcomes.count("B")
+        ties, truncated = outcomes.count("T"), outcomes.count("X")
+        self.wins[a] += wins_a
+        self.losses[a] += wins_b
+        self.wins[b] += wins_b
+        self.losses[b] += wins_a
+        for name in (a, b):
+            self.ties[name] += ties
+            self.truncated[name] += truncated
+
+        # a moves first in the pairing's even-numbered games
+        first = chunk * self.chunk_size
+        for n, outcome in enumerate(outcomes, first):
+            if outcome in "AB":
+                self.decided_games += 1
+                self.first_seat_wins += (outcome == "A") == (n % 2 == 0)
+
+        if write and self._file is not None:
+            entry = {"type": "chunk", "round": round_idx, "a": a, "b": b, "chunk": chunk,
+                     "a_wins": wins_a, "b_wins": wins_b, "ties": ties, "truncated": truncated,
+                     "outcomes": outcomes}
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def _open_results(self):
+        path = self.results_path
+        if path is None:
+            return
+        config = self.config()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            good_end = self._load_results(path, config)
+            self._file = open(path, "r+")
+            # Drop a line cut short by an interrupted run
+            self._file.truncate(good_end)
+            self._file.seek(good_end)
+        else:
+            self._file = open(path, "w")
+            self._file.write(json.dumps(config) + "\n")
+            self._file.flush()
+
+    def _load_results(self, path, config) -> int:
+        """Replay a results file into the tallies; returns the end of its last complete line."""
+        with open(path, "rb") as f:
+            data = f.read()
+        end = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            entry = json.loads(line)
+            if entry["type"] == "config":
+                if entry != config:
+                    raise ValueError(f"{path} holds a different tournament; use another file")
+            elif entry["type"] == "chunk":
+                self._record((entry["round"], entry["a"], entry["b"], entry["chunk"]),
+                             entry["outcomes"], write=False)
+            end += len(line)
+        return end
+
+    def report(self) -> str:
+        points = self.match_points()
+        rows = sorted(self.names, key=lambda name: -self.elo.ratings[name])
+        lines = [f"{'agent':<32}{'elo':>8}{'points':>8}{'games':>9}{'win':>8}{'tie':>7}"]
+        for name in rows:
+            games = self.wins[name] + self.losses[name] + self.ties[name] + self.truncated[name]
+            lines.append(f"{name:<32}{self.elo.ratings[name]:>8.0f}{points[name]:>8.1f}{games:>9}"
+                         f"{self.wins[name] / max(games, 1):>8.3f}"
+                         f"{self.ties[name] / max(games, 1):>7.3f}")
+        if self.decided_games:
+            lines.append(f"First mover won {self.first_seat_wins / self.decided_games:.3f} "
+                         f"of {self.decided_games} decided games")
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stool Pigeon agent tournament")
+    parser.add_argument("agents", nargs="+",
+                        help=f"registered names ({', '.join(AGENTS)}) or class:key=value,... specs")
+    parser.add_argument("--games", type=int, default=1000, help="games per pairing")
+    parser.add_argument("--format", choices=("round-robin", "swiss"), default="round-robin")
+    parser.add_argument("--rounds", type=int, default=None, help="Swiss rounds (default: log2 of agents)")
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--k", type=float, default=4.0, help="Elo K-factor per game")
+    parser.add_argument("--results", default=None, help="JSON-lines results file (resumed if present)")
+    args = parser.parse_args()
+
+    agents = {spec: resolve_agent(spec) for spec in args.agents}
+    tournament = Tournament(agents, args.games, args.format, args.rounds, args.seed,
+                            args.chunk_size, args.max_turns, args.k, args.results)
+    start = time.perf_counter()
+    tournament.run(args.workers)
+    elapsed = time.perf_counter() - start
+    print(tournament.report())
+    print(f"Played in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Compact binary trajectories for ref.StoolPigeonGame.
+
+A game is stored as its seed, the initial deal and one u16 action index per
+ply (over ref.DEFAULT_ACTION_SPACE), plus the order of any discard->draw
+reshuffles, so it can be rebuilt exactly by replaying through the engine.
+The reshuffle orders make replay independent of the seed, so games from
+drivers that don't seed (or that reuse a game's rng) replay all the same.
+That is about 80 bytes for a typical game instead of a pickled engine.
+
+File layout (little-endian):
+
+    header   b"SPTRAJ", u16 version
+    records  one per game, appended:
+                 u64 seed, u32 plies, u16 reshuffle bytes, i8 result,
+                 i16 score0, i16 score1
+                 deal: 42 card codes, bottom of the deck first
+                 plies x u16 action index
+                 reshuffles: (u8 length, codes...) per reshuffle
+    footer   u64 offset per record, u64 record count, b"SPTRIDX1"
+
+The footer is rewritten when a writer closes; reopening a file for writing
+truncates it and appends after the last record. If a writer dies before
+closing, readers (and the next writer) rebuild the index by scanning.
+
+Results use selfplay's codes: the winner's index, TIE or TRUNCATED.
+
+    with TrajectoryWriter("games.sptraj") as writer:
+        recorder = GameRecorder(game)          # seed defaults to game.seed
+        ...                               # recorder.record(action) per ply
+        writer.write(recorder.finish())
+
+    with TrajectoryReader("games.sptraj") as reader:
+        game = reader.replay(17, ply=5)
+        for obs, actions, outcomes in reader.batches(4096):
+            ...
+
+Usage: python trajectory.py games.sptraj
+"""
+
+import argparse
+import array
+import mmap
+import os
+import struct
+import sys
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from ref import StoolPigeonGame, GamePhase, DEFAULT_ACTION_SPACE, DECK_CODES, encode_cards, decode_cards
+from selfplay import TIE, TRUNCATED
+
+VERSION = 1
+_FILE_HEADER = struct.Struct("<6sH")
+_FILE_MAGIC = b"SPTRAJ"
+_GAME_HEADER = struct.Struct("<QIHbhh")
+_TRAILER = struct.Struct("<Q8s")
+_TRAILER_MAGIC = b"SPTRIDX1"
+DEAL_SIZE = len(DECK_CODES)
+_SORTED_DECK = sorted(DECK_CODES)
+
+
+class GameRecord(NamedTuple):
+    seed: int
+    deal: bytes
+    actions: np.ndarray       # u16 action indices, one per ply
+    reshuffles: list          # bytes of card codes per reshuffle, in order
+    result: int
+    scores: tuple
+
+# =============================================================================
+# ENCODING
+# =============================================================================
+
+def initial_deal(game: StoolPigeonGame) -> bytes:
+    """The deck order a freshly set-up game was dealt from (StoolPigeonGame(deal=...))."""
+    if game.turn_count or game.drawn_card is not None or game.discard_pile:
+        raise ValueError("initial_deal() needs a game that hasn't started")
+    # _setup_game deals four cards to each player in turn off the top
+    deck = list(game.draw_pile)
+    for player in reversed(game.players):
+        deck.extend(reversed(player["crime_scene"]))
+    return bytes(encode_cards(deck))
+
+
+def encode_game(seed: int, deal: bytes, actions, reshuffles: bytes, result: int,
+                scores: tuple) -> bytes:
+    """Pack one game record; reshuffles is the already-packed reshuffle section."""
+    actions = np.asarray(actions, dtype="<u2")
+    return b"".join((
+        _GAME_HEADER.pack(seed, len(actions), len(reshuffles), result, *scores),
+        deal, actions.tobytes(), reshuffles,
+    ))
+
+
+def _decode_game(buf, offset: int) -> tuple:
+    """Decode the record at offset; returns (GameRecord, offset of the next record)."""
+    seed, plies, reshuffle_len, result, s0, s1 = _GAME_HEADER.unpack_from(buf, offset)
+    pos = offset + _GAME_HEADER.size
+    deal = bytes(buf[pos:pos + DEAL_SIZE])
+    pos += DEAL_SIZE
+    # Copied, so records outlive the reader's map
+    actions = np.frombuffer(buf, dtype="<u2", count=plies, offset=pos).copy()
+    pos += 2 * plies
+    end = pos + reshuffle_len
+    reshuffles = []
+    while pos < end:
+        n = buf[pos]
+        reshuffles.append(bytes(buf[pos + 1:pos + 1 + n]))
+        pos += 1 + n
+    return GameRecord(seed, deal, actions, reshuffles, result, (s0, s1)), end
+
+
+def _record_end(buf, offset: int) -> int:
+    _, plies, reshuffle_len, _, _, _ = _GAME_HEADER.unpack_from(buf, offset)
+    return offset + _GAME_HEADER.size + DEAL_SIZE + 2 * plies + reshuffle_len
+
+
+def _read_index(buf) -> tuple:
+    """Return (record offsets, end of the record data) from the footer or by scanning."""
+    magic, version = _FILE_HEADER.unpack_from(buf, 0)
+    if magic != _FILE_MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} trajectory file")
+
+    size = len(buf)
+    if size >= _FILE_HEADER.size + _TRAILER.size:
+        count, trailer_magic = _TRAILER.unpack_from(buf, size - _TRAILER.size)
+        index_start = size - _TRAILER.size - 8 * count
+        if trailer_magic == _TRAILER_MAGIC and index_start >= _FILE_HEADER.size:
+            return np.frombuffer(buf, dtype="<u8", count=count, offset=index_start), index_start
+
+    # No footer: the writer didn't close. Keep every complete record; a
+    # partly written footer is told apart by its deal not being a deck.
+    offsets = []
+    pos = _FILE_HEADER.size
+    while pos + _GAME_HEADER.size + DEAL_SIZE <= size:
+        end = _record_end(buf, pos)
+        deal = buf[pos + _GAME_HEADER.size:pos + _GAME_HEADER.size + DEAL_SIZE]
+        if end > size or sorted(deal) != _SORTED_DECK:
+            break
+        offsets.append(pos)
+        pos = end
+    return np.array(offsets, dtype="<u8"), pos
+
+# =============================================================================
+# WRITING
+# =============================================================================
+
+class GameRecorder:
+    """Collects the record of one game while it is played."""
+
+    def __init__(self, game: StoolPigeonGame, seed: Optional[int] = None, space=None):
+        self.game = game
+        if seed is None:
+            seed = game.seed if game.seed is not None else 0
+        self.seed = seed
+        self.space = space or DEFAULT_ACTION_SPACE
+        self.deal = initial_deal(game)
+        self.actions = []
+        self.reshuffles = bytearray()
+        game.reshuffle_hook = self._on_reshuffle
+
+    def _on_reshuffle(self, pile):
+        self.reshuffles.append(len(pile))
+        self.reshuffles += encode_cards(pile)
+
+    def record(self, action):
+        """Record the action about to be applied."""
+        self.actions.append(self.space.index(action))
+
+    def apply(self, action):
+        self.record(action)
+        self.game.apply_action(action)
+
+    def finish(self, result: Optional[int] = None) -> bytes:
+        """Detach from the game and return the encoded record."""
+        game = self.game
+        game.reshuffle_hook = None
+        if result is None:
+            if not game.is_terminal():
+                result = TRUNCATED
+            else:
+                winner = game.get_winner()
+                result = TIE if winner is None else winner
+        return encode_game(self.seed, self.deal, self.actions, bytes(self.reshuffles),
+                           result, game.get_scores())
+
+
+class TrajectoryWriter:
+    """Appends game records to a trajectory file."""
+
+    def __init__(self, path):
+        self.path = path
+        # 8 bytes per game; a list of ints costs about 40
+        self.offsets = array.array("Q")
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, "r+b")
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                offsets, data_end = _read_index(buf)
+                self.offsets.frombytes(offsets.view(np.uint8))
+                del offsets     # A view into buf; it must go before buf closes
+            if sys.byteorder == "big":
+                self.offsets.byteswap()
+            self._file.truncate(data_end)
+            self._file.seek(data_end)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_FILE_HEADER.pack(_FILE_MAGIC, VERSION))
+
+    def write(self, record: bytes):
+        self.offsets.append(self._file.tell())
+        self._file.write(record)
+
+    def close(self):
+        if self._file.closed:
+            return
+        offsets = self.offsets
+        if sys.byteorder == "big":
+            offsets = array.array("Q", offsets)
+            offsets.byteswap()
+        self._file.write(offsets.tobytes())
+        self._file.write(_TRAILER.pack(len(self.offsets), _TRAILER_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# =============================================================================
+# READING
+# =============================================================================
+
+class TrajectoryReader:
+    """Memory-mapped random access to the games in a trajectory file."""
+
+    def __init__(self, path, space=None):
+        self.space = space or DEFAULT_ACTION_SPACE
+        self._file = open(path, "rb")
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets, _ = _read_index(self._buf)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def record(self, i: int) -> GameRecord:
+        return _decode_game(self._buf, int(self.offsets[i]))[0]
+
+    def num_plies(self) -> int:
+        """Total plies in the file (reads only the record headers)."""
+        return sum(_GAME_HEADER.unpack_from(self._buf, int(offset))[1] for offset in self.offsets)
+
+    def replay(self, i: int, ply: Optional[int] = None) -> StoolPigeonGame:
+        """Rebuild game i as it was before action number ply (None: the end)."""
+        game = None
+        for n, (game, _) in enumerate(self.plies(i)):
+            if n == ply:
+                return game
+        # plies() applies the last action when it is exhausted
+        return game if game is not None else self._start(self.record(i))[0]
+
+    def plies(self, i: int):
+        """
+        Yield (game, action index) for each ply of game i.
+
+        game is positioned at the decision, after any DRAW-phase draw. It is
+        the same object throughout and is advanced once you move on.
+        """
+        rec = self.record(i)
+        game, actions = self._start(rec)
+        for index in rec.actions:
+            if game.phase == GamePhase.DRAW:
+                game._do_draw()
+            yield game, int(index)
+            game.apply_action(actions[index])
+
+    def _start(self, rec: GameRecord) -> tuple:
+        game = StoolPigeonGame(GUI=False, deal=rec.deal, seed=rec.seed)
+        orders = iter(rec.reshuffles)
+
+        def replay_reshuffle(pile):
+            # Past the recorded plies (a replayed game played on), keep the shuffle
+            order = next(orders, None)
+            if order is not None:
+                pile[:] = decode_cards(order)
+
+        game.reshuffle_hook = replay_reshuffle
+        return game, self.space.actions
+
+    def batches(self, batch_size: int = 4096, encoder=None, games=None):
+        """
+        Stream (observations, actions, outcomes) over every ply.
+
+        Observations are from the acting player's view; outcomes are +1 if
+        that player won, -1 if it lost and 0 for ties and truncated games.
+        The yielded arrays are reused between batches; copy them to keep them.
+        """
+        if encoder is None:
+            from observation import ObservationEncoder
+            encoder = ObservationEncoder(self.space.max_hand)
+        obs = encoder.zeros(batch_size)
+        actions = np.zeros(batch_size, dtype=np.int64)
+        outcomes = np.zeros(batch_size, dtype=np.float32)
+
+        n = 0
+        for i in (range(len(self)) if games is None else games):
+            result = self.record(i).result
+            for game, index in self.plies(i):
+                actor = game.current_player_idx
+                encoder.encode(game, actor, out=obs[n])
+                actions[n] = index
+                outcomes[n] = 0.0 if result in (TIE, TRUNCATED) else (1.0 if result == actor else -1.0)
+                n += 1
+                if n == batch_size:
+                    yield obs, actions, outcomes
+                    n = 0
+        if n:
+            yield obs[:n], actions[:n], outcomes[:n]
+
+    def close(self):
+        # Views into the map (offsets, record actions) must be dropped first
+        self.offsets = None
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a trajectory file")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    with TrajectoryReader(args.path) as reader:
+        plies = reader.num_plies()
+        size = os.path.getsize(args.path)
+        print(f"{len(reader)} games, {plies} plies, {size} bytes "
+              f"({size / max(plies, 1):.1f} bytes/ply)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Size-bounded transposition table for searches over ref.StoolPigeonGame.
+
+Search reaches the same position by different move orders (a BAMBOOZLE
+swap of A and B followed later by a swap of B and A, peeks in either
+order, ...). Keyed by StoolPigeonGame.zobrist_key() for full states or
+info_set_key(player) for what one player knows, a table lets a search
+reuse what it learned the first time round.
+
+The table never grows: it is a fixed array of two-entry buckets, picked
+by the low bits of the key. The first entry of a bucket is depth-preferred
+(replaced only by the same position, a result searched at least as deep,
+or anything once it is left over from an earlier search), the second is
+always replaced, so a flood of shallow results can't push out the
+expensive deep ones. Agents searching in one process can share a table;
+call new_search() once per move so old entries age out.
+
+    table = TranspositionTable(1 << 16)
+    table.new_search()
+    hit = table.probe(game.zobrist_key())     # (value, depth) or None
+    ...
+    table.store(game.zobrist_key(), value, depth)
+
+Usage: python transposition.py --depth 5 --positions 20
+"""
+
+import argparse
+import random
+import time
+from typing import Optional
+
+
+class TranspositionTable:
+    """Fixed-capacity map from 64-bit position keys to (value, depth)."""
+
+    def __init__(self, capacity: int = 1 << 16):
+        """capacity: number of entries, rounded up to a power of two (at least 2)."""
+        buckets = 1 << (max(capacity - 1, 1).bit_length() - 1)
+        self.capacity = 2 * buckets
+        self.mask = buckets - 1
+        self.clear()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key: int) -> bool:
+        i = (key & self.mask) << 1
+        return self._keys[i] == key or self._keys[i + 1] == key
+
+    def new_search(self):
+        """Start a new search: entries stored so far become replaceable."""
+        self.generation += 1
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        self._keys = [None] * self.capacity
+        self._values = [None] * self.capacity
+        self._depths = [0] * self.capacity
+        self._ages = [0] * self.capacity
+        self.generation = 0
+        self.size = 0
+
+        # Statistics since the last clear()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.replaced = 0
+
+    # =========================================================================
+    # LOOKUP AND STORE
+    # =========================================================================
+
+    def probe(self, key: int) -> Optional[tuple]:
+        """(value, depth) stored for key, or None."""
+        i = (key & self.mask) << 1
+        keys = self._keys
+        if keys[i] != key:
+            i += 1
+            if keys[i] != key:
+                self.misses += 1
+                return None
+        self.hits += 1
+        return self._values[i], self._depths[i]
+
+    def get(self, key: int, default=None):
+        hit = self.probe(key)
+        return default if hit is None else hit[0]
+
+    def store(self, key: int, value, depth: int = 0):
+        """Record value for key, searched to depth (higher is more valuable)."""
+        i = (key & self.mask) << 1
+        keys = self._keys
+        self.stores += 1
+        if (keys[i] is None or keys[i] == key or depth >= self._depths[i]
+                or self._ages[i] != self.generation):
+            if keys[i + 1] == key:
+                # Moving up from the always-replace entry
+                keys[i + 1] = None
+                self._values[i + 1] = None
+                self.size -= 1
+        else:
+            i += 1
+
+        if keys[i] is None:
+            self.size += 1
+        elif keys[i] != key:
+            self.replaced += 1
+        keys[i] = key
+        self._values[i] = value
+        self._depths[i] = depth
+        self._ages[i] = self.generation
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "replaced": self.replaced,
+        }
+
+# =============================================================================
+# DEMO
+# =============================================================================
+
+def count_nodes(game, depth: int, table: Optional[TranspositionTable] = None) -> int:
+    """
+    Positions in the game tree below game, to depth plies (draws included),
+    walked with push_action()/undo(). With a table, a position already
+    counted at the same or greater remaining depth is counted once.
+    """
+    if table is not None:
+        key = game.zobrist_key()
+        hit = table.probe(key)
+        if hit is not None and hit[1] >= depth:
+            return 0
+
+    from ref import GamePhase
+    nodes = 1
+    if depth > 0 and not game.done:
+        if game.phase == GamePhase.DRAW:
+            game.push_draw()
+            nodes += count_nodes(game, depth - 1, table)
+            game.undo()
+        else:
+            for action in game.get_legal_actions():
+                game.push_action(action)
+                nodes += count_nodes(game, depth - 1, table)
+                game.undo()
+
+    if table is not None:
+        table.store(key, nodes, depth)
+    return nodes
+
+
+def main():
+    from ref import StoolPigeonGame, ActionType, GamePhase
+
+    parser = argparse.ArgumentParser(description="Transpositions in the Stool Pigeon game tree")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--positions", type=int, default=20, help="random mid-game roots")
+    parser.add_argument("--capacity", type=int, default=1 << 18)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    seeds = random.Random(args.seed)
+    table = TranspositionTable(args.capacity)
+    tree = unique = 0
+    plain_time = table_time = 0.0
+    for _ in range(args.positions):
+        seed = seeds.getrandbits(64)
+        game = StoolPigeonGame(GUI=False, seed=seed)
+        # Random moves, never knocking, to a mid-game root
+        for _ in range(seeds.randrange(4, 20)):
+            if game.phase == GamePhase.DRAW:
+                game._do_draw()
+            game.apply_action(seeds.choice([a for a in game.get_legal_actions()
+                                            if a.action_type != ActionType.KNOCK]))
+
+        start = time.perf_counter()
+        tree += count_nodes(game, args.depth)
+        plain_time += time.perf_counter() - start
+
+        table.new_search()
+        start = time.perf_counter()
+        unique += count_nodes(game, args.depth, table)
+        table_time += time.perf_counter() - start
+
+    print(f"{args.positions} roots, depth {args.depth}: {tree} tree nodes, "
+          f"{unique} after transpositions ({1 - unique / tree:.1%} fewer)")
+    print(f"walk: {plain_time:.2f}s without the table, {table_time:.2f}s with it")
+    print(table.stats())
+
+
+if __name__ == "__main__":
+    main()